@@ -0,0 +1,105 @@
+"""Add composite and unique indexes for hot query paths
+
+Revision ID: a7c3e91f2b64
+Revises: 393b810c3abc
+Create Date: 2026-10-18 09:12:41.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e91f2b64'
+down_revision: Union[str, None] = '393b810c3abc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns, unique)
+INDEXES = [
+    ("ix_progress_logs_user_id_date", "progress_logs", ["user_id", "date"], False),
+    ("ix_progress_logs_skill_id_date", "progress_logs", ["skill_id", "date"], False),
+    ("uq_progress_logs_user_id_skill_id_date", "progress_logs", ["user_id", "skill_id", "date"], True),
+    ("ix_skills_user_id_created_at", "skills", ["user_id", "created_at"], False),
+    ("ix_resources_skill_id_created_at", "resources", ["skill_id", "created_at"], False),
+    ("uq_weekly_summaries_user_id_week_start", "weekly_summaries", ["user_id", "week_start"], True),
+]
+
+
+def _existing_tables() -> set:
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade() -> None:
+    # Tables are created by the application on startup, so on a fresh
+    # database there may be nothing to index yet; create_all will pick the
+    # indexes up from the models in that case.
+    tables = _existing_tables()
+    
+    # The unique indexes would fail on rows the old check-then-insert path let
+    # through. Fold duplicate progress logs into the oldest row so skill
+    # totals stay the same, and keep the first summary generated for a week.
+    if "progress_logs" in tables:
+        op.execute("""
+            WITH ranked AS (
+                SELECT id,
+                       min(id) OVER w AS keep_id,
+                       sum(time_spent) OVER w AS merged_time
+                FROM progress_logs
+                WINDOW w AS (PARTITION BY user_id, skill_id, date)
+            )
+            UPDATE progress_logs p
+            SET time_spent = ranked.merged_time
+            FROM ranked
+            WHERE p.id = ranked.id AND ranked.id = ranked.keep_id
+              AND ranked.merged_time <> p.time_spent
+        """)
+        op.execute("""
+            DELETE FROM progress_logs p
+            USING progress_logs keep
+            WHERE keep.user_id = p.user_id
+              AND keep.skill_id = p.skill_id
+              AND keep.date = p.date
+              AND keep.id < p.id
+        """)
+    
+    if "weekly_summaries" in tables:
+        op.execute("""
+            DELETE FROM weekly_summaries s
+            USING weekly_summaries keep
+            WHERE keep.user_id = s.user_id
+              AND keep.week_start = s.week_start
+              AND keep.id < s.id
+        """)
+    
+    # Build the indexes without holding a write lock on the tables
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique in INDEXES:
+            if table not in tables:
+                continue
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=unique,
+                if_not_exists=True,
+                postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    tables = _existing_tables()
+    
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            if table not in tables:
+                continue
+            op.drop_index(
+                name,
+                table_name=table,
+                if_exists=True,
+                postgresql_concurrently=True
+            )
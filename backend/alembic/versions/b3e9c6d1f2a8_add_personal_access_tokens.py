@@ -0,0 +1,46 @@
+"""Add personal access tokens
+
+Revision ID: b3e9c6d1f2a8
+Revises: f7d2a4b9c1e3
+Create Date: 2026-10-18 18:41:52.117203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e9c6d1f2a8'
+down_revision: Union[str, None] = 'f7d2a4b9c1e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "personal_access_tokens",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("key_id", sa.String(length=16), nullable=False),
+        sa.Column("secret_hash", sa.String(length=64), nullable=False),
+        sa.Column("scopes", postgresql.ARRAY(sa.String()), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_used_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("key_id"),
+        if_not_exists=True
+    )
+    op.create_index("ix_personal_access_tokens_id", "personal_access_tokens", ["id"], if_not_exists=True)
+    op.create_index("ix_personal_access_tokens_user_id", "personal_access_tokens", ["user_id"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_personal_access_tokens_user_id", table_name="personal_access_tokens", if_exists=True)
+    op.drop_index("ix_personal_access_tokens_id", table_name="personal_access_tokens", if_exists=True)
+    op.drop_table("personal_access_tokens")
@@ -0,0 +1,85 @@
+"""Add incrementally maintained streak state
+
+Revision ID: c52d8e07a9f1
+Revises: a7c3e91f2b64
+Create Date: 2026-10-18 11:03:27.904615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c52d8e07a9f1'
+down_revision: Union[str, None] = 'a7c3e91f2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "streak_states",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("skill_id", sa.Integer(), nullable=True),
+        sa.Column("current_streak", sa.Integer(), nullable=False),
+        sa.Column("longest_streak", sa.Integer(), nullable=False),
+        sa.Column("last_active_date", sa.Date(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["skill_id"], ["skills.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        if_not_exists=True
+    )
+    op.create_index("ix_streak_states_id", "streak_states", ["id"], if_not_exists=True)
+    op.create_index(
+        "uq_streak_states_user_id",
+        "streak_states",
+        ["user_id"],
+        unique=True,
+        postgresql_where=sa.text("skill_id IS NULL"),
+        if_not_exists=True
+    )
+    op.create_index(
+        "uq_streak_states_user_id_skill_id",
+        "streak_states",
+        ["user_id", "skill_id"],
+        unique=True,
+        postgresql_where=sa.text("skill_id IS NOT NULL"),
+        if_not_exists=True
+    )
+
+    # Backfill from existing logs with the same gaps-and-islands pass that
+    # StreakRepository.rebuild uses (scripts/repair_streaks.py).
+    op.execute("DELETE FROM streak_states")
+    op.execute("""
+        WITH days AS (
+            SELECT user_id, skill_id, date AS day FROM progress_logs
+            UNION ALL
+            SELECT DISTINCT user_id, NULL::integer, date FROM progress_logs
+        ), islands AS (
+            SELECT user_id, skill_id, day,
+                   day - row_number() OVER (PARTITION BY user_id, skill_id ORDER BY day)::integer AS island
+            FROM days
+        ), runs AS (
+            SELECT user_id, skill_id, max(day) AS run_end, count(*) AS run_length
+            FROM islands
+            GROUP BY user_id, skill_id, island
+        )
+        INSERT INTO streak_states (user_id, skill_id, current_streak, longest_streak, last_active_date)
+        SELECT user_id, skill_id,
+               (array_agg(run_length ORDER BY run_end DESC))[1],
+               max(run_length),
+               max(run_end)
+        FROM runs
+        GROUP BY user_id, skill_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index("uq_streak_states_user_id_skill_id", table_name="streak_states", if_exists=True)
+    op.drop_index("uq_streak_states_user_id", table_name="streak_states", if_exists=True)
+    op.drop_index("ix_streak_states_id", table_name="streak_states", if_exists=True)
+    op.drop_table("streak_states")
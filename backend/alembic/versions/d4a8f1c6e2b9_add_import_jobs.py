@@ -0,0 +1,68 @@
+"""Add import jobs
+
+Revision ID: d4a8f1c6e2b9
+Revises: b3e9c6d1f2a8
+Create Date: 2026-10-18 21:07:33.512849
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a8f1c6e2b9'
+down_revision: Union[str, None] = 'b3e9c6d1f2a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+import_format = postgresql.ENUM("CSV", "JSONL", "ICS", name="importformat", create_type=False)
+import_status = postgresql.ENUM("PENDING", "RUNNING", "COMPLETED", "FAILED", name="importstatus", create_type=False)
+
+
+def upgrade() -> None:
+    import_format.create(op.get_bind(), checkfirst=True)
+    import_status.create(op.get_bind(), checkfirst=True)
+    op.create_table(
+        "import_jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("format", import_format, nullable=False),
+        sa.Column("mode", sa.String(length=20), nullable=False),
+        sa.Column("status", import_status, nullable=False),
+        sa.Column("filename", sa.String(length=255), nullable=True),
+        sa.Column("file_path", sa.String(), nullable=False),
+        sa.Column("total_bytes", sa.BigInteger(), nullable=False),
+        sa.Column("processed_bytes", sa.BigInteger(), nullable=False),
+        sa.Column("rows_read", sa.Integer(), nullable=False),
+        sa.Column("rows_skipped", sa.Integer(), nullable=False),
+        sa.Column("logs_created", sa.Integer(), nullable=False),
+        sa.Column("logs_updated", sa.Integer(), nullable=False),
+        sa.Column("skills_created", sa.Integer(), nullable=False),
+        sa.Column("errors", postgresql.JSONB(), nullable=False),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        if_not_exists=True
+    )
+    op.create_index("ix_import_jobs_id", "import_jobs", ["id"], if_not_exists=True)
+    op.create_index(
+        "ix_import_jobs_user_id_created_at_id",
+        "import_jobs",
+        ["user_id", "created_at", "id"],
+        if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_import_jobs_user_id_created_at_id", table_name="import_jobs", if_exists=True)
+    op.drop_index("ix_import_jobs_id", table_name="import_jobs", if_exists=True)
+    op.drop_table("import_jobs")
+    import_status.drop(op.get_bind(), checkfirst=True)
+    import_format.drop(op.get_bind(), checkfirst=True)
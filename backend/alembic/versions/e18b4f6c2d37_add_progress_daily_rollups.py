@@ -0,0 +1,57 @@
+"""Add per-day progress rollup
+
+Revision ID: e18b4f6c2d37
+Revises: c52d8e07a9f1
+Create Date: 2026-10-18 13:26:54.117092
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e18b4f6c2d37'
+down_revision: Union[str, None] = 'c52d8e07a9f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "progress_daily_rollups",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("skill_id", sa.Integer(), nullable=False),
+        sa.Column("minutes", sa.Integer(), nullable=False),
+        sa.Column("log_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["skill_id"], ["skills.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "date", "skill_id"),
+        if_not_exists=True
+    )
+    op.create_index(
+        "ix_progress_daily_rollups_skill_id_date",
+        "progress_daily_rollups",
+        ["skill_id", "date"],
+        if_not_exists=True
+    )
+
+    # Backfill from existing logs, same query as RollupRepository.rebuild
+    op.execute("DELETE FROM progress_daily_rollups")
+    op.execute("""
+        INSERT INTO progress_daily_rollups (user_id, date, skill_id, minutes, log_count)
+        SELECT user_id, date, skill_id, sum(time_spent), count(id)
+        FROM progress_logs
+        GROUP BY user_id, date, skill_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_progress_daily_rollups_skill_id_date",
+        table_name="progress_daily_rollups",
+        if_exists=True
+    )
+    op.drop_table("progress_daily_rollups")
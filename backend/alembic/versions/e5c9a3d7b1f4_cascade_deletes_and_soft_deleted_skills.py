@@ -0,0 +1,89 @@
+"""Cascade deletes in the database and soft delete skills
+
+Revision ID: e5c9a3d7b1f4
+Revises: d4a8f1c6e2b9
+Create Date: 2026-10-18 23:41:12.604731
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5c9a3d7b1f4'
+down_revision: Union[str, None] = 'd4a8f1c6e2b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (constraint name, table, column, referenced table)
+FOREIGN_KEYS = [
+    ("skills_user_id_fkey", "skills", "user_id", "users"),
+    ("progress_logs_user_id_fkey", "progress_logs", "user_id", "users"),
+    ("progress_logs_skill_id_fkey", "progress_logs", "skill_id", "skills"),
+    ("resources_skill_id_fkey", "resources", "skill_id", "skills"),
+    ("weekly_summaries_user_id_fkey", "weekly_summaries", "user_id", "users"),
+]
+
+
+def _existing_tables() -> set:
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def _replace_foreign_keys(tables: set, on_delete: str) -> None:
+    # Added NOT VALID, so swapping a constraint only locks its tables
+    # briefly, then validated in transactions of their own, which scan the
+    # tables without blocking writes
+    for name, table, column, referenced in FOREIGN_KEYS:
+        if table not in tables:
+            continue
+        op.execute(f"""
+            ALTER TABLE {table}
+                DROP CONSTRAINT IF EXISTS {name},
+                ADD CONSTRAINT {name} FOREIGN KEY ({column})
+                    REFERENCES {referenced} (id) ON DELETE {on_delete} NOT VALID
+        """)
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in FOREIGN_KEYS:
+            if table in tables:
+                op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}")
+
+
+def upgrade() -> None:
+    # Tables are created by the application on startup, so on a fresh
+    # database there may be nothing to change; create_all builds them from
+    # the models in that case.
+    tables = _existing_tables()
+    _replace_foreign_keys(tables, "CASCADE")
+
+    if "skills" in tables:
+        op.execute("ALTER TABLE skills ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMP WITH TIME ZONE")
+        with op.get_context().autocommit_block():
+            op.create_index(
+                "ix_skills_user_id_deleted",
+                "skills",
+                ["user_id"],
+                postgresql_where=sa.text("deleted_at IS NOT NULL"),
+                if_not_exists=True,
+                postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    tables = _existing_tables()
+
+    if "skills" in tables:
+        with op.get_context().autocommit_block():
+            op.drop_index(
+                "ix_skills_user_id_deleted",
+                table_name="skills",
+                if_exists=True,
+                postgresql_concurrently=True
+            )
+        # Finish deleting skills the purge has not got to yet
+        op.execute("DELETE FROM skills WHERE deleted_at IS NOT NULL")
+        op.execute("ALTER TABLE skills DROP COLUMN IF EXISTS deleted_at")
+
+    _replace_foreign_keys(tables, "NO ACTION")
@@ -0,0 +1,29 @@
+"""Add run length counts to streak state
+
+Revision ID: f1b7d3a9c5e2
+Revises: e5c9a3d7b1f4
+Create Date: 2026-10-19 10:12:48.317205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b7d3a9c5e2'
+down_revision: Union[str, None] = 'e5c9a3d7b1f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Left NULL on existing rows; each is filled in from the logs the first
+    # time it needs it, rather than scanning every user's history here.
+    if "streak_states" in sa.inspect(op.get_bind()).get_table_names():
+        op.execute("ALTER TABLE streak_states ADD COLUMN IF NOT EXISTS run_lengths JSONB")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE streak_states DROP COLUMN IF EXISTS run_lengths")
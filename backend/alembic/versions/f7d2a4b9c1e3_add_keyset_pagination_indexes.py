@@ -0,0 +1,85 @@
+"""Extend list indexes with the keyset pagination tie-breakers
+
+Revision ID: f7d2a4b9c1e3
+Revises: e18b4f6c2d37
+Create Date: 2026-10-18 15:22:09.361842
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7d2a4b9c1e3'
+down_revision: Union[str, None] = 'e18b4f6c2d37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (new index, old index it supersedes, table, new columns, old columns)
+INDEXES = [
+    (
+        "ix_progress_logs_user_id_date_created_at_id", "ix_progress_logs_user_id_date",
+        "progress_logs", ["user_id", "date", "created_at", "id"], ["user_id", "date"]
+    ),
+    (
+        "ix_skills_user_id_created_at_id", "ix_skills_user_id_created_at",
+        "skills", ["user_id", "created_at", "id"], ["user_id", "created_at"]
+    ),
+    (
+        "ix_resources_skill_id_created_at_id", "ix_resources_skill_id_created_at",
+        "resources", ["skill_id", "created_at", "id"], ["skill_id", "created_at"]
+    ),
+]
+
+
+def _existing_tables() -> set:
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade() -> None:
+    # The old indexes are prefixes of the new ones, so they can go once the
+    # wider index is in place.
+    tables = _existing_tables()
+    
+    with op.get_context().autocommit_block():
+        for name, old_name, table, columns, _ in INDEXES:
+            if table not in tables:
+                continue
+            op.create_index(
+                name,
+                table,
+                columns,
+                if_not_exists=True,
+                postgresql_concurrently=True
+            )
+            op.drop_index(
+                old_name,
+                table_name=table,
+                if_exists=True,
+                postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    tables = _existing_tables()
+    
+    with op.get_context().autocommit_block():
+        for name, old_name, table, _, old_columns in reversed(INDEXES):
+            if table not in tables:
+                continue
+            op.create_index(
+                old_name,
+                table,
+                old_columns,
+                if_not_exists=True,
+                postgresql_concurrently=True
+            )
+            op.drop_index(
+                name,
+                table_name=table,
+                if_exists=True,
+                postgresql_concurrently=True
+            )
@@ -0,0 +1,57 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.dependencies import get_db, get_current_user
+from app.services.access_token_service import AccessTokenService
+from app.schemas.access_token import (
+    AccessTokenCreate,
+    AccessTokenResponse,
+    AccessTokenCreatedResponse
+)
+from app.core.principal import Principal
+
+router = APIRouter()
+
+
+@router.post("/", response_model=AccessTokenCreatedResponse, status_code=status.HTTP_201_CREATED)
+async def create_access_token(
+    token_data: AccessTokenCreate,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Create a personal access token for scripts and integrations.
+    
+    - **name**: Label to recognise the token by
+    - **scopes**: Sections and actions the token may use, e.g. progress:write
+    - **expires_in_days**: Optional lifetime; omit for a token that does not expire
+    
+    The token is only shown in this response. Send it as
+    `Authorization: Bearer ssp_...`.
+    """
+    token_service = AccessTokenService(db)
+    return await token_service.create_token(current_user.id, token_data)
+
+
+@router.get("/", response_model=List[AccessTokenResponse])
+async def list_access_tokens(
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """List personal access tokens, without their secrets."""
+    token_service = AccessTokenService(db)
+    return await token_service.list_tokens(current_user.id)
+
+
+@router.delete("/{token_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke_access_token(
+    token_id: int,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Revoke a personal access token."""
+    token_service = AccessTokenService(db)
+    await token_service.revoke_token(current_user.id, token_id)
+    return None
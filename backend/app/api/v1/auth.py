@@ -1,9 +1,12 @@
 
-from fastapi import APIRouter, Depends, HTTPException, status, Header
-from sqlalchemy.orm import Session
-import redis
+from typing import List
 
-from app.core.dependencies import get_db, get_redis, get_current_user
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Header, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+import redis.asyncio as aioredis
+
+from app.core.dependencies import get_db, get_redis, get_current_user, oauth2_scheme
+from app.core.security import decode_token
 from app.services.auth_service import AuthService
 from app.schemas.auth import (
     UserRegister,
@@ -12,9 +15,10 @@ from app.schemas.auth import (
     PasswordChange,
     AuthResponse,
     UserResponse,
+    SessionResponse,
     Token
 )
-from app.models.user import User
+from app.core.principal import Principal
 
 router = APIRouter()
 
@@ -22,8 +26,9 @@ router = APIRouter()
 @router.post("/register", response_model=AuthResponse, status_code=status.HTTP_201_CREATED)
 async def register(
     user_data: UserRegister,
-    db: Session = Depends(get_db),
-    redis_client: redis.Redis = Depends(get_redis)
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    redis_client: aioredis.Redis = Depends(get_redis)
 ):
     """
     Register a new user.
@@ -35,17 +40,16 @@ async def register(
     """
     auth_service = AuthService(db, redis_client)
     
-    # Register user
-    user = auth_service.register(
+    # Register user and issue tokens for their first session
+    user, tokens = await auth_service.register(
         email=user_data.email,
         username=user_data.username,
         password=user_data.password,
-        full_name=user_data.full_name
+        full_name=user_data.full_name,
+        device=request.headers.get("user-agent"),
+        ip=request.client.host if request.client else None
     )
     
-    # Generate tokens
-    _, tokens = auth_service.login(user_data.email, user_data.password)
-    
     return AuthResponse(
         user=UserResponse.from_orm(user),
         tokens=tokens,
@@ -56,8 +60,10 @@ async def register(
 @router.post("/login", response_model=AuthResponse)
 async def login(
     credentials: UserLogin,
-    db: Session = Depends(get_db),
-    redis_client: redis.Redis = Depends(get_redis)
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    redis_client: aioredis.Redis = Depends(get_redis)
 ):
     """
     Login with email and password.
@@ -67,9 +73,12 @@ async def login(
     auth_service = AuthService(db, redis_client)
     
     # Authenticate user
-    user, tokens = auth_service.login(
+    user, tokens = await auth_service.login(
         email=credentials.email,
-        password=credentials.password
+        password=credentials.password,
+        device=request.headers.get("user-agent"),
+        ip=request.client.host if request.client else None,
+        background_tasks=background_tasks
     )
     
     return AuthResponse(
@@ -82,8 +91,9 @@ async def login(
 @router.post("/refresh", response_model=Token)
 async def refresh_token(
     token_data: TokenRefresh,
-    db: Session = Depends(get_db),
-    redis_client: redis.Redis = Depends(get_redis)
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    redis_client: aioredis.Redis = Depends(get_redis)
 ):
     """
     Refresh access token using refresh token.
@@ -92,7 +102,10 @@ async def refresh_token(
     """
     auth_service = AuthService(db, redis_client)
     
-    new_tokens = auth_service.refresh_access_token(token_data.refresh_token)
+    new_tokens = await auth_service.refresh_access_token(
+        token_data.refresh_token,
+        ip=request.client.host if request.client else None
+    )
     
     return new_tokens
 
@@ -101,14 +114,14 @@ async def refresh_token(
 async def logout(
     refresh_token: str = None,
     authorization: str = Header(None),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-    redis_client: redis.Redis = Depends(get_redis)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    redis_client: aioredis.Redis = Depends(get_redis)
 ):
     """
-    Logout user by blacklisting tokens.
+    Logout user by revoking the access token and ending its device session.
     
-    - **refresh_token**: Optional refresh token to blacklist
+    - **refresh_token**: Optional refresh token whose session to end
     """
     auth_service = AuthService(db, redis_client)
     
@@ -118,27 +131,86 @@ async def logout(
         access_token = authorization.replace("Bearer ", "")
     
     # Logout
-    auth_service.logout(current_user.id, access_token, refresh_token)
+    await auth_service.logout(current_user.id, access_token, refresh_token)
     
     return None
 
 
+@router.post("/logout-all", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_all(
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    redis_client: aioredis.Redis = Depends(get_redis)
+):
+    """
+    Logout from every device.
+    
+    Revokes all access and refresh tokens issued to the user so far.
+    """
+    auth_service = AuthService(db, redis_client)
+    await auth_service.logout_all(current_user.id)
+    return None
+
+
+@router.get("/sessions", response_model=List[SessionResponse])
+async def list_sessions(
+    token: str = Depends(oauth2_scheme),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    redis_client: aioredis.Redis = Depends(get_redis)
+):
+    """
+    List the devices the user is signed in on.
+    
+    The session of the calling token is marked as current.
+    """
+    auth_service = AuthService(db, redis_client)
+    current_session = decode_token(token).get("sid")
+    
+    return [
+        SessionResponse(**session, current=session["id"] == current_session)
+        for session in await auth_service.list_sessions(current_user.id)
+    ]
+
+
+@router.delete("/sessions/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke_session(
+    session_id: str,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    redis_client: aioredis.Redis = Depends(get_redis)
+):
+    """
+    Sign one device out.
+    
+    Its refresh token stops working and its last access token is revoked.
+    """
+    auth_service = AuthService(db, redis_client)
+    await auth_service.revoke_session(current_user.id, session_id)
+    return None
+
+
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    redis_client: aioredis.Redis = Depends(get_redis)
+):
     """
     Get current authenticated user information.
     
     Requires valid access token.
     """
-    return UserResponse.from_orm(current_user)
+    auth_service = AuthService(db, redis_client)
+    return UserResponse.from_orm(await auth_service.get_user(current_user.id))
 
 
 @router.post("/change-password", response_model=UserResponse)
 async def change_password(
     password_data: PasswordChange,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-    redis_client: redis.Redis = Depends(get_redis)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    redis_client: aioredis.Redis = Depends(get_redis)
 ):
     """
     Change user password.
@@ -148,8 +220,8 @@ async def change_password(
     """
     auth_service = AuthService(db, redis_client)
     
-    updated_user = auth_service.change_password(
-        user=current_user,
+    updated_user = await auth_service.change_password(
+        user_id=current_user.id,
         old_password=password_data.old_password,
         new_password=password_data.new_password
     )
@@ -158,7 +230,7 @@ async def change_password(
 
 
 @router.post("/verify-token", response_model=dict)
-async def verify_token(current_user: User = Depends(get_current_user)):
+async def verify_token(current_user: Principal = Depends(get_current_user)):
     """
     Verify if access token is valid.
     
@@ -0,0 +1,64 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, File, Form, Query, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.dependencies import get_db, get_current_user
+from app.services.import_service import ImportService
+from app.schemas.import_job import ImportFormatEnum, ImportJobResponse
+from app.schemas.progress import ProgressUpsertMode
+from app.core.principal import Principal
+
+router = APIRouter()
+
+
+@router.post("/", response_model=ImportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_import(
+    file: UploadFile = File(...),
+    format: Optional[ImportFormatEnum] = Form(None),
+    mode: ProgressUpsertMode = Form(ProgressUpsertMode.ACCUMULATE),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Import progress history exported from another time tracker.
+    
+    - **file**: CSV with a header row, JSON lines, or iCalendar
+    - **format**: `csv`, `jsonl` or `ics`; taken from the file extension if omitted
+    - **mode**: `accumulate` (default) adds imported time to existing logs;
+      `replace` makes the imported total the day's time
+    
+    Each entry needs a skill (or project), a date and a duration. Entries
+    on the same skill and day are added up, and skills that do not exist
+    yet are created. The file is imported in the background; poll
+    GET /imports/{id} for progress and skipped rows.
+    """
+    import_service = ImportService(db)
+    return await import_service.create_job(current_user.id, file, format, mode)
+
+
+@router.get("/", response_model=List[ImportJobResponse])
+async def list_imports(
+    limit: int = Query(20, ge=1, le=100, description="Number of recent jobs"),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """List recent import jobs, newest first."""
+    import_service = ImportService(db)
+    return await import_service.list_jobs(current_user.id, limit)
+
+
+@router.get("/{job_id}", response_model=ImportJobResponse)
+async def get_import(
+    job_id: int,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get an import job's status and progress.
+    
+    Counters are updated as each chunk of rows is written; `progress` is
+    the share of the file processed, from 0 to 1.
+    """
+    import_service = ImportService(db)
+    return await import_service.get_job(current_user.id, job_id)
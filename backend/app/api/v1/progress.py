@@ -1,24 +1,31 @@
 
 from fastapi import APIRouter, Depends, Query, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+import redis.asyncio as aioredis
 from typing import Optional
 from datetime import date
 
-from app.core.dependencies import get_db, get_current_user
+from app.core.dependencies import get_db, get_redis, get_current_user
 from app.services.progress_service import ProgressService
 from app.schemas.progress import (
     ProgressLogCreate,
+    ProgressLogBatchCreate,
+    ProgressLogUpsert,
     ProgressLogUpdate,
     ProgressLogResponse,
+    ProgressLogUpsertResponse,
+    ProgressLogBatchResponse,
     ProgressLogWithSkill,
     ProgressListResponse,
     DailyProgressStats,
     WeeklyProgressStats,
     MonthlyProgressStats,
     ProgressStatsResponse,
+    ProgressRangeStats,
+    StatsBucket,
     SkillProgressSummary
 )
-from app.models.user import User
+from app.core.principal import Principal
 
 router = APIRouter()
 
@@ -26,8 +33,8 @@ router = APIRouter()
 @router.post("/", response_model=ProgressLogResponse, status_code=status.HTTP_201_CREATED)
 async def create_progress_log(
     log_data: ProgressLogCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Log daily progress for a skill.
@@ -38,10 +45,51 @@ async def create_progress_log(
     - **description**: What you studied/worked on
     - **notes**: Additional notes
     
-    Note: Only one progress log per skill per day is allowed.
+    Note: Only one progress log per skill per day is allowed; use
+    /progress/upsert to add to or replace an existing day.
     """
     progress_service = ProgressService(db)
-    return progress_service.create_progress_log(current_user.id, log_data)
+    return await progress_service.create_progress_log(current_user.id, log_data)
+
+
+@router.post("/batch", response_model=ProgressLogBatchResponse)
+async def create_progress_logs(
+    batch: ProgressLogBatchCreate,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Log progress for many skills and days in one request, e.g. to sync
+    sessions recorded offline.
+    
+    - **logs**: 1-1000 items, each as for creating a single log
+    
+    The batch is written in one transaction. Each item gets a result in
+    request order: `created` with the new log, or `duplicate` /
+    `skill_not_found` with a detail; failed items do not affect the rest.
+    """
+    progress_service = ProgressService(db)
+    return await progress_service.create_progress_logs(current_user.id, batch)
+
+
+@router.post("/upsert", response_model=ProgressLogUpsertResponse)
+async def upsert_progress_log(
+    log_data: ProgressLogUpsert,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Log progress for a skill on a day, creating the day's log if needed.
+    
+    - **skill_id**, **date**, **time_spent**, **description**, **notes**: as for creating a log
+    - **mode**: `accumulate` (default) adds time_spent to the day's log, so
+      several sessions can be logged on one day; `replace` overwrites it
+    
+    Description and notes are only overwritten when given. The day's total
+    cannot exceed 1440 minutes. `created` tells whether a new log was made.
+    """
+    progress_service = ProgressService(db)
+    return await progress_service.upsert_progress_log(current_user.id, log_data)
 
 
 @router.get("/", response_model=ProgressListResponse)
@@ -51,8 +99,11 @@ async def get_all_progress_logs(
     end_date: Optional[date] = Query(None, description="End date for filtering"),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="next_cursor from a previous page; replaces page"),
+    include_total: bool = Query(False, description="Include the (cached) total in cursor mode"),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    redis_client: aioredis.Redis = Depends(get_redis)
 ):
     """
     Get all progress logs for the current user.
@@ -61,23 +112,27 @@ async def get_all_progress_logs(
     - Skill ID
     - Date range (start_date to end_date)
     
-    Returns paginated results ordered by date (most recent first).
+    Returns paginated results ordered by date (most recent first). Pass
+    next_cursor back as cursor to page without OFFSET.
     """
     progress_service = ProgressService(db)
-    return progress_service.get_all_progress_logs(
+    return await progress_service.get_all_progress_logs(
         user_id=current_user.id,
         skill_id=skill_id,
         start_date=start_date,
         end_date=end_date,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        cursor=cursor,
+        include_total=include_total,
+        redis_client=redis_client
     )
 
 
 @router.get("/stats", response_model=ProgressStatsResponse)
 async def get_overall_stats(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get overall progress statistics.
@@ -88,14 +143,14 @@ async def get_overall_stats(
     - Today, this week, and this month statistics
     """
     progress_service = ProgressService(db)
-    return progress_service.get_overall_stats(current_user.id)
+    return await progress_service.get_overall_stats(current_user.id)
 
 
 @router.get("/stats/daily", response_model=DailyProgressStats)
 async def get_daily_stats(
     target_date: date = Query(default=date.today(), description="Target date"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get progress statistics for a specific day.
@@ -106,14 +161,14 @@ async def get_daily_stats(
     - Number of log entries
     """
     progress_service = ProgressService(db)
-    return progress_service.get_daily_stats(current_user.id, target_date)
+    return await progress_service.get_daily_stats(current_user.id, target_date)
 
 
 @router.get("/stats/weekly", response_model=WeeklyProgressStats)
 async def get_weekly_stats(
     week_start: Optional[date] = Query(None, description="Week start date (Monday)"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get progress statistics for a week.
@@ -126,15 +181,15 @@ async def get_weekly_stats(
     - Average daily time
     """
     progress_service = ProgressService(db)
-    return progress_service.get_weekly_stats(current_user.id, week_start)
+    return await progress_service.get_weekly_stats(current_user.id, week_start)
 
 
 @router.get("/stats/monthly", response_model=MonthlyProgressStats)
 async def get_monthly_stats(
     year: Optional[int] = Query(None, description="Year"),
     month: Optional[int] = Query(None, ge=1, le=12, description="Month (1-12)"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get progress statistics for a month.
@@ -146,14 +201,36 @@ async def get_monthly_stats(
     - Number of active days
     """
     progress_service = ProgressService(db)
-    return progress_service.get_monthly_stats(current_user.id, year, month)
+    return await progress_service.get_monthly_stats(current_user.id, year, month)
+
+
+@router.get("/stats/range", response_model=ProgressRangeStats)
+async def get_range_stats(
+    start_date: Optional[date] = Query(None, description="Range start (defaults to 30 days before end_date)"),
+    end_date: Optional[date] = Query(None, description="Range end (defaults to today)"),
+    bucket: StatsBucket = Query(StatsBucket.DAY, description="Bucket size: day, week or month"),
+    skill_id: Optional[int] = Query(None, description="Only count this skill"),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get progress statistics for any date range.
+    
+    Returns:
+    - Range totals and number of active days
+    - A zero-filled series with one entry per day, week (Monday start) or month
+    """
+    progress_service = ProgressService(db)
+    return await progress_service.get_range_stats(
+        current_user.id, start_date, end_date, bucket, skill_id
+    )
 
 
 @router.get("/skills/{skill_id}/summary", response_model=SkillProgressSummary)
 async def get_skill_progress_summary(
     skill_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get progress summary for a specific skill.
@@ -165,14 +242,14 @@ async def get_skill_progress_summary(
     - Average daily time
     """
     progress_service = ProgressService(db)
-    return progress_service.get_skill_progress_summary(current_user.id, skill_id)
+    return await progress_service.get_skill_progress_summary(current_user.id, skill_id)
 
 
 @router.get("/{log_id}", response_model=ProgressLogWithSkill)
 async def get_progress_log(
     log_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get a single progress log by ID.
@@ -180,15 +257,15 @@ async def get_progress_log(
     Includes skill details.
     """
     progress_service = ProgressService(db)
-    return progress_service.get_progress_log(log_id, current_user.id)
+    return await progress_service.get_progress_log(log_id, current_user.id)
 
 
 @router.put("/{log_id}", response_model=ProgressLogResponse)
 async def update_progress_log(
     log_id: int,
     log_data: ProgressLogUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update an existing progress log.
@@ -200,14 +277,14 @@ async def update_progress_log(
     - **notes**: New notes
     """
     progress_service = ProgressService(db)
-    return progress_service.update_progress_log(log_id, current_user.id, log_data)
+    return await progress_service.update_progress_log(log_id, current_user.id, log_data)
 
 
 @router.delete("/{log_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_progress_log(
     log_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Delete a progress log.
@@ -215,5 +292,5 @@ async def delete_progress_log(
     This will also update the skill's total hours.
     """
     progress_service = ProgressService(db)
-    progress_service.delete_progress_log(log_id, current_user.id)
+    await progress_service.delete_progress_log(log_id, current_user.id)
     return None
\ No newline at end of file
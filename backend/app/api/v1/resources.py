@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+import redis.asyncio as aioredis
 from typing import Optional, List
 
-from app.core.dependencies import get_db, get_current_user
+from app.core.dependencies import get_db, get_redis, get_current_user
 from app.services.resource_service import ResourceService
 from app.schemas.resource import (
     ResourceCreate,
@@ -13,7 +14,7 @@ from app.schemas.resource import (
     ResourceTypeEnum,
     ResourceFilter
 )
-from app.models.user import User
+from app.core.principal import Principal
 
 # router = APIRouter(prefix="/resources", tags=["resources"])
 router = APIRouter()  
@@ -24,10 +25,10 @@ router = APIRouter()
     status_code=status.HTTP_201_CREATED,
     summary="Create a new resource"
 )
-def create_resource(  
+async def create_resource(  
     resource_data: ResourceCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create a new learning resource.
@@ -38,7 +39,7 @@ def create_resource(
     - **resource_type**: Type of resource (article, video, book, etc.)
     - **description**: Optional description
     """
-    return ResourceService(db).create_resource(  
+    return await ResourceService(db).create_resource(  
         user_id=current_user.id,
         resource_data=resource_data
     )
@@ -48,26 +49,34 @@ def create_resource(
     response_model=ResourceListResponse,
     summary="Get all resources with filtering"
 )
-def get_resources(  
+async def get_resources(  
     skill_id: Optional[int] = Query(None, description="Filter by skill ID"),
     resource_type: Optional[ResourceTypeEnum] = Query(None, description="Filter by resource type"),
     is_completed: Optional[bool] = Query(None, description="Filter by completion status"),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="next_cursor from a previous page; replaces page"),
+    include_total: bool = Query(False, description="Include the (cached) total in cursor mode"),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    redis_client: aioredis.Redis = Depends(get_redis)
 ):
     """
     Get a paginated list of resources with optional filtering.
+    
+    Pass next_cursor back as cursor to page without OFFSET.
     """
     # Changed to call get_all_resources with individual parameters
-    return ResourceService(db).get_all_resources(
+    return await ResourceService(db).get_all_resources(
         user_id=current_user.id,
         skill_id=skill_id,
         resource_type=resource_type,
         is_completed=is_completed,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        cursor=cursor,
+        include_total=include_total,
+        redis_client=redis_client
     )
 
 @router.get(
@@ -75,9 +84,9 @@ def get_resources(
     response_model=ResourceStatsResponse,
     summary="Get resource statistics"
 )
-def get_resource_stats( 
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_resource_stats( 
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get statistics about resources.
@@ -87,22 +96,22 @@ def get_resource_stats(
     - Completion statistics
     - Distribution by resource type
     """
-    return ResourceService(db).get_stats(user_id=current_user.id)  
+    return await ResourceService(db).get_stats(user_id=current_user.id)  
 
 @router.get(
     "/{resource_id}",
     response_model=ResourceResponse,
     summary="Get a single resource by ID"
 )
-def get_resource(  
+async def get_resource(  
     resource_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get a single resource by its ID.
     """
-    resource = ResourceService(db).get_resource(  
+    resource = await ResourceService(db).get_resource(  
         user_id=current_user.id,
         resource_id=resource_id
     )
@@ -118,18 +127,18 @@ def get_resource(
     response_model=ResourceResponse,
     summary="Update a resource"
 )
-def update_resource(  
+async def update_resource(  
     resource_id: int,
     resource_data: ResourceUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update a resource's details.
     
     All fields are optional. Only provided fields will be updated.
     """
-    resource = ResourceService(db).update_resource(  
+    resource = await ResourceService(db).update_resource(  
         user_id=current_user.id,
         resource_id=resource_id,
         resource_data=resource_data
@@ -146,15 +155,15 @@ def update_resource(
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Delete a resource"
 )
-def delete_resource(  
+async def delete_resource(  
     resource_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Delete a resource.
     """
-    ResourceService(db).delete_resource(  # Remove await and change return
+    await ResourceService(db).delete_resource(
         user_id=current_user.id,
         resource_id=resource_id
     )
@@ -165,15 +174,15 @@ def delete_resource(
     response_model=ResourceResponse,
     summary="Mark a resource as completed"
 )
-def mark_resource_completed(  
+async def mark_resource_completed(  
     resource_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Mark a resource as completed.
     """
-    resource = ResourceService(db).mark_completed(  
+    resource = await ResourceService(db).mark_completed(  
         user_id=current_user.id,
         resource_id=resource_id
     )
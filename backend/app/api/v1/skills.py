@@ -1,9 +1,10 @@
 
 from fastapi import APIRouter, Depends, Query, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+import redis.asyncio as aioredis
 from typing import Optional
 
-from app.core.dependencies import get_db, get_current_user
+from app.core.dependencies import get_db, get_redis, get_current_user
 from app.services.skill_service import SkillService
 from app.schemas.skill import (
     SkillCreate,
@@ -16,7 +17,7 @@ from app.schemas.skill import (
     SkillLevelEnum,
     SkillStatusEnum
 )
-from app.models.user import User
+from app.core.principal import Principal
 
 router = APIRouter()
 
@@ -24,8 +25,8 @@ router = APIRouter()
 @router.post("/", response_model=SkillResponse, status_code=status.HTTP_201_CREATED)
 async def create_skill(
     skill_data: SkillCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create a new skill.
@@ -36,7 +37,7 @@ async def create_skill(
     - **current_level**: Current proficiency level
     """
     skill_service = SkillService(db)
-    return skill_service.create_skill(current_user.id, skill_data)
+    return await skill_service.create_skill(current_user.id, skill_data)
 
 
 @router.get("/", response_model=SkillListResponse)
@@ -47,8 +48,11 @@ async def get_all_skills(
     search: Optional[str] = Query(None, description="Search by name or description"),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="next_cursor from a previous page; replaces page"),
+    include_total: bool = Query(False, description="Include the (cached) total in cursor mode"),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    redis_client: aioredis.Redis = Depends(get_redis)
 ):
     """
     Get all skills for the current user.
@@ -59,24 +63,28 @@ async def get_all_skills(
     - Target level
     - Search query
     
-    Returns paginated results.
+    Returns paginated results, newest first. Pass next_cursor back as
+    cursor to page without OFFSET.
     """
     skill_service = SkillService(db)
-    return skill_service.get_all_skills(
+    return await skill_service.get_all_skills(
         user_id=current_user.id,
         status=status,
         current_level=current_level,
         target_level=target_level,
         search=search,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        cursor=cursor,
+        include_total=include_total,
+        redis_client=redis_client
     )
 
 
 @router.get("/stats", response_model=SkillStatsResponse)
 async def get_skill_stats(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get overall skill statistics.
@@ -87,15 +95,15 @@ async def get_skill_stats(
     - Total learning time across all skills
     """
     skill_service = SkillService(db)
-    return skill_service.get_user_stats(current_user.id)
+    return await skill_service.get_user_stats(current_user.id)
 
 
 @router.get("/{skill_id}", response_model=SkillWithStats)
 async def get_skill(
     skill_id: int,
     with_stats: bool = Query(True, description="Include statistics"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get a single skill by ID.
@@ -104,15 +112,15 @@ async def get_skill(
     - **with_stats**: Include progress count, last practiced date, and streak
     """
     skill_service = SkillService(db)
-    return skill_service.get_skill(skill_id, current_user.id, with_stats=with_stats)
+    return await skill_service.get_skill(skill_id, current_user.id, with_stats=with_stats)
 
 
 @router.put("/{skill_id}", response_model=SkillResponse)
 async def update_skill(
     skill_id: int,
     skill_data: SkillUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update an existing skill.
@@ -126,14 +134,14 @@ async def update_skill(
     - **status**: New status (active, paused, completed)
     """
     skill_service = SkillService(db)
-    return skill_service.update_skill(skill_id, current_user.id, skill_data)
+    return await skill_service.update_skill(skill_id, current_user.id, skill_data)
 
 
 @router.delete("/{skill_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_skill(
     skill_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Delete a skill.
@@ -141,15 +149,15 @@ async def delete_skill(
     This will also delete all associated progress logs and resources.
     """
     skill_service = SkillService(db)
-    skill_service.delete_skill(skill_id, current_user.id)
+    await skill_service.delete_skill(skill_id, current_user.id)
     return None
 
 
 @router.patch("/bulk-update", response_model=dict)
 async def bulk_update_skills(
     bulk_data: BulkSkillUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Bulk update status for multiple skills.
@@ -161,7 +169,7 @@ async def bulk_update_skills(
         return {"error": "Status is required for bulk update"}
     
     skill_service = SkillService(db)
-    return skill_service.bulk_update_status(
+    return await skill_service.bulk_update_status(
         current_user.id,
         bulk_data.skill_ids,
         bulk_data.status
@@ -1,10 +1,11 @@
 
 from fastapi import APIRouter, Depends, Query, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+import redis.asyncio as aioredis
 from typing import Optional
 from datetime import date
 
-from app.core.dependencies import get_db, get_current_user
+from app.core.dependencies import get_db, get_redis, get_current_user
 from app.services.summary_service import SummaryService
 from app.schemas.summary import (
     SummaryGenerate,
@@ -13,7 +14,7 @@ from app.schemas.summary import (
     SummaryListResponse,
     SummaryStatsResponse
 )
-from app.models.user import User
+from app.core.principal import Principal
 
 router = APIRouter()
 
@@ -21,8 +22,8 @@ router = APIRouter()
 @router.post("/generate", response_model=WeeklySummaryResponse, status_code=status.HTTP_201_CREATED)
 async def generate_weekly_summary(
     summary_data: SummaryGenerate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Generate a weekly summary for a specific week.
@@ -37,7 +38,7 @@ async def generate_weekly_summary(
     - Consistency analysis
     """
     summary_service = SummaryService(db)
-    return summary_service.generate_weekly_summary(
+    return await summary_service.generate_weekly_summary(
         current_user.id,
         summary_data.week_start,
         summary_data.force_regenerate
@@ -50,8 +51,11 @@ async def get_all_summaries(
     month: Optional[int] = Query(None, ge=1, le=12, description="Filter by month"),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="next_cursor from a previous page; replaces page"),
+    include_total: bool = Query(False, description="Include the (cached) total in cursor mode"),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    redis_client: aioredis.Redis = Depends(get_redis)
 ):
     """
     Get all weekly summaries.
@@ -60,22 +64,26 @@ async def get_all_summaries(
     - Year
     - Month
     
-    Returns paginated results ordered by week (most recent first).
+    Returns paginated results ordered by week (most recent first). Pass
+    next_cursor back as cursor to page without OFFSET.
     """
     summary_service = SummaryService(db)
-    return summary_service.get_all_summaries(
+    return await summary_service.get_all_summaries(
         user_id=current_user.id,
         year=year,
         month=month,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        cursor=cursor,
+        include_total=include_total,
+        redis_client=redis_client
     )
 
 
 @router.get("/stats", response_model=SummaryStatsResponse)
 async def get_summary_stats(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get summary statistics.
@@ -86,13 +94,13 @@ async def get_summary_stats(
     - Most productive week
     """
     summary_service = SummaryService(db)
-    return summary_service.get_stats(current_user.id)
+    return await summary_service.get_stats(current_user.id)
 
 
 @router.get("/current-week", response_model=WeeklySummaryWithDetails)
 async def get_current_week_summary(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get or generate summary for the current week.
@@ -104,13 +112,13 @@ async def get_current_week_summary(
     - Average daily time
     """
     summary_service = SummaryService(db)
-    return summary_service.get_current_week_summary(current_user.id)
+    return await summary_service.get_current_week_summary(current_user.id)
 
 
 @router.get("/last-week", response_model=WeeklySummaryWithDetails)
 async def get_last_week_summary(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get or generate summary for last week.
@@ -118,15 +126,15 @@ async def get_last_week_summary(
     Includes detailed breakdown.
     """
     summary_service = SummaryService(db)
-    return summary_service.get_last_week_summary(current_user.id)
+    return await summary_service.get_last_week_summary(current_user.id)
 
 
 @router.get("/{summary_id}", response_model=WeeklySummaryWithDetails)
 async def get_summary(
     summary_id: int,
     with_details: bool = Query(True, description="Include detailed breakdown"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get a single summary by ID.
@@ -134,16 +142,16 @@ async def get_summary(
     - **with_details**: Include skills and daily breakdown
     """
     summary_service = SummaryService(db)
-    return summary_service.get_summary(summary_id, current_user.id, with_details)
+    return await summary_service.get_summary(summary_id, current_user.id, with_details)
 
 
 @router.delete("/{summary_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_summary(
     summary_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a weekly summary."""
     summary_service = SummaryService(db)
-    summary_service.delete_summary(summary_id, current_user.id)
+    await summary_service.delete_summary(summary_id, current_user.id)
     return None
\ No newline at end of file
@@ -1,9 +1,12 @@
 
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.dependencies import get_db, get_current_user
 from app.services.user_service import UserService
+from app.services.export_service import ExportService
 from app.schemas.user import (
     UserProfileUpdate,
     UserEmailUpdate,
@@ -11,28 +14,29 @@ from app.schemas.user import (
     UserDashboardResponse,
     UserStatsResponse
 )
-from app.models.user import User
+from app.schemas.export import ExportFormat, ExportSection
+from app.core.principal import Principal
 
 router = APIRouter()
 
 
 @router.get("/profile", response_model=UserProfileResponse)
 async def get_user_profile(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get current user's profile.
     """
     user_service = UserService(db)
-    return user_service.get_profile(current_user.id)
+    return await user_service.get_profile(current_user.id)
 
 
 @router.put("/profile", response_model=UserProfileResponse)
 async def update_user_profile(
     profile_data: UserProfileUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update user profile.
@@ -41,14 +45,14 @@ async def update_user_profile(
     - **username**: Update username (must be unique)
     """
     user_service = UserService(db)
-    return user_service.update_profile(current_user.id, profile_data)
+    return await user_service.update_profile(current_user.id, profile_data)
 
 
 @router.put("/email", response_model=UserProfileResponse)
 async def update_user_email(
     email_data: UserEmailUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update user email address.
@@ -57,13 +61,13 @@ async def update_user_email(
     Email will need to be verified again.
     """
     user_service = UserService(db)
-    return user_service.update_email(current_user.id, email_data)
+    return await user_service.update_email(current_user.id, email_data)
 
 
 @router.post("/dashboard", response_model=UserDashboardResponse)
 async def get_user_dashboard(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get complete user dashboard.
@@ -76,13 +80,13 @@ async def get_user_dashboard(
     - Current streak
     """
     user_service = UserService(db)
-    return user_service.get_dashboard(current_user.id)
+    return await user_service.get_dashboard(current_user.id)
 
 
 @router.get("/stats", response_model=UserStatsResponse)
 async def get_user_quick_stats(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get quick user statistics.
@@ -90,14 +94,43 @@ async def get_user_quick_stats(
     Returns essential stats for header/navbar display.
     """
     user_service = UserService(db)
-    return user_service.get_quick_stats(current_user.id)
+    return await user_service.get_quick_stats(current_user.id)
+
+
+@router.get("/export")
+async def export_account(
+    format: ExportFormat = Query(ExportFormat.NDJSON, description="ndjson, csv or parquet"),
+    sections: Optional[List[ExportSection]] = Query(None, description="Sections to include (default: all; progress_logs for parquet)"),
+    compress: bool = Query(True, description="gzip the export (ndjson and csv)"),
+    all_users: bool = Query(False, description="Export every user's data (administrators only)"),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Download everything in the account.
+    
+    Streams skills, progress logs, resources and weekly summaries as
+    NDJSON (one object per row, tagged with its section) or CSV (a header
+    row per section), gzipped unless **compress** is false. The export is
+    read from one consistent snapshot.
+    
+    **parquet** writes one section per file, with dates as date32 and skill
+    names and enums dictionary encoded, for loading into pandas or DuckDB.
+    """
+    export_service = ExportService()
+    body = export_service.export_account(current_user.id, format, sections, compress, all_users)
+    filename = export_service.filename(format, sections, compress, all_users)
+    return StreamingResponse(
+        body,
+        media_type=export_service.media_type(format, compress),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 
 @router.post("/deactivate", status_code=status.HTTP_204_NO_CONTENT)
 async def deactivate_account(
     password: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Deactivate user account.
@@ -106,5 +139,5 @@ async def deactivate_account(
     Account can be reactivated by contacting support.
     """
     user_service = UserService(db)
-    user_service.deactivate_account(current_user.id, password)
+    await user_service.deactivate_account(current_user.id, password)
     return None
\ No newline at end of file
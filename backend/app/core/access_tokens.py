@@ -0,0 +1,156 @@
+"""
+Personal access token verification.
+
+A personal access token looks like ``ssp_{key_id}_{secret}``. The key_id is
+public and indexed; the secret is only stored as an HMAC-SHA256 keyed with
+SECRET_KEY. Verifying a token is one HMAC and a constant-time compare, with
+no bcrypt and no refresh flow, so high-frequency integrations stay cheap.
+
+Loaded entries are kept in an in-process LRU for PAT_CACHE_TTL seconds, so
+a busy integration costs one SELECT per worker per TTL, and last_used_at is
+written once per load, only after the secret matched. Unknown key_ids are
+remembered in a separate, smaller LRU, so they cannot push real tokens out;
+a caller cycling random key_ids still costs one indexed SELECT per request,
+but never a write. Revoking a token drops it from this worker immediately
+and from the others within the TTL.
+"""
+import hashlib
+import hmac
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+from app.core.config import settings
+from app.models.access_token import TokenScope
+
+TOKEN_PREFIX = "ssp_"
+
+# Sentinel for "not in the local cache", as opposed to a cached unknown token
+MISSING = object()
+
+
+@dataclass(frozen=True)
+class AccessTokenEntry:
+    """What a worker needs to verify a personal access token."""
+    id: int
+    user_id: int
+    secret_hash: str
+    scopes: FrozenSet[str]
+    expires_at: Optional[datetime]
+
+
+def generate_access_token() -> Tuple[str, str, str]:
+    """Return a new token with its key_id and secret hash; only the token is shown to the user."""
+    key_id = secrets.token_hex(6)
+    secret = secrets.token_urlsafe(32)
+    return f"{TOKEN_PREFIX}{key_id}_{secret}", key_id, hash_secret(secret)
+
+
+def hash_secret(secret: str) -> str:
+    return hmac.new(settings.SECRET_KEY.encode(), secret.encode(), hashlib.sha256).hexdigest()
+
+
+def parse_access_token(token: str) -> Optional[Tuple[str, str]]:
+    """Split a token into key_id and secret, or None if it is not a personal access token."""
+    if not token.startswith(TOKEN_PREFIX):
+        return None
+    key_id, _, secret = token[len(TOKEN_PREFIX):].partition("_")
+    if len(key_id) != 12 or not secret:
+        return None
+    return key_id, secret
+
+
+def required_scope(method: str, path: str) -> Optional[str]:
+    """
+    The scope a request needs, from its API section and method.
+    
+    ``GET /api/v1/progress/...`` needs ``progress:read``, any other method
+    ``progress:write``. Sections without scopes (auth, users) return None
+    and cannot be used with personal access tokens.
+    """
+    section = path.removeprefix("/api/v1/").split("/", 1)[0]
+    action = "read" if method in ("GET", "HEAD") else "write"
+    scope = f"{section}:{action}"
+    return scope if scope in TokenScope._value2member_map_ else None
+
+
+class AccessTokenCache:
+    """In-process LRUs of personal access tokens, and of unknown key_ids, by key_id."""
+    
+    def __init__(
+        self,
+        max_size: int = settings.PAT_CACHE_SIZE,
+        ttl: float = settings.PAT_CACHE_TTL,
+        unknown_max_size: int = settings.PAT_UNKNOWN_CACHE_SIZE
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.unknown_max_size = unknown_max_size
+        self._entries: "OrderedDict[str, Tuple[float, AccessTokenEntry]]" = OrderedDict()
+        self._unknown: "OrderedDict[str, float]" = OrderedDict()
+        
+        # Metrics
+        self._hits = 0
+        self._misses = 0
+        self._rejected = 0
+    
+    def get(self, key_id: str) -> Any:
+        """The cached entry (None for a cached unknown token), or MISSING."""
+        now = time.monotonic()
+        cached = self._entries.get(key_id)
+        if cached is not None and cached[0] >= now:
+            self._entries.move_to_end(key_id)
+            self._hits += 1
+            return cached[1]
+        
+        unknown_until = self._unknown.get(key_id)
+        if unknown_until is not None and unknown_until >= now:
+            self._hits += 1
+            return None
+        
+        self._misses += 1
+        return MISSING
+    
+    def put(self, key_id: str, entry: Optional[AccessTokenEntry]) -> None:
+        if entry is None:
+            self._put(self._unknown, key_id, time.monotonic() + self.ttl, self.unknown_max_size)
+        else:
+            self._put(self._entries, key_id, (time.monotonic() + self.ttl, entry), self.max_size)
+    
+    def invalidate(self, key_id: str) -> None:
+        self._entries.pop(key_id, None)
+        self._unknown.pop(key_id, None)
+    
+    def verify(self, entry: Optional[AccessTokenEntry], secret: str) -> bool:
+        """Check a presented secret against an entry in constant time."""
+        valid = (
+            entry is not None
+            and hmac.compare_digest(entry.secret_hash, hash_secret(secret))
+            and (entry.expires_at is None or entry.expires_at > datetime.now(timezone.utc))
+        )
+        if not valid:
+            self._rejected += 1
+        return valid
+    
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of cache metrics."""
+        lookups = self._hits + self._misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "unknown_size": len(self._unknown),
+            "hits": self._hits,
+            "misses": self._misses,
+            "rejected": self._rejected,
+            "hit_ratio": round(self._hits / lookups, 4) if lookups else None
+        }
+    
+    @staticmethod
+    def _put(entries: OrderedDict, key_id: str, value: Any, max_size: int) -> None:
+        entries[key_id] = value
+        entries.move_to_end(key_id)
+        while len(entries) > max_size:
+            entries.popitem(last=False)
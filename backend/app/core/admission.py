@@ -0,0 +1,176 @@
+"""
+Admission control for login attempts.
+
+Every login runs a bcrypt verify, which is deliberately expensive, so a
+credential flood can pin every worker's CPU. Attempts are admitted before
+any lookup or hashing happens, in two stages:
+
+* an in-flight budget per worker (LOGIN_MAX_IN_FLIGHT); attempts beyond it
+  are shed with 429 straight away instead of queueing for the bcrypt pool
+* sliding-window rate limits per client IP and per account, shared by all
+  workers through Redis; both windows are read and bumped in one pipelined
+  round trip
+
+The windows use the sliding window counter approximation: a counter per
+fixed window, with the previous window's count weighted by how much of it
+still overlaps the sliding window. That is two small keys per client
+instead of a log of every attempt.
+
+If Redis is unavailable the rate limits fail open; the in-flight budget
+still protects the CPU.
+"""
+import hashlib
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+import redis
+import redis.asyncio as aioredis
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SlidingWindow:
+    """Sliding window counter limit over fixed Redis counters."""
+
+    def __init__(self, name: str, limit: int, window: int):
+        self.name = name
+        self.limit = limit
+        self.window = window
+
+    def queue_hit(self, pipe: aioredis.client.Pipeline, identity: str, now: float) -> None:
+        """Count an attempt and fetch the previous window's count."""
+        current = int(now // self.window)
+        pipe.incr(self.key(identity, current))
+        pipe.expire(self.key(identity, current), self.window * 2)
+        pipe.get(self.key(identity, current - 1))
+
+    def retry_after(self, current: int, previous: int, now: float) -> int:
+        """
+        Seconds until the weighted count drops below the limit, or 0 if it already is.
+
+        The count is ``previous * (1 - elapsed / window) + current``.
+        """
+        elapsed = now % self.window
+        if previous * (1 - elapsed / self.window) + current <= self.limit:
+            return 0
+
+        # Within this window, the previous window's weight decays to zero
+        if current <= self.limit and previous:
+            wait = self.window * (1 - (self.limit - current) / previous) - elapsed
+            return max(1, math.ceil(wait))
+
+        # Otherwise wait for this window to become the decaying previous one
+        wait = self.window - elapsed + self.window * (1 - self.limit / current)
+        return max(1, math.ceil(wait))
+
+    def key(self, identity: str, window_index: int) -> str:
+        return f"login_rate:{self.name}:{identity}:{window_index}"
+
+
+class LoginAdmission:
+    """Decides whether a login attempt may run its password check."""
+
+    def __init__(
+        self,
+        redis_client: aioredis.Redis,
+        max_in_flight: int = settings.LOGIN_MAX_IN_FLIGHT,
+        window: int = settings.LOGIN_RATE_WINDOW,
+        ip_limit: int = settings.LOGIN_RATE_LIMIT_PER_IP,
+        account_limit: int = settings.LOGIN_RATE_LIMIT_PER_ACCOUNT
+    ):
+        self.redis = redis_client
+        self.max_in_flight = max_in_flight
+        self.ip_window = SlidingWindow("ip", ip_limit, window)
+        self.account_window = SlidingWindow("account", account_limit, window)
+        self._in_flight = 0
+
+        # Metrics
+        self._admitted = 0
+        self._shed = 0
+        self._throttled_ip = 0
+        self._throttled_account = 0
+        self._fail_open = 0
+
+    @asynccontextmanager
+    async def attempt(self, email: str, ip: Optional[str]):
+        """
+        Hold an admission slot for the duration of one login attempt.
+
+        Raises 429 with Retry-After when the worker is at its in-flight
+        budget or the IP or account is over its rate limit.
+        """
+        if self._in_flight >= self.max_in_flight:
+            self._shed += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many login attempts in progress, please retry shortly",
+                headers={"Retry-After": "1"}
+            )
+
+        # Take the slot before awaiting Redis so concurrent attempts see it
+        self._in_flight += 1
+        try:
+            await self._check_rate(email, ip)
+            self._admitted += 1
+            yield
+        finally:
+            self._in_flight -= 1
+
+    async def _check_rate(self, email: str, ip: Optional[str]) -> None:
+        now = time.time()
+        windows: List[Tuple[SlidingWindow, str]] = [(self.account_window, self.account_id(email))]
+        if ip:
+            windows.append((self.ip_window, ip))
+
+        pipe = self.redis.pipeline(transaction=False)
+        for window, identity in windows:
+            window.queue_hit(pipe, identity, now)
+        try:
+            results = await pipe.execute()
+        except redis.RedisError as exc:
+            self._fail_open += 1
+            logger.warning(f"Login rate limit unavailable, admitting: {exc}")
+            return
+
+        retry_after = 0
+        for index, (window, _) in enumerate(windows):
+            current, _, previous = results[index * 3:index * 3 + 3]
+            wait = window.retry_after(int(current), int(previous or 0), now)
+            if wait:
+                if window is self.ip_window:
+                    self._throttled_ip += 1
+                else:
+                    self._throttled_account += 1
+                retry_after = max(retry_after, wait)
+
+        if retry_after:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many login attempts, please retry later",
+                headers={"Retry-After": str(retry_after)}
+            )
+
+    @staticmethod
+    def account_id(email: str) -> str:
+        # Keys hold a digest rather than the address itself
+        return hashlib.sha256(email.strip().lower().encode()).hexdigest()[:24]
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of admission metrics."""
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self._in_flight,
+            "admitted": self._admitted,
+            "shed": self._shed,
+            "throttled": {
+                "ip": self._throttled_ip,
+                "account": self._throttled_account
+            },
+            "rate_limit_unavailable": self._fail_open
+        }
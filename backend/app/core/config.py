@@ -1,5 +1,5 @@
 
-from typing import List
+from typing import List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import validator
 
@@ -13,9 +13,40 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 30
+    DB_POOL_TIMEOUT: int = 10  # Seconds to wait for a pooled connection
     
     # Redis
     REDIS_URL: str
+    REDIS_MAX_CONNECTIONS: int = 50  # Pooled connections per worker
+    REDIS_POOL_TIMEOUT: float = 1  # Seconds to wait for a pooled connection
+    REDIS_SOCKET_TIMEOUT: float = 0.5  # Seconds a single command may take
+    REDIS_CONNECT_TIMEOUT: float = 0.5
+    REDIS_BREAKER_FAILURES: int = 5  # Consecutive failures before failing fast
+    REDIS_BREAKER_RESET_TIMEOUT: float = 10  # Seconds before retrying Redis
+    REDIS_DEGRADED_AUTH: bool = True  # Authenticate from local state while Redis is down
+    
+    # Celery
+    CELERY_BROKER_URL: Optional[str] = None  # Defaults to REDIS_URL
+    CELERY_RESULT_BACKEND: Optional[str] = None  # Defaults to REDIS_URL
+    
+    # Authenticated principal cache
+    PRINCIPAL_CACHE_SIZE: int = 10000  # Principals kept in each worker's LRU
+    PRINCIPAL_CACHE_LOCAL_TTL: float = 5  # Seconds a worker reuses its local copy
+    PRINCIPAL_CACHE_TTL: int = 300  # Seconds the shared Redis copy lives
+    
+    # Token revocation filter
+    REVOCATION_FILTER_CAPACITY: int = 100000  # Live revoked tokens before the error rate degrades
+    REVOCATION_FILTER_ERROR_RATE: float = 0.001
+    REVOCATION_FILTER_MAX_STALENESS: float = 5  # Seconds without a sync before checking Redis again
+    REVOCATION_FILTER_REBUILD_INTERVAL: int = 3600  # Seconds between rebuilds that drop expired tokens
+    REVOCATION_STREAM_MAXLEN: int = 100000
+    
+    # Personal access tokens
+    PAT_CACHE_SIZE: int = 10000  # Verified tokens kept in each worker
+    PAT_CACHE_TTL: float = 60  # Seconds before a revoked token stops working on other workers
+    PAT_UNKNOWN_CACHE_SIZE: int = 1000  # Unknown key_ids remembered, apart from verified tokens
     
     # JWT
     SECRET_KEY: str
@@ -23,13 +54,44 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     
+    # Administrators
+    ADMIN_USER_IDS: List[int] = []  # Users allowed platform-wide operations, as JSON, e.g. [1, 42]
+    METRICS_TOKEN: str = ""  # Bearer token for GET /metrics; the endpoint is disabled while empty
+    
+    # Password hashing
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64  # Pending bcrypt jobs before returning 503
+    PASSWORD_HASH_ROUNDS: Optional[int] = None  # Pin the bcrypt cost instead of calibrating
+    PASSWORD_HASH_TARGET_MS: float = 250  # Hash time the calibrated cost aims for
+    PASSWORD_HASH_MIN_ROUNDS: int = 10
+    PASSWORD_HASH_MAX_ROUNDS: int = 15
+    PASSWORD_HASH_CALIBRATION_TTL: int = 86400  # Seconds workers share a calibration
+    
+    # Login admission control
+    LOGIN_MAX_IN_FLIGHT: int = 16  # Concurrent login attempts per worker before shedding
+    LOGIN_RATE_WINDOW: int = 60  # Seconds
+    LOGIN_RATE_LIMIT_PER_IP: int = 20  # Attempts per window
+    LOGIN_RATE_LIMIT_PER_ACCOUNT: int = 10
+    
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = ["http://localhost:3000"]
     
     # Pagination
     DEFAULT_PAGE_SIZE: int = 20
     MAX_PAGE_SIZE: int = 100
-
+    LIST_TOTAL_CACHE_TTL: int = 60  # Seconds a cursor-mode list total is reused
+    
+    # Progress imports
+    IMPORT_UPLOAD_DIR: str = "/tmp/skillsync-imports"  # Must be shared by the API and the workers
+    IMPORT_MAX_BYTES: int = 1024 * 1024 * 1024
+    IMPORT_CHUNK_SIZE: int = 1000  # Rows written and committed per transaction
+    IMPORT_MAX_ERRORS: int = 50  # Skipped rows reported on the job
+    
+    # Account exports
+    EXPORT_BATCH_SIZE: int = 1000  # Rows fetched per round trip from the server-side cursor
+    EXPORT_MAX_CONCURRENT: int = 4  # Exports streaming at once per worker; each holds a connection
+    EXPORT_PARQUET_ROW_GROUP_SIZE: int = 64 * 1024  # Rows buffered per Parquet row group
+    
     # OpenRouter API
     OPENROUTER_API_KEY: str = ""
     OPENROUTER_MODEL: str = "anthropic/claude-3.5-sonnet"
@@ -55,6 +117,16 @@ class Settings(BaseSettings):
         if isinstance(v, str):
             return [i.strip() for i in v.split(",")]
         return v
+    
+    @validator("CELERY_BROKER_URL", "CELERY_RESULT_BACKEND", always=True)
+    def default_to_redis_url(cls, v, values):
+        return v or values.get("REDIS_URL")
+    
+    @validator("ADMIN_USER_IDS", pre=True)
+    def assemble_admin_user_ids(cls, v):
+        if isinstance(v, int):
+            return [v]
+        return v
 
 
 # Create settings instance
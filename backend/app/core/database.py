@@ -1,7 +1,11 @@
-
+from typing import Optional
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url, URL
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from app.core.config import settings
 
 # Create database engine
@@ -20,14 +24,73 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+
+def _async_url_and_args(database_url: str) -> tuple[URL, dict]:
+    """
+    Convert a libpq style DATABASE_URL into an asyncpg URL.
+
+    asyncpg does not understand libpq query options such as ``sslmode``,
+    so they are translated into connect args instead.
+    """
+    url = make_url(database_url)
+    query = dict(url.query)
+    connect_args = {}
+
+    sslmode = query.pop("sslmode", None)
+    query.pop("channel_binding", None)
+    if sslmode and sslmode != "disable":
+        connect_args["ssl"] = "require" if sslmode in ("require", "prefer", "allow") else True
+
+    url = url.set(drivername="postgresql+asyncpg", query=query)
+    return url, connect_args
+
+
+ASYNC_DATABASE_URL, ASYNC_CONNECT_ARGS = _async_url_and_args(settings.DATABASE_URL)
+
+# Async engine used by the API request path
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args=ASYNC_CONNECT_ARGS,
+    pool_pre_ping=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    echo=settings.DEBUG
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+# Celery tasks run each job in a fresh event loop, and asyncpg connections
+# are bound to the loop that opened them, so worker sessions are not pooled.
+worker_async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args=ASYNC_CONNECT_ARGS,
+    poolclass=NullPool,
+    echo=settings.DEBUG
+)
+
+WorkerSessionLocal = async_sessionmaker(
+    worker_async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Base class for models
 Base = declarative_base()
 
 
+def violated_constraint(exc: IntegrityError) -> Optional[str]:
+    """Name of the constraint or unique index an IntegrityError violated, as asyncpg reports it."""
+    return getattr(exc.orig.__cause__, "constraint_name", None)
+
+
 # Dependency to get DB session
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
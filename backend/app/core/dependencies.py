@@ -1,45 +1,83 @@
 
-from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+import hmac
+from typing import AsyncGenerator, Optional
+from fastapi import Depends, Header, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import JWTError
 import redis
+import redis.asyncio as aioredis
 
-from app.core.database import SessionLocal
+from app.core.access_tokens import (
+    MISSING,
+    AccessTokenCache,
+    AccessTokenEntry,
+    parse_access_token,
+    required_scope
+)
+from app.core.admission import LoginAdmission
+from app.core.database import AsyncSessionLocal
 from app.core.security import decode_token
 from app.core.config import settings
+from app.core.principal import Principal, PrincipalCache
+from app.core.redis_pool import create_redis
+from app.core.revocation import TokenRevocation
+from app.core.sessions import SessionStore
 from app.models.user import User
+from app.repositories.access_token_repository import AccessTokenRepository
 
 # OAuth2 scheme for token extraction
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
-# Redis connection
-redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+# Pooled Redis client behind a circuit breaker
+redis_client = create_redis()
 
+# Authenticated principals, shared by every request in this worker
+principal_cache = PrincipalCache(redis_client)
 
-def get_db() -> Generator:
+# Revoked token IDs and per-user token generations
+token_revocation = TokenRevocation(redis_client)
+
+# Refresh sessions, one per signed-in device
+session_store = SessionStore(redis_client, token_revocation)
+
+# Login rate limits and in-flight budget
+login_admission = LoginAdmission(redis_client)
+
+# Verified personal access tokens
+access_token_cache = AccessTokenCache()
+
+
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Dependency to get database session."""
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-def get_redis() -> redis.Redis:
+def get_redis() -> aioredis.Redis:
     """Dependency to get Redis client."""
     return redis_client
 
 
 async def get_current_user(
+    request: Request,
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-    redis_conn: redis.Redis = Depends(get_redis)
-) -> User:
+    db: AsyncSession = Depends(get_db),
+    redis_conn: aioredis.Redis = Depends(get_redis)
+) -> Principal:
     """
     Dependency to get current authenticated user.
-    Validates JWT token and checks if it's blacklisted.
+    Validates JWT token and checks if it has been revoked.
+    
+    The user is resolved from the principal cache, so most requests do not
+    touch Postgres; only a miss in both cache tiers SELECTs the user.
+    
+    If Redis is unreachable and REDIS_DEGRADED_AUTH is set, revocation is
+    decided by the local filter alone instead of failing the request.
+    
+    Personal access tokens are accepted too, for the endpoints their
+    scopes cover.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -47,6 +85,10 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    key = parse_access_token(token)
+    if key is not None:
+        return await _authenticate_access_token(request, *key, db, redis_conn)
+    
     # Decode token
     payload = decode_token(token)
     if payload is None:
@@ -60,39 +102,153 @@ async def get_current_user(
             detail="Invalid token type"
         )
     
-    # Check if token is blacklisted
-    if redis_conn.get(f"blacklist:{token}"):
+    # Tokens without a jti and generation cannot be revoked individually
+    if not token_revocation.has_claims(payload):
+        raise credentials_exception
+    user_id = int(payload["sub"])
+    
+    # The local revocation filter clears almost every token. Redis is only
+    # asked on a possible hit, fetching the shared principal in the same
+    # round trip when this worker does not have it.
+    principal = principal_cache.get_local(user_id)
+    reason = token_revocation.filter.check_reason(payload)
+    
+    if reason or principal is None:
+        pipe = redis_conn.pipeline(transaction=False)
+        if reason:
+            token_revocation.queue_check(pipe, payload)
+        if principal is None:
+            pipe.get(principal_cache.key(user_id))
+    
+        try:
+            results = await pipe.execute()
+        except redis.RedisError:
+            if not settings.REDIS_DEGRADED_AUTH:
+                raise
+            revoked = token_revocation.filter.local_verdict(payload)
+        else:
+            if principal is None:
+                principal = principal_cache.load(user_id, results.pop())
+            revoked = token_revocation.is_revoked(payload, *results) if reason else False
+            token_revocation.filter.observe(reason, revoked)
+        
+        if revoked:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked"
+            )
+    
+    if principal is None:
+        principal = await _principal_from_db(user_id, db)
+        if principal is None:
+            raise credentials_exception
+    
+    if not principal.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Inactive user"
+        )
+    
+    return principal
+
+
+async def _principal_from_db(user_id: int, db: AsyncSession) -> Optional[Principal]:
+    """SELECT a principal missing from both cache tiers and cache it."""
+    row = (await db.execute(
+        select(User.id, User.email, User.username, User.is_active).where(User.id == user_id)
+    )).first()
+    if row is None:
+        return None
+    
+    principal = Principal(*row)
+    await principal_cache.store(principal)
+    return principal
+
+
+async def _authenticate_access_token(
+    request: Request,
+    key_id: str,
+    secret: str,
+    db: AsyncSession,
+    redis_conn: aioredis.Redis
+) -> Principal:
+    """Resolve a personal access token, checking its scopes against the request."""
+    entry = access_token_cache.get(key_id)
+    loaded = entry is MISSING
+    if loaded:
+        token = await AccessTokenRepository(db).get_by_key_id(key_id)
+        entry = token and AccessTokenEntry(
+            id=token.id,
+            user_id=token.user_id,
+            secret_hash=token.secret_hash,
+            scopes=frozenset(token.scopes),
+            expires_at=token.expires_at
+        )
+        access_token_cache.put(key_id, entry)
+    
+    if not access_token_cache.verify(entry, secret):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token has been revoked"
+            detail="Invalid access token",
+            headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Get user ID from token
-    user_id: Optional[int] = payload.get("sub")
-    if user_id is None:
-        raise credentials_exception
+    # Only genuine use is recorded, once per load, so last_used_at is
+    # precise to the cache TTL and costs a write per TTL at most
+    if loaded:
+        await AccessTokenRepository(db).touch(entry.id)
+        await db.commit()
     
-    # Fetch user from database
-    user = db.query(User).filter(User.id == int(user_id)).first()
-    if user is None:
-        raise credentials_exception
+    scope = required_scope(request.method, request.url.path)
+    if scope not in entry.scopes:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Access token lacks the {scope} scope" if scope else "Access tokens cannot be used here"
+        )
+    
+    principal = principal_cache.get_local(entry.user_id)
+    if principal is None:
+        try:
+            principal = principal_cache.load(entry.user_id, await redis_conn.get(principal_cache.key(entry.user_id)))
+        except redis.RedisError:
+            principal = None
+    if principal is None:
+        principal = await _principal_from_db(entry.user_id, db)
     
-    if not user.is_active:
+    if principal is None or not principal.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Inactive user"
         )
-    
-    return user
+    return principal
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """Dependency to ensure user is active."""
     if not current_user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Inactive user"
         )
-    return current_user
\ No newline at end of file
+    return current_user
+
+
+def require_metrics_token(authorization: Optional[str] = Header(None)) -> None:
+    """
+    Dependency guarding the metrics endpoint with METRICS_TOKEN.
+    
+    Checked without Redis or the database, so metrics stay readable while
+    either is down. The endpoint answers 404 while no token is configured.
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
@@ -0,0 +1,139 @@
+"""
+Cached authenticated principal.
+
+Most handlers only need the caller's id, plus email, username and active
+flag for a few auth endpoints. Rather than SELECT the full user row on every
+request, `get_current_user` resolves a small `Principal` through two cache
+tiers:
+
+* an in-process LRU with a short TTL, which answers most requests without
+  any round trip; the short TTL bounds how long another worker can serve a
+  principal after it was invalidated elsewhere
+* Redis (``principal:{user_id}``), shared by all workers, so a local miss
+  usually still avoids Postgres
+
+Writes that change these fields (profile, email, password, deactivation)
+call `invalidate`, which drops both tiers for this worker and the Redis
+copy for everyone else.
+"""
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as seen by request handlers."""
+    id: int
+    email: str
+    username: str
+    is_active: bool
+
+
+class PrincipalCache:
+    """In-process LRU of principals backed by Redis."""
+    
+    def __init__(
+        self,
+        redis_client: aioredis.Redis,
+        max_size: int = settings.PRINCIPAL_CACHE_SIZE,
+        local_ttl: float = settings.PRINCIPAL_CACHE_LOCAL_TTL,
+        redis_ttl: int = settings.PRINCIPAL_CACHE_TTL
+    ):
+        self.redis = redis_client
+        self.max_size = max_size
+        self.local_ttl = local_ttl
+        self.redis_ttl = redis_ttl
+        self._local: "OrderedDict[int, Tuple[float, Principal]]" = OrderedDict()
+        
+        # Metrics
+        self._local_hits = 0
+        self._redis_hits = 0
+        self._misses = 0
+        self._invalidations = 0
+    
+    def get_local(self, user_id: int) -> Optional[Principal]:
+        """Look the principal up in this worker's LRU."""
+        entry = self._local.get(user_id)
+        if entry is None:
+            return None
+        
+        expires_at, principal = entry
+        if expires_at < time.monotonic():
+            del self._local[user_id]
+            return None
+        
+        self._local.move_to_end(user_id)
+        self._local_hits += 1
+        return principal
+    
+    def load(self, user_id: int, cached: Optional[str]) -> Optional[Principal]:
+        """
+        Decode the Redis copy fetched by the caller, keeping it locally.
+        
+        The caller reads ``key(user_id)`` in the same round trip as its
+        other Redis lookups, so a local miss costs no extra request.
+        """
+        if cached is None:
+            self._misses += 1
+            return None
+        
+        principal = Principal(**json.loads(cached))
+        self._remember(principal)
+        self._redis_hits += 1
+        return principal
+    
+    async def store(self, principal: Principal) -> None:
+        """Cache a principal read from the database in both tiers."""
+        self._remember(principal)
+        try:
+            await self.redis.setex(self.key(principal.id), self.redis_ttl, json.dumps(asdict(principal)))
+        except redis.RedisError:
+            pass
+    
+    async def invalidate(self, user_id: int) -> None:
+        """
+        Drop a user's cached principal after their account changed.
+        
+        The change is already committed, so a Redis outage must not fail the
+        request; the shared copy then lives out its PRINCIPAL_CACHE_TTL.
+        """
+        self._local.pop(user_id, None)
+        self._invalidations += 1
+        try:
+            await self.redis.delete(self.key(user_id))
+        except redis.RedisError as exc:
+            logger.warning(f"Could not invalidate cached principal {user_id}: {exc}")
+    
+    @staticmethod
+    def key(user_id: int) -> str:
+        return f"principal:{user_id}"
+    
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of cache metrics."""
+        lookups = self._local_hits + self._redis_hits + self._misses
+        return {
+            "size": len(self._local),
+            "max_size": self.max_size,
+            "local_hits": self._local_hits,
+            "redis_hits": self._redis_hits,
+            "misses": self._misses,
+            "invalidations": self._invalidations,
+            "hit_ratio": round((self._local_hits + self._redis_hits) / lookups, 4) if lookups else None
+        }
+    
+    def _remember(self, principal: Principal) -> None:
+        self._local[principal.id] = (time.monotonic() + self.local_ttl, principal)
+        self._local.move_to_end(principal.id)
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
@@ -0,0 +1,151 @@
+"""
+Pooled async Redis client with a circuit breaker.
+
+All request-path Redis traffic goes through one `redis.asyncio` client per
+worker, backed by a `BlockingConnectionPool` with explicit size and
+timeouts, so a slow Redis costs at most REDIS_SOCKET_TIMEOUT per call
+instead of blocking the event loop.
+
+The circuit breaker sits in front of every command and pipeline. After
+REDIS_BREAKER_FAILURES consecutive connection errors or timeouts it opens
+and calls fail immediately with `CircuitOpenError` (a `redis.ConnectionError`,
+so existing fallbacks catch it). After REDIS_BREAKER_RESET_TIMEOUT one trial
+call is let through; if it succeeds the breaker closes again.
+"""
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+import redis
+import redis.asyncio as aioredis
+from redis.asyncio.client import Pipeline
+
+from app.core.config import settings
+
+# Errors that mean Redis is unreachable or too slow, as opposed to a bad command
+UNAVAILABLE_ERRORS = (redis.ConnectionError, redis.TimeoutError, asyncio.TimeoutError)
+
+
+class CircuitOpenError(redis.ConnectionError):
+    """Raised without calling Redis while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open trial."""
+
+    def __init__(
+        self,
+        failure_threshold: int = settings.REDIS_BREAKER_FAILURES,
+        reset_timeout: float = settings.REDIS_BREAKER_RESET_TIMEOUT
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+
+        # Metrics
+        self._opened = 0
+        self._rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def retry_after(self) -> int:
+        """Seconds until the breaker lets a trial call through."""
+        if self._opened_at is None:
+            return 0
+        return max(1, int(self.reset_timeout - (time.monotonic() - self._opened_at)) + 1)
+
+    async def __aenter__(self):
+        state = self.state
+        if state == "open" or (state == "half_open" and self._trial_running):
+            self._rejected += 1
+            raise CircuitOpenError("Redis circuit breaker is open")
+        if state == "half_open":
+            self._trial_running = True
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._trial_running = False
+        if exc_type is not None and issubclass(exc_type, UNAVAILABLE_ERRORS):
+            self._failures += 1
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                # Open, or re-open after a failed trial
+                if self._opened_at is None:
+                    self._opened += 1
+                self._opened_at = time.monotonic()
+        elif exc_type is None or not issubclass(exc_type, asyncio.CancelledError):
+            # Success, or a command error that still proves Redis answered
+            self._failures = 0
+            self._opened_at = None
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of breaker metrics."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "times_opened": self._opened,
+            "rejected_calls": self._rejected
+        }
+
+
+class GuardedPipeline(Pipeline):
+    """Pipeline whose execute goes through the circuit breaker."""
+
+    def __init__(self, breaker: CircuitBreaker, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.breaker = breaker
+
+    async def execute(self, raise_on_error: bool = True):
+        async with self.breaker:
+            return await super().execute(raise_on_error)
+
+
+class GuardedRedis(aioredis.Redis):
+    """Async Redis client whose commands and pipelines go through a circuit breaker."""
+
+    def __init__(self, *args, breaker: CircuitBreaker, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.breaker = breaker
+
+    async def execute_command(self, *args, **options):
+        async with self.breaker:
+            return await super().execute_command(*args, **options)
+
+    def pipeline(self, transaction: bool = True, shard_hint: Optional[str] = None) -> GuardedPipeline:
+        return GuardedPipeline(
+            self.breaker, self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Snapshot of connection pool usage."""
+        pool = self.connection_pool
+        return {
+            "max_connections": pool.max_connections,
+            "in_use": len(pool._in_use_connections),
+            "idle": len(pool._available_connections)
+        }
+
+
+def create_redis() -> GuardedRedis:
+    """Build the worker's pooled, breaker-guarded Redis client."""
+    pool = aioredis.BlockingConnectionPool.from_url(
+        settings.REDIS_URL,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        timeout=settings.REDIS_POOL_TIMEOUT,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+        health_check_interval=30,
+        decode_responses=True
+    )
+    client = GuardedRedis(connection_pool=pool, breaker=CircuitBreaker())
+    # The client owns the pool, so closing it on shutdown disconnects everything
+    client.auto_close_connection_pool = True
+    return client
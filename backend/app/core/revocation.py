@@ -0,0 +1,361 @@
+"""
+Token revocation by jti and per-user token generation.
+
+Every token carries a random ``jti`` and the ``gen`` (generation) of its user
+at issue time. A token is revoked when either:
+
+* its jti is in the revoked set for the hour it expires in
+  (``revoked:{exp // 3600}``), which covers single-token revocation such as
+  logout or refresh token rotation; each hourly set expires once every token
+  it could hold has expired, so the sets clean themselves up
+* its gen no longer matches ``token_gen:{user_id}``, which is bumped to
+  revoke every outstanding token of a user at once (logout everywhere,
+  password change)
+
+A revoked token costs one ~16 byte set member instead of a Redis key
+holding the whole JWT.
+
+Almost every token checked is not revoked, so each API worker also keeps a
+`RevocationFilter`: a Bloom filter of revoked jtis plus the generations that
+were ever bumped, kept current by tailing the ``revocations`` stream that
+every revocation is appended to. Redis is only asked when the filter
+reports a possible hit, or when the filter has not heard from Redis within
+REVOCATION_FILTER_MAX_STALENESS seconds.
+
+If Redis is unreachable, `local_verdict` answers from the filter alone so
+authentication keeps working in a degraded mode (see REDIS_DEGRADED_AUTH).
+"""
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from typing import Any, Dict, Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+BUCKET_SECONDS = 3600
+STREAM_KEY = "revocations"
+
+# Bumps a user's generation and announces it on the stream in one step, so
+# no worker can miss a bump that took effect; returns the new generation
+REVOKE_ALL_SCRIPT = """
+local generation = redis.call('INCR', KEYS[1])
+redis.call('XADD', KEYS[2], 'MAXLEN', '~', ARGV[2], '*', 'user', ARGV[1], 'gen', generation)
+return generation
+"""
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings."""
+    
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+    
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+    
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+    
+    def expected_error_rate(self) -> float:
+        """False-positive probability for the number of items added so far."""
+        return (1 - math.exp(-self.hashes * self.count / self.size)) ** self.hashes
+    
+    def _positions(self, item: str):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * step) % self.size for i in range(self.hashes))
+
+
+class RevocationFilter:
+    """Per-worker view of revoked tokens, synced from the revocations stream."""
+    
+    def __init__(
+        self,
+        capacity: int = settings.REVOCATION_FILTER_CAPACITY,
+        error_rate: float = settings.REVOCATION_FILTER_ERROR_RATE,
+        max_staleness: float = settings.REVOCATION_FILTER_MAX_STALENESS,
+        rebuild_interval: float = settings.REVOCATION_FILTER_REBUILD_INTERVAL
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.max_staleness = max_staleness
+        self.rebuild_interval = rebuild_interval
+        
+        self._filter = BloomFilter(capacity, error_rate)
+        self._generations: Dict[int, int] = {}
+        self._last_id = "0-0"
+        self._synced_at: Optional[float] = None
+        self._needs_resync = True
+        self._rebuilt_at = 0.0
+        self._redis: Optional[aioredis.Redis] = None
+        self._task: Optional[asyncio.Task] = None
+        
+        # Metrics
+        self._lookups = 0
+        self._stale_checks = 0
+        self._generation_checks = 0
+        self._filter_positives = 0
+        self._false_positives = 0
+        self._events = 0
+        self._last_event_lag_ms: Optional[float] = None
+        self._max_event_lag_ms = 0.0
+        self._rebuilds = 0
+        self._degraded_checks = 0
+    
+    def check_reason(self, payload: Dict[str, Any]) -> Optional[str]:
+        """
+        Why Redis must be asked about a token, or None if it is not revoked.
+        
+        Returns "stale" when the filter is not synced, "generation" when the
+        token's gen differs from the last known one, and "filter" when the
+        Bloom filter may contain its jti.
+        """
+        self._lookups += 1
+        if not self.is_fresh():
+            self._stale_checks += 1
+            return "stale"
+        
+        if payload["gen"] != self._generations.get(int(payload["sub"]), 0):
+            self._generation_checks += 1
+            return "generation"
+        
+        if payload["jti"] in self._filter:
+            self._filter_positives += 1
+            return "filter"
+        return None
+    
+    def observe(self, reason: Optional[str], revoked: bool) -> None:
+        """Record what Redis said after a filter hit, for the false-positive rate."""
+        if reason == "filter" and not revoked:
+            self._false_positives += 1
+    
+    def local_verdict(self, payload: Dict[str, Any]) -> bool:
+        """
+        Decide revocation from this worker's state alone, for when Redis is down.
+        
+        The filter may be behind by however long Redis has been unreachable,
+        and a false positive rejects a valid token; both are accepted in
+        exchange for not failing every request. A gen above the last known
+        one means the filter missed a bump, not that the token is revoked.
+        """
+        self._degraded_checks += 1
+        if payload["gen"] < self._generations.get(int(payload["sub"]), 0):
+            return True
+        return payload["jti"] in self._filter
+    
+    def is_fresh(self) -> bool:
+        return self._synced_at is not None and time.monotonic() - self._synced_at <= self.max_staleness
+    
+    def add_jti(self, jti: str) -> None:
+        self._filter.add(jti)
+    
+    def set_generation(self, user_id: int, generation: int) -> None:
+        # Generations only move forward; a late event must not undo a bump
+        if generation > self._generations.get(user_id, 0):
+            self._generations[user_id] = generation
+    
+    async def start(self) -> None:
+        """
+        Start syncing in the background.
+        
+        Until the first sync completes the filter is stale, so every token
+        is checked in Redis as before.
+        """
+        self._redis = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._redis:
+            await self._redis.aclose()
+    
+    async def _run(self) -> None:
+        while True:
+            try:
+                if self._needs_resync or time.monotonic() - self._rebuilt_at >= self.rebuild_interval:
+                    # Periodic rebuilds drop jtis of tokens that have expired
+                    await self._rebuild(from_stream_end=self._needs_resync)
+                    self._needs_resync = False
+                
+                response = await self._redis.xread(
+                    {STREAM_KEY: self._last_id},
+                    count=1000,
+                    block=int(min(self.max_staleness / 2, 1) * 1000)
+                )
+                for _, events in response:
+                    for event_id, fields in events:
+                        self._apply(event_id, fields)
+                self._synced_at = time.monotonic()
+            
+            except asyncio.CancelledError:
+                raise
+            except redis.RedisError as exc:
+                # The stream may have been trimmed past our position while we
+                # were disconnected, so resync from scratch once Redis is back
+                logger.warning(f"Revocation filter sync failed: {exc}")
+                self._needs_resync = True
+                await asyncio.sleep(1)
+    
+    def _apply(self, event_id: str, fields: Dict[str, str]) -> None:
+        if "jti" in fields:
+            self.add_jti(fields["jti"])
+        elif "user" in fields:
+            self.set_generation(int(fields["user"]), int(fields["gen"]))
+        
+        self._last_id = event_id
+        self._events += 1
+        lag_ms = time.time() * 1000 - int(event_id.split("-")[0])
+        self._last_event_lag_ms = lag_ms
+        self._max_event_lag_ms = max(self._max_event_lag_ms, lag_ms)
+    
+    async def _rebuild(self, from_stream_end: bool) -> None:
+        """
+        Rebuild the filter from the revoked sets and generation keys.
+        
+        On bootstrap, tailing starts from the stream end as of before the
+        scan, so revocations made during the scan are applied again rather
+        than missed. Later rebuilds keep the current position; events since
+        then are replayed onto the new filter.
+        """
+        if from_stream_end:
+            latest = await self._redis.xrevrange(STREAM_KEY, count=1)
+            self._last_id = latest[0][0] if latest else "0-0"
+        
+        bloom = BloomFilter(self.capacity, self.error_rate)
+        async for key in self._redis.scan_iter(match="revoked:*", count=500):
+            for jti in await self._redis.smembers(key):
+                bloom.add(jti)
+        
+        generations = {}
+        async for key in self._redis.scan_iter(match="token_gen:*", count=500):
+            value = await self._redis.get(key)
+            if value is not None:
+                generations[int(key.split(":", 1)[1])] = int(value)
+        
+        self._filter = bloom
+        self._generations = generations
+        self._rebuilt_at = time.monotonic()
+        self._rebuilds += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of filter and sync metrics."""
+        negatives = self._lookups - self._stale_checks - self._generation_checks - (
+            self._filter_positives - self._false_positives
+        )
+        return {
+            "items": self._filter.count,
+            "capacity": self.capacity,
+            "size_bytes": len(self._filter.bits),
+            "expected_false_positive_rate": round(self._filter.expected_error_rate(), 6),
+            "observed_false_positive_rate": round(self._false_positives / negatives, 6) if negatives > 0 else None,
+            "lookups": self._lookups,
+            "redis_checks": {
+                "stale": self._stale_checks,
+                "generation": self._generation_checks,
+                "filter": self._filter_positives
+            },
+            "false_positives": self._false_positives,
+            "tracked_generations": len(self._generations),
+            "synced": self.is_fresh(),
+            "staleness_seconds": round(time.monotonic() - self._synced_at, 3) if self._synced_at else None,
+            "events_applied": self._events,
+            "last_event_lag_ms": round(self._last_event_lag_ms, 1) if self._last_event_lag_ms is not None else None,
+            "max_event_lag_ms": round(self._max_event_lag_ms, 1),
+            "rebuilds": self._rebuilds,
+            "degraded_checks": self._degraded_checks
+        }
+
+
+class TokenRevocation:
+    """Redis-backed revocation state for access and refresh tokens."""
+    
+    def __init__(self, redis_client: aioredis.Redis):
+        self.redis = redis_client
+        self.filter = RevocationFilter()
+        self._revoke_all = redis_client.register_script(REVOKE_ALL_SCRIPT)
+    
+    async def generation(self, user_id: int) -> int:
+        """Current token generation of a user, stamped into new tokens."""
+        return int(await self.redis.get(self.generation_key(user_id)) or 0)
+    
+    async def revoke(self, payload: Dict[str, Any]) -> None:
+        """Revoke a single token until it expires."""
+        pipe = self.redis.pipeline(transaction=False)
+        self.queue_revoke(pipe, payload)
+        await pipe.execute()
+    
+    def queue_revoke(self, pipe: aioredis.client.Pipeline, payload: Dict[str, Any]) -> None:
+        """
+        Add the writes revoking a token to a pipeline.
+        
+        Callers revoking several tokens, or updating other keys at the same
+        time, send everything in one round trip.
+        """
+        bucket = self.bucket_key(payload["exp"])
+        pipe.sadd(bucket, payload["jti"])
+        pipe.expireat(bucket, (payload["exp"] // BUCKET_SECONDS + 1) * BUCKET_SECONDS)
+        self._publish(pipe, {"jti": payload["jti"]})
+        
+        # Other workers pick this up from the stream; this one knows now
+        self.filter.add_jti(payload["jti"])
+    
+    async def revoke_all(self, user_id: int) -> int:
+        """Revoke every outstanding token of a user by bumping their generation."""
+        generation = int(await self._revoke_all(
+            keys=[self.generation_key(user_id), STREAM_KEY],
+            args=[user_id, settings.REVOCATION_STREAM_MAXLEN]
+        ))
+        
+        self.filter.set_generation(user_id, generation)
+        return generation
+    
+    def queue_check(self, pipe: aioredis.client.Pipeline, payload: Dict[str, Any]) -> None:
+        """
+        Add the lookups for `is_revoked` to a pipeline.
+        
+        Callers batch these with their other Redis reads so the check does
+        not cost a round trip of its own.
+        """
+        pipe.sismember(self.bucket_key(payload["exp"]), payload["jti"])
+        pipe.get(self.generation_key(int(payload["sub"])))
+    
+    @staticmethod
+    def is_revoked(payload: Dict[str, Any], listed: Any, generation: Optional[str]) -> bool:
+        """Decide from the two results queued by `queue_check`."""
+        return bool(listed) or payload.get("gen") != int(generation or 0)
+    
+    @staticmethod
+    def has_claims(payload: Dict[str, Any]) -> bool:
+        """Whether a decoded token carries the claims revocation relies on."""
+        return all(key in payload for key in ("sub", "exp", "jti", "gen"))
+    
+    @staticmethod
+    def _publish(pipe: aioredis.client.Pipeline, event: Dict[str, Any]) -> None:
+        pipe.xadd(STREAM_KEY, event, maxlen=settings.REVOCATION_STREAM_MAXLEN, approximate=True)
+    
+    @staticmethod
+    def bucket_key(exp: int) -> str:
+        return f"revoked:{exp // BUCKET_SECONDS}"
+    
+    @staticmethod
+    def generation_key(user_id: int) -> str:
+        return f"token_gen:{user_id}"
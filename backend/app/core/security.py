@@ -248,9 +248,16 @@
 
 
 
+import asyncio
+import secrets
+import time
 import bcrypt
+import redis
+import redis.asyncio as aioredis
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable
+from fastapi import HTTPException, status
 from jose import JWTError, jwt
 from app.core.config import settings
 # ---------------- PASSWORD UTILS ---------------- #
@@ -266,8 +273,8 @@ def get_password_hash(password: str) -> str:
     if isinstance(password, str):
         password = password.encode('utf-8')
     
-    # Hash the password with a randomly-generated salt
-    hashed = bcrypt.hashpw(password, bcrypt.gensalt())
+    # Hash the password with a randomly-generated salt at the calibrated cost
+    hashed = bcrypt.hashpw(password, bcrypt.gensalt(rounds=bcrypt_cost.rounds))
     return hashed.decode('utf-8')
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a bcrypt hash."""
@@ -276,6 +283,174 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     if isinstance(hashed_password, str):
         hashed_password = hashed_password.encode('utf-8')
     return bcrypt.checkpw(plain_password, hashed_password)
+# ---------------- HASHING POOL ---------------- #
+class PasswordHashPool:
+    """
+    Bounded thread pool for bcrypt work.
+    
+    bcrypt releases the GIL while hashing, so a small thread pool keeps the
+    event loop free without the pickling overhead of a process pool. Once
+    `max_workers + max_queue` operations are in flight, new ones are rejected
+    with 503 so a login storm queues up instead of stalling the worker.
+    """
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_seconds = 0.0
+        self._run_seconds = 0.0
+    
+    @staticmethod
+    def _timed(func: Callable, *args):
+        started = time.perf_counter()
+        return started, func(*args)
+    
+    async def run(self, func: Callable, *args):
+        """Run a bcrypt call on the pool, rejecting it if the queue is full."""
+        if self._in_flight >= self.max_workers + self.max_queue:
+            self._rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many authentication requests, please retry shortly",
+                headers={"Retry-After": "1"}
+            )
+        
+        self._in_flight += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        submitted = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            started, result = await loop.run_in_executor(self._executor, self._timed, func, *args)
+        finally:
+            self._in_flight -= 1
+        
+        self._completed += 1
+        self._wait_seconds += started - submitted
+        self._run_seconds += time.perf_counter() - started
+        return result
+    
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool metrics."""
+        completed = self._completed or 1
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "queued": max(self._in_flight - self.max_workers, 0),
+            "peak_in_flight": self._peak_in_flight,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "avg_wait_ms": round(self._wait_seconds / completed * 1000, 2),
+            "avg_run_ms": round(self._run_seconds / completed * 1000, 2)
+        }
+    
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+password_hash_pool = PasswordHashPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE
+)
+# ---------------- HASH COST ---------------- #
+class BcryptCost:
+    """
+    bcrypt work factor used for new hashes.
+    
+    Unless PASSWORD_HASH_ROUNDS pins it, the cost is calibrated at startup
+    to the highest value whose hash time stays within
+    PASSWORD_HASH_TARGET_MS on this CPU. The first worker to calibrate
+    shares its result through Redis for PASSWORD_HASH_CALIBRATION_TTL, so
+    all workers hash at the same cost and logins do not rehash back and
+    forth between them. Stored hashes at another cost are rehashed on the
+    next successful login.
+    """
+    REDIS_KEY = "bcrypt:rounds"
+    def __init__(
+        self,
+        rounds: Optional[int] = settings.PASSWORD_HASH_ROUNDS,
+        target_ms: float = settings.PASSWORD_HASH_TARGET_MS,
+        min_rounds: int = settings.PASSWORD_HASH_MIN_ROUNDS,
+        max_rounds: int = settings.PASSWORD_HASH_MAX_ROUNDS
+    ):
+        self.pinned = rounds is not None
+        self.rounds = rounds if rounds is not None else 12  # bcrypt's own default until calibrated
+        self.target_ms = target_ms
+        self.min_rounds = min_rounds
+        self.max_rounds = max_rounds
+        self.source = "pinned" if self.pinned else "default"
+        self.measured_ms: Optional[float] = None
+        self._rehashed = 0
+    def calibrate(self) -> int:
+        """
+        Measure this CPU and return the cost that fits the target hash time.
+        
+        Each extra round doubles the work, so one measurement at the minimum
+        cost predicts the rest; the chosen cost is then measured once.
+        """
+        base = min(self._time_hash(self.min_rounds) for _ in range(3))
+        rounds, predicted = self.min_rounds, base
+        while rounds < self.max_rounds and predicted * 2 <= self.target_ms:
+            rounds += 1
+            predicted *= 2
+        self.measured_ms = round(self._time_hash(rounds), 1)
+        return rounds
+    @staticmethod
+    def _time_hash(rounds: int) -> float:
+        started = time.perf_counter()
+        bcrypt.hashpw(b"calibration", bcrypt.gensalt(rounds=rounds))
+        return (time.perf_counter() - started) * 1000
+    async def configure(self, redis_client: aioredis.Redis) -> None:
+        """Adopt the cost shared by other workers, or calibrate and share it."""
+        if self.pinned:
+            return
+        try:
+            shared = await redis_client.get(self.REDIS_KEY)
+        except redis.RedisError:
+            shared = None
+        if shared is not None:
+            self.rounds, self.source = int(shared), "shared"
+            return
+        self.rounds = await password_hash_pool.run(self.calibrate)
+        self.source = "calibrated"
+        try:
+            # Another worker may have won the race; everyone uses the stored value
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.set(self.REDIS_KEY, self.rounds, ex=settings.PASSWORD_HASH_CALIBRATION_TTL, nx=True)
+            pipe.get(self.REDIS_KEY)
+            _, shared = await pipe.execute()
+            if shared is not None and int(shared) != self.rounds:
+                self.rounds, self.source = int(shared), "shared"
+        except redis.RedisError:
+            pass
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """Whether a stored hash was made at a different cost than the current one."""
+        try:
+            return int(hashed_password.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return False
+    def record_rehash(self) -> None:
+        self._rehashed += 1
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of the hash cost settings."""
+        return {
+            "rounds": self.rounds,
+            "source": self.source,
+            "target_ms": self.target_ms,
+            "measured_ms": self.measured_ms,
+            "rehashed_on_login": self._rehashed
+        }
+bcrypt_cost = BcryptCost()
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the bounded bcrypt pool."""
+    if not password:
+        raise ValueError("Password cannot be empty")
+    return await password_hash_pool.run(get_password_hash, password)
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the bounded bcrypt pool."""
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
 # ---------------- JWT UTILS ---------------- #
 def create_access_token(
     data: Dict[str, Any],
@@ -290,7 +465,8 @@ def create_access_token(
     )
     to_encode.update({
         "exp": expire,
-        "type": "access"
+        "type": "access",
+        "jti": new_token_id()
     })
     return jwt.encode(
         to_encode,
@@ -305,13 +481,17 @@ def create_refresh_token(data: Dict[str, Any]) -> str:
     )
     to_encode.update({
         "exp": expire,
-        "type": "refresh"
+        "type": "refresh",
+        "jti": new_token_id()
     })
     return jwt.encode(
         to_encode,
         settings.SECRET_KEY,
         algorithm=settings.ALGORITHM
     )
+def new_token_id() -> str:
+    """Random 96-bit token ID (jti), 16 URL-safe characters."""
+    return secrets.token_urlsafe(12)
 def decode_token(token: str) -> Optional[Dict[str, Any]]:
     """Decode and verify JWT token."""
     try:
@@ -0,0 +1,162 @@
+"""
+Refresh sessions, one per signed-in device.
+
+Each user has a Redis hash ``sessions:{user_id}`` mapping a session id to a
+small JSON entry: the jti of the session's current refresh token, the jti
+and expiry of the last access token issued to it, the device and IP it was
+last used from, and its created/last-seen/expiry times. Both tokens carry
+the session id as ``sid``.
+
+Refreshing rotates the entry in a single Lua script that checks the token
+generation and the presented refresh jti and writes the new jtis, so a
+refresh costs one round trip however many sessions the user has, and two
+concurrent refreshes with the same token cannot both succeed.
+"""
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+from app.core.revocation import TokenRevocation
+from app.core.security import new_token_id
+
+# Returns "ok", "revoked" when the user's token generation moved on, or
+# "missing" when the session is gone or its refresh token was already rotated
+ROTATE_SCRIPT = """
+local generation = tonumber(redis.call('GET', KEYS[2]) or '0')
+if generation ~= tonumber(ARGV[3]) then
+    return 'revoked'
+end
+
+local raw = redis.call('HGET', KEYS[1], ARGV[1])
+if not raw then
+    return 'missing'
+end
+local session = cjson.decode(raw)
+if session.jti ~= ARGV[2] then
+    return 'missing'
+end
+
+session.jti = ARGV[4]
+session.expires_at = tonumber(ARGV[5])
+session.access_jti = ARGV[6]
+session.access_exp = tonumber(ARGV[7])
+session.last_seen = tonumber(ARGV[8])
+session.ip = ARGV[9]
+redis.call('HSET', KEYS[1], ARGV[1], cjson.encode(session))
+redis.call('EXPIRE', KEYS[1], ARGV[10])
+return 'ok'
+"""
+
+MAX_DEVICE_LENGTH = 200
+
+
+class SessionStore:
+    """Redis-backed refresh sessions of every user."""
+    
+    def __init__(self, redis_client: aioredis.Redis, revocation: TokenRevocation):
+        self.redis = redis_client
+        self.revocation = revocation
+        self.ttl = settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+        self._rotate = redis_client.register_script(ROTATE_SCRIPT)
+    
+    @staticmethod
+    def new_session_id() -> str:
+        return new_token_id()
+    
+    def queue_create(
+        self,
+        pipe: aioredis.client.Pipeline,
+        user_id: int,
+        session_id: str,
+        refresh: Dict[str, Any],
+        access: Dict[str, Any],
+        device: Optional[str],
+        ip: Optional[str]
+    ) -> None:
+        """Add the writes creating a session for freshly issued tokens to a pipeline."""
+        now = int(time.time())
+        entry = {
+            "jti": refresh["jti"],
+            "expires_at": refresh["exp"],
+            "access_jti": access["jti"],
+            "access_exp": access["exp"],
+            "device": device[:MAX_DEVICE_LENGTH] if device else None,
+            "ip": ip,
+            "created_at": now,
+            "last_seen": now
+        }
+        pipe.hset(self.key(user_id), session_id, json.dumps(entry))
+        pipe.expire(self.key(user_id), self.ttl)
+    
+    async def rotate(
+        self,
+        payload: Dict[str, Any],
+        refresh: Dict[str, Any],
+        access: Dict[str, Any],
+        ip: Optional[str]
+    ) -> str:
+        """
+        Swap a session's refresh token for a new one in one round trip.
+        
+        `payload` is the presented refresh token, `refresh` and `access` the
+        claims of the new tokens. Returns "ok", "revoked" or "missing".
+        """
+        user_id = int(payload["sub"])
+        return await self._rotate(
+            keys=[self.key(user_id), self.revocation.generation_key(user_id)],
+            args=[
+                payload["sid"], payload["jti"], payload["gen"],
+                refresh["jti"], refresh["exp"], access["jti"], access["exp"],
+                int(time.time()), ip or "", self.ttl
+            ]
+        )
+    
+    async def list(self, user_id: int) -> List[Dict[str, Any]]:
+        """A user's live sessions, most recently used first. Expired ones are dropped."""
+        now = int(time.time())
+        sessions, expired = [], []
+        for session_id, raw in (await self.redis.hgetall(self.key(user_id))).items():
+            entry = json.loads(raw)
+            if entry["expires_at"] <= now:
+                expired.append(session_id)
+            else:
+                sessions.append({"id": session_id, **entry})
+        
+        if expired:
+            await self.redis.hdel(self.key(user_id), *expired)
+        
+        return sorted(sessions, key=lambda session: session["last_seen"], reverse=True)
+    
+    async def revoke(self, user_id: int, session_id: str) -> bool:
+        """End one session and revoke its last access token. False if it does not exist."""
+        raw = await self.redis.hget(self.key(user_id), session_id)
+        if raw is None:
+            return False
+        
+        entry = json.loads(raw)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hdel(self.key(user_id), session_id)
+        if entry.get("access_exp", 0) > time.time():
+            self.revocation.queue_revoke(pipe, {"jti": entry["access_jti"], "exp": entry["access_exp"]})
+        await pipe.execute()
+        return True
+    
+    def queue_end(self, pipe: aioredis.client.Pipeline, user_id: int, session_id: str) -> None:
+        """Add the write ending a session to a pipeline, for logout."""
+        pipe.hdel(self.key(user_id), session_id)
+    
+    async def end_all(self, user_id: int) -> None:
+        """End every session of a user, so none of their refresh tokens work."""
+        await self.redis.delete(self.key(user_id))
+    
+    async def revoke_all(self, user_id: int) -> None:
+        """End every session of a user and revoke all their outstanding tokens."""
+        await self.revocation.revoke_all(user_id)
+        await self.end_all(user_id)
+    
+    @staticmethod
+    def key(user_id: int) -> str:
+        return f"sessions:{user_id}"
@@ -0,0 +1,45 @@
+"""
+Queueing Celery tasks from the API.
+
+The API sends tasks by name through a bare Celery client, built on first
+use, rather than importing the Celery app in app.tasks, which would load
+every task module and the worker's settings into each web worker.
+"""
+from typing import Any, Optional
+
+from celery import Celery
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+# Shared with the worker app, so tasks sent from either land on the same queue
+TASK_ROUTES = {
+    'app.tasks.weekly_summary.*': {'queue': 'summaries'},
+    'app.tasks.reconcile.*': {'queue': 'maintenance'},
+    'app.tasks.purge.*': {'queue': 'maintenance'},
+    'app.tasks.imports.*': {'queue': 'imports'},
+}
+
+_client: Optional[Celery] = None
+
+
+def _get_client() -> Celery:
+    global _client
+    if _client is None:
+        _client = Celery(
+            'skilltracker',
+            broker=settings.CELERY_BROKER_URL,
+            backend=settings.CELERY_RESULT_BACKEND
+        )
+        _client.conf.task_routes = TASK_ROUTES
+    return _client
+
+
+async def enqueue(name: str, *args: Any) -> None:
+    """
+    Queue the task called `name` with positional `args`.
+
+    Publishing blocks on the broker, so it runs in the threadpool; any error
+    reaching the broker is raised to the caller.
+    """
+    await run_in_threadpool(_get_client().send_task, name, args=list(args))
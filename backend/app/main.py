@@ -1,7 +1,18 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+import redis
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import async_engine, Base
+from app.core.security import bcrypt_cost, password_hash_pool
+from app.core.dependencies import (
+    access_token_cache,
+    login_admission,
+    principal_cache,
+    redis_client,
+    require_metrics_token,
+    token_revocation
+)
 
 # Create FastAPI app
 app = FastAPI(
@@ -23,10 +34,23 @@ app.add_middleware(
 )
 
 
+@app.exception_handler(redis.RedisError)
+async def redis_unavailable_handler(request: Request, exc: redis.RedisError):
+    """Answer 503 when a request needs Redis and it is down or the breaker is open."""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Service temporarily unavailable"},
+        headers={"Retry-After": str(max(redis_client.breaker.retry_after(), 1))}
+    )
+
+
 @app.on_event("startup")
 async def startup_event():
     """Create database tables on startup."""
-    Base.metadata.create_all(bind=engine)
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await token_revocation.filter.start()
+    await bcrypt_cost.configure(redis_client)
     print(f"🚀 {settings.APP_NAME} v{settings.APP_VERSION} started")
     print(f"📚 Docs: http://localhost:8000/api/docs")
 
@@ -34,6 +58,10 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown."""
+    await token_revocation.filter.stop()
+    await redis_client.aclose()
+    await async_engine.dispose()
+    password_hash_pool.shutdown()
     print(f"👋 {settings.APP_NAME} shutting down")
 
 
@@ -58,12 +86,31 @@ async def health_check():
     }
 
 
+@app.get("/metrics", dependencies=[Depends(require_metrics_token)], include_in_schema=False)
+async def metrics():
+    """Runtime metrics for the worker process; needs METRICS_TOKEN as a bearer token."""
+    return {
+        "password_hashing": password_hash_pool.stats(),
+        "password_hash_cost": bcrypt_cost.stats(),
+        "login_admission": login_admission.stats(),
+        "principal_cache": principal_cache.stats(),
+        "access_token_cache": access_token_cache.stats(),
+        "revocation_filter": token_revocation.filter.stats(),
+        "redis": {
+            "pool": redis_client.pool_stats(),
+            "circuit_breaker": redis_client.breaker.stats()
+        }
+    }
+
+
 # Include routers
-from app.api.v1 import auth, skills, progress, resources, user, summaries
+from app.api.v1 import auth, access_tokens, skills, progress, resources, user, summaries, imports
 
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["Authentication"])
+app.include_router(access_tokens.router, prefix="/api/v1/auth/tokens", tags=["Personal Access Tokens"])
 app.include_router(skills.router, prefix="/api/v1/skills", tags=["Skills"])
 app.include_router(progress.router, prefix="/api/v1/progress", tags=["Progress"])
 app.include_router(resources.router, prefix="/api/v1/resources", tags=["Resources"])
 app.include_router(user.router, prefix="/api/v1/users", tags=["Users"])
-app.include_router(summaries.router, prefix="/api/v1/summaries", tags=["Weekly Summaries"])
\ No newline at end of file
+app.include_router(summaries.router, prefix="/api/v1/summaries", tags=["Weekly Summaries"])
+app.include_router(imports.router, prefix="/api/v1/imports", tags=["Imports"])
\ No newline at end of file
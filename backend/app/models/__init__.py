@@ -4,6 +4,10 @@ from app.models.skill import Skill, SkillLevel, SkillStatus
 from app.models.resource import Resource, ResourceType
 from app.models.progress import ProgressLog
 from app.models.summary import WeeklySummary
+from app.models.streak import StreakState
+from app.models.rollup import ProgressDailyRollup
+from app.models.access_token import PersonalAccessToken, TokenScope
+from app.models.import_job import ImportJob, ImportFormat, ImportStatus
 
 __all__ = [
     "User",
@@ -14,4 +18,11 @@ __all__ = [
     "ResourceType",
     "ProgressLog",
     "WeeklySummary",
+    "StreakState",
+    "ProgressDailyRollup",
+    "PersonalAccessToken",
+    "TokenScope",
+    "ImportJob",
+    "ImportFormat",
+    "ImportStatus",
 ]
\ No newline at end of file
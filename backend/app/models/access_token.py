@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.sql import func
+import enum
+from app.core.database import Base
+
+
+class TokenScope(str, enum.Enum):
+    PROGRESS_READ = "progress:read"
+    PROGRESS_WRITE = "progress:write"
+    SKILLS_READ = "skills:read"
+    SKILLS_WRITE = "skills:write"
+    RESOURCES_READ = "resources:read"
+    RESOURCES_WRITE = "resources:write"
+    SUMMARIES_READ = "summaries:read"
+    SUMMARIES_WRITE = "summaries:write"
+
+
+class PersonalAccessToken(Base):
+    """
+    Long-lived, scoped API token for scripts and integrations.
+    
+    The token is ``ssp_{key_id}_{secret}``. Only the public key_id and an
+    HMAC of the secret are stored, so a database leak does not leak usable
+    tokens.
+    """
+    __tablename__ = "personal_access_tokens"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    name = Column(String(100), nullable=False)
+    key_id = Column(String(16), nullable=False, unique=True)
+    secret_hash = Column(String(64), nullable=False)
+    scopes = Column(ARRAY(String), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=True)
+    last_used_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
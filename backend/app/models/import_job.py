@@ -0,0 +1,52 @@
+from sqlalchemy import Column, Integer, String, BigInteger, ForeignKey, DateTime, Index, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+import enum
+from app.core.database import Base
+
+
+class ImportFormat(str, enum.Enum):
+    CSV = "csv"
+    JSONL = "jsonl"
+    ICS = "ics"
+
+
+class ImportStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ImportJob(Base):
+    """
+    An uploaded file of progress history being imported by a worker.
+    
+    The counters and processed_bytes are committed together with each
+    chunk of logs they describe, so they match what was written even when
+    a job fails part way through.
+    """
+    __tablename__ = "import_jobs"
+    __table_args__ = (
+        Index("ix_import_jobs_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    format = Column(SQLEnum(ImportFormat), nullable=False)
+    mode = Column(String(20), nullable=False)  # accumulate or replace, as for /progress/upsert
+    status = Column(SQLEnum(ImportStatus), nullable=False, default=ImportStatus.PENDING)
+    filename = Column(String(255), nullable=True)
+    file_path = Column(String, nullable=False)
+    total_bytes = Column(BigInteger, nullable=False)
+    processed_bytes = Column(BigInteger, nullable=False, default=0)
+    rows_read = Column(Integer, nullable=False, default=0)
+    rows_skipped = Column(Integer, nullable=False, default=0)
+    logs_created = Column(Integer, nullable=False, default=0)
+    logs_updated = Column(Integer, nullable=False, default=0)
+    skills_created = Column(Integer, nullable=False, default=0)
+    errors = Column(JSONB, nullable=False, default=list)  # First few skipped rows, with line and reason
+    error = Column(String, nullable=True)  # Why a failed job stopped
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
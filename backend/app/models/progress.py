@@ -1,5 +1,5 @@
 
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Date
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Date, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -7,10 +7,15 @@ from app.core.database import Base
 
 class ProgressLog(Base):
     __tablename__ = "progress_logs"
+    __table_args__ = (
+        Index("ix_progress_logs_user_id_date_created_at_id", "user_id", "date", "created_at", "id"),
+        Index("ix_progress_logs_skill_id_date", "skill_id", "date"),
+        Index("uq_progress_logs_user_id_skill_id_date", "user_id", "skill_id", "date", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    skill_id = Column(Integer, ForeignKey("skills.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    skill_id = Column(Integer, ForeignKey("skills.id", ondelete="CASCADE"), nullable=False)
     date = Column(Date, nullable=False, index=True)
     time_spent = Column(Integer, nullable=False)  # Time in minutes
     description = Column(Text, nullable=True)
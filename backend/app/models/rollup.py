@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, ForeignKey, Date, Index
+from app.core.database import Base
+
+
+class ProgressDailyRollup(Base):
+    """
+    Per user, skill and day totals of progress logs.
+    
+    Maintained in the same transaction as every progress log write so stats
+    reads aggregate one narrow row per active day instead of raw logs.
+    """
+    __tablename__ = "progress_daily_rollups"
+    __table_args__ = (
+        Index("ix_progress_daily_rollups_skill_id_date", "skill_id", "date"),
+    )
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    skill_id = Column(Integer, ForeignKey("skills.id", ondelete="CASCADE"), primary_key=True)
+    minutes = Column(Integer, nullable=False, default=0)
+    log_count = Column(Integer, nullable=False, default=0)
@@ -1,5 +1,5 @@
 
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index, Enum as SQLEnum, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -21,9 +21,14 @@ class SkillStatus(str, enum.Enum):
 
 class Skill(Base):
     __tablename__ = "skills"
+    __table_args__ = (
+        Index("ix_skills_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Deleted skills waiting for the purge; reads exclude their children
+        Index("ix_skills_user_id_deleted", "user_id", postgresql_where=text("deleted_at IS NOT NULL")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     name = Column(String, nullable=False)
     description = Column(String, nullable=True)
     target_level = Column(SQLEnum(SkillLevel), default=SkillLevel.INTERMEDIATE)
@@ -32,8 +37,10 @@ class Skill(Base):
     total_hours = Column(Integer, default=0)  # Total time spent in minutes
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    deleted_at = Column(DateTime(timezone=True), nullable=True)  # Set on delete; purged in the background
     
     # Relationships
     user = relationship("User", back_populates="skills")
-    progress_logs = relationship("ProgressLog", back_populates="skill", cascade="all, delete-orphan")
-    resources = relationship("Resource", back_populates="skill", cascade="all, delete-orphan")
+    # Children are removed by ON DELETE CASCADE rather than loaded and deleted one by one
+    progress_logs = relationship("ProgressLog", back_populates="skill", cascade="all, delete-orphan", passive_deletes=True)
+    resources = relationship("Resource", back_populates="skill", cascade="all, delete-orphan", passive_deletes=True)
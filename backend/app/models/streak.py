@@ -0,0 +1,45 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Date, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class StreakState(Base):
+    """
+    Incrementally maintained streak for a user (skill_id is NULL) or for
+    one of the user's skills.
+    
+    current_streak is the length of the run ending at last_active_date; it
+    only counts as current while last_active_date is today or yesterday.
+    
+    run_lengths counts the runs of active days by length ({"3": 2} is two
+    3-day runs), so when the longest run is split the next longest is known
+    without scanning the history. New rows start with no runs. It is NULL
+    only on rows written before it was added, or whose counts fell out of
+    step with the logs, until the next such split counts them again.
+    """
+    __tablename__ = "streak_states"
+    __table_args__ = (
+        Index(
+            "uq_streak_states_user_id",
+            "user_id",
+            unique=True,
+            postgresql_where=text("skill_id IS NULL")
+        ),
+        Index(
+            "uq_streak_states_user_id_skill_id",
+            "user_id",
+            "skill_id",
+            unique=True,
+            postgresql_where=text("skill_id IS NOT NULL")
+        ),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    skill_id = Column(Integer, ForeignKey("skills.id", ondelete="CASCADE"), nullable=True)
+    current_streak = Column(Integer, nullable=False, default=0)
+    longest_streak = Column(Integer, nullable=False, default=0)
+    last_active_date = Column(Date, nullable=True)
+    run_lengths = Column(JSONB, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
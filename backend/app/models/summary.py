@@ -1,5 +1,5 @@
 
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Date
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Date, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -7,9 +7,12 @@ from app.core.database import Base
 
 class WeeklySummary(Base):
     __tablename__ = "weekly_summaries"
+    __table_args__ = (
+        Index("uq_weekly_summaries_user_id_week_start", "user_id", "week_start", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     week_start = Column(Date, nullable=False)
     week_end = Column(Date, nullable=False)
     total_hours = Column(Integer, default=0)  # Total minutes for the week
@@ -8,6 +8,9 @@ from app.core.database import Base
 
 class User(Base):
     __tablename__ = "users"
+    # updated_at is set by the UPDATE itself and comes back through
+    # RETURNING on flush, so profile writes need no refresh SELECT
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
@@ -20,9 +23,10 @@ class User(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
-    skills = relationship("Skill", back_populates="user", cascade="all, delete-orphan")
-    progress_logs = relationship("ProgressLog", back_populates="user", cascade="all, delete-orphan")
-    summaries = relationship("WeeklySummary", back_populates="user", cascade="all, delete-orphan")
+    # Children are removed by ON DELETE CASCADE rather than loaded and deleted one by one
+    skills = relationship("Skill", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    progress_logs = relationship("ProgressLog", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    summaries = relationship("WeeklySummary", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
 
 
 # app/models/skill.py
@@ -0,0 +1,67 @@
+from typing import List, Optional
+from datetime import datetime
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.access_token import PersonalAccessToken
+
+
+class AccessTokenRepository:
+    """Repository for PersonalAccessToken database operations."""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def create(
+        self,
+        user_id: int,
+        name: str,
+        key_id: str,
+        secret_hash: str,
+        scopes: List[str],
+        expires_at: Optional[datetime]
+    ) -> PersonalAccessToken:
+        """Create a new personal access token."""
+        token = PersonalAccessToken(
+            user_id=user_id,
+            name=name,
+            key_id=key_id,
+            secret_hash=secret_hash,
+            scopes=scopes,
+            expires_at=expires_at
+        )
+        
+        self.db.add(token)
+        await self.db.flush()
+        return token
+    
+    async def get_all(self, user_id: int) -> List[PersonalAccessToken]:
+        """Get a user's tokens, newest first."""
+        result = await self.db.scalars(
+            select(PersonalAccessToken)
+            .where(PersonalAccessToken.user_id == user_id)
+            .order_by(PersonalAccessToken.created_at.desc(), PersonalAccessToken.id.desc())
+        )
+        return list(result.all())
+    
+    async def get_by_key_id(self, key_id: str) -> Optional[PersonalAccessToken]:
+        """Get a token by its public key_id, for verification."""
+        return await self.db.scalar(
+            select(PersonalAccessToken).where(PersonalAccessToken.key_id == key_id)
+        )
+        
+    async def touch(self, token_id: int) -> None:
+        """Record that a token was used."""
+        await self.db.execute(
+            update(PersonalAccessToken)
+            .where(PersonalAccessToken.id == token_id)
+            .values(last_used_at=func.now())
+        )
+    
+    async def delete(self, token_id: int, user_id: int) -> Optional[str]:
+        """Delete a user's token, returning its key_id if it existed."""
+        return await self.db.scalar(
+            delete(PersonalAccessToken)
+            .where(PersonalAccessToken.id == token_id, PersonalAccessToken.user_id == user_id)
+            .returning(PersonalAccessToken.key_id)
+        )
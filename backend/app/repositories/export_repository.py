@@ -0,0 +1,126 @@
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
+from sqlalchemy import ColumnElement, Row, Select, select
+from sqlalchemy.types import TypeEngine
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.progress import ProgressLog
+from app.models.resource import Resource
+from app.models.skill import Skill
+from app.models.summary import WeeklySummary
+from app.schemas.export import ExportSection
+
+
+class ExportRepository:
+    """Repository for streaming a user's rows out for export."""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    def columns(self, section: ExportSection, user_id: Optional[int]) -> List[Tuple[str, TypeEngine]]:
+        """The names and types of a section's columns, in the order its rows are returned."""
+        return [
+            (name, column.type)
+            for name, column in self._query(section, user_id).selected_columns.items()
+        ]
+    
+    async def stream(
+        self,
+        section: ExportSection,
+        user_id: Optional[int],
+        batch_size: int
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        Yield a section's rows in batches of `batch_size`.
+        
+        The rows come from a server-side cursor, so only one batch is held
+        in memory however large the account is. Plain columns are selected
+        rather than entities to skip the identity map. A `user_id` of None
+        exports every user's rows, with a leading user_id column.
+        """
+        result = await self.db.stream(
+            self._query(section, user_id).execution_options(yield_per=batch_size)
+        )
+        async for rows in result.partitions():
+            yield rows
+    
+    def _query(self, section: ExportSection, user_id: Optional[int]) -> Select:
+        # Sections are ordered along their indexes, which lead with user_id
+        # (skill_id for resources), so a platform export walks them too
+        if section == ExportSection.SKILLS:
+            return self._for_user(
+                select(
+                    Skill.id,
+                    Skill.name,
+                    Skill.description,
+                    Skill.target_level,
+                    Skill.current_level,
+                    Skill.status,
+                    Skill.total_hours,
+                    Skill.created_at,
+                    Skill.updated_at
+                )
+                .where(Skill.deleted_at.is_(None))
+                .order_by(Skill.user_id, Skill.created_at, Skill.id),
+                Skill.user_id,
+                user_id
+            )
+        if section == ExportSection.PROGRESS_LOGS:
+            return self._for_user(
+                select(
+                    ProgressLog.id,
+                    ProgressLog.skill_id,
+                    Skill.name.label("skill_name"),
+                    ProgressLog.date,
+                    ProgressLog.time_spent,
+                    ProgressLog.description,
+                    ProgressLog.notes,
+                    ProgressLog.created_at,
+                    ProgressLog.updated_at
+                )
+                .join(Skill, Skill.id == ProgressLog.skill_id)
+                .where(Skill.deleted_at.is_(None))
+                .order_by(ProgressLog.user_id, ProgressLog.date, ProgressLog.created_at, ProgressLog.id),
+                ProgressLog.user_id,
+                user_id
+            )
+        if section == ExportSection.RESOURCES:
+            # Resources belong to the user through their skill
+            return self._for_user(
+                select(
+                    Resource.id,
+                    Resource.skill_id,
+                    Skill.name.label("skill_name"),
+                    Resource.title,
+                    Resource.url,
+                    Resource.resource_type,
+                    Resource.description,
+                    Resource.is_completed,
+                    Resource.created_at
+                )
+                .join(Skill, Skill.id == Resource.skill_id)
+                .where(Skill.deleted_at.is_(None))
+                .order_by(Resource.skill_id, Resource.created_at, Resource.id),
+                Skill.user_id,
+                user_id
+            )
+        return self._for_user(
+            select(
+                WeeklySummary.id,
+                WeeklySummary.week_start,
+                WeeklySummary.week_end,
+                WeeklySummary.total_hours,
+                WeeklySummary.skills_worked_on,
+                WeeklySummary.summary_text,
+                WeeklySummary.created_at
+            )
+            .order_by(WeeklySummary.user_id, WeeklySummary.week_start),
+            WeeklySummary.user_id,
+            user_id
+        )
+
+    @staticmethod
+    def _for_user(query: Select, owner: ColumnElement, user_id: Optional[int]) -> Select:
+        """Filter to one user, or add the owner column for a platform export."""
+        if user_id is None:
+            return query.with_only_columns(owner, *query.selected_columns)
+        return query.where(owner == user_id)
@@ -0,0 +1,84 @@
+from typing import List, Optional
+from sqlalchemy import select, update, and_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.import_job import ImportJob, ImportFormat, ImportStatus
+
+
+class ImportJobRepository:
+    """Repository for ImportJob database operations."""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def create(
+        self,
+        user_id: int,
+        fmt: ImportFormat,
+        mode: str,
+        filename: Optional[str],
+        file_path: str,
+        total_bytes: int
+    ) -> ImportJob:
+        """Create a pending import job for an uploaded file."""
+        job = ImportJob(
+            user_id=user_id,
+            format=fmt,
+            mode=mode,
+            status=ImportStatus.PENDING,
+            filename=filename,
+            file_path=file_path,
+            total_bytes=total_bytes,
+            processed_bytes=0,
+            rows_read=0,
+            rows_skipped=0,
+            logs_created=0,
+            logs_updated=0,
+            skills_created=0,
+            errors=[]
+        )
+        
+        self.db.add(job)
+        await self.db.flush()
+        return job
+    
+    async def get_by_id(self, job_id: int, user_id: int) -> Optional[ImportJob]:
+        """Get an import job by ID for a specific user."""
+        return await self.db.scalar(
+            select(ImportJob).where(
+                and_(ImportJob.id == job_id, ImportJob.user_id == user_id)
+            )
+        )
+    
+    async def get_all(self, user_id: int, limit: int) -> List[ImportJob]:
+        """Get a user's most recent import jobs, newest first."""
+        result = await self.db.scalars(
+            select(ImportJob)
+            .where(ImportJob.user_id == user_id)
+            .order_by(ImportJob.created_at.desc(), ImportJob.id.desc())
+            .limit(limit)
+        )
+        return list(result.all())
+    
+    async def claim(self, job_id: int) -> Optional[ImportJob]:
+        """
+        Move a pending job to running and return it.
+        
+        None if the job is gone or was already claimed, so a task that is
+        delivered twice only imports the file once.
+        """
+        return await self.db.scalar(
+            update(ImportJob).where(
+                and_(ImportJob.id == job_id, ImportJob.status == ImportStatus.PENDING)
+            ).values(
+                status=ImportStatus.RUNNING, started_at=func.now()
+            ).returning(ImportJob).execution_options(populate_existing=True)
+        )
+    
+    async def finish(self, job_id: int, status: ImportStatus, error: Optional[str] = None) -> None:
+        """Record that a job completed or failed."""
+        await self.db.execute(
+            update(ImportJob).where(ImportJob.id == job_id).values(
+                status=status, error=error, finished_at=func.now()
+            )
+        )
@@ -1,20 +1,27 @@
 
-from typing import List, Optional, Tuple
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, and_, desc, extract
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy import select, func, and_, desc, case, true, cast, literal, literal_column, bindparam, Date, DateTime, Integer, Interval, Text
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
 from datetime import datetime, date, timedelta
 
 from app.models.progress import ProgressLog
 from app.models.skill import Skill
+from app.models.streak import StreakState
+from app.models.rollup import ProgressDailyRollup
+from app.repositories.skill_repository import deleted_skill_ids
+from app.repositories.streak_repository import StreakRepository
+from app.utils.pagination import after_cursor
 
 
 class ProgressRepository:
     """Repository for ProgressLog database operations."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def create(
+    async def create(
         self,
         user_id: int,
         skill_id: int,
@@ -34,75 +41,268 @@ class ProgressRepository:
         )
         
         self.db.add(progress_log)
-        self.db.commit()
-        self.db.refresh(progress_log)
+        await self.db.flush()
         return progress_log
     
-    def get_by_id(self, log_id: int, user_id: int) -> Optional[ProgressLog]:
+    async def create_many(self, user_id: int, logs: List[Dict[str, Any]]) -> List[ProgressLog]:
+        """
+        Insert several logs for a user with one multi-row INSERT.
+        
+        Each log is a dict of skill_id, date, time_spent, description and
+        notes. Logs whose skill already has a log on that date are skipped
+        by ON CONFLICT DO NOTHING; only the inserted ones are returned.
+        
+        The rows are passed as parameter sets rather than .values(), so the
+        statement compiles once and is cached; SQLAlchemy's insertmanyvalues
+        still sends them as one INSERT per 1000 rows. They are sent in key
+        order, so batches with overlapping days wait on each other's unique
+        index entries in the same order instead of deadlocking.
+        """
+        result = await self.db.scalars(
+            pg_insert(ProgressLog).on_conflict_do_nothing(
+                index_elements=[ProgressLog.user_id, ProgressLog.skill_id, ProgressLog.date]
+            ).returning(ProgressLog),
+            [
+                {**log, "user_id": user_id}
+                for log in sorted(logs, key=lambda log: (log["skill_id"], log["date"]))
+            ]
+        )
+        return list(result.all())
+    
+    async def upsert(
+        self,
+        user_id: int,
+        skill_id: int,
+        log_date: date,
+        time_spent: int,
+        description: Optional[str],
+        notes: Optional[str],
+        accumulate: bool,
+        max_time_spent: int
+    ) -> Optional[Tuple[ProgressLog, Optional[int]]]:
+        """
+        Create the skill's log for a day, or fold into the existing one.
+        
+        Returns the log and its previous time_spent (None when it was
+        inserted), or None if the day's total would exceed `max_time_spent`.
+        See upsert_many.
+        """
+        written = await self.upsert_many(
+            user_id,
+            [{
+                "skill_id": skill_id,
+                "date": log_date,
+                "time_spent": time_spent,
+                "description": description,
+                "notes": notes
+            }],
+            accumulate,
+            max_time_spent
+        )
+        return written[0] if written else None
+    
+    async def upsert_many(
+        self,
+        user_id: int,
+        logs: List[Dict[str, Any]],
+        accumulate: bool,
+        max_time_spent: int
+    ) -> List[Tuple[ProgressLog, Optional[int]]]:
+        """
+        Create or fold into the day's log of each (skill_id, date) in `logs`.
+        
+        Each log is a dict of skill_id, date, time_spent, description and
+        notes, and each (skill_id, date) may appear only once. One INSERT
+        ... ON CONFLICT DO UPDATE either replaces time_spent or adds to it;
+        description and notes are only overwritten when given. A CTE locks
+        the existing rows and returns their previous time_spent (None when
+        the log was inserted), so the caller can apply the exact change to
+        totals. Logs whose day would exceed `max_time_spent` are left out.
+        
+        The logs are sent as one array per column and expanded by unnest(),
+        so the statement text is the same for any number of logs and stays
+        cached and prepared.
+        """
+        written = []
+        pending = {(log["skill_id"], log["date"]): log for log in logs}
+        # A log inserted concurrently after this statement's snapshot is
+        # invisible to the CTE, so its update is skipped; a second run sees it
+        for _ in range(2):
+            if not pending:
+                break
+            rows = (await self.db.execute(
+                self._upsert_statement(user_id, list(pending.values()), accumulate, max_time_spent)
+            )).all()
+            for progress_log, previous_time in rows:
+                del pending[(progress_log.skill_id, progress_log.date)]
+                written.append((progress_log, previous_time))
+        return written
+    
+    @staticmethod
+    def _upsert_statement(user_id: int, logs: List[Dict[str, Any]], accumulate: bool, max_time_spent: int):
+        entries = select(
+            func.unnest(
+                bindparam("skill_ids", [log["skill_id"] for log in logs], type_=ARRAY(Integer)),
+                bindparam("dates", [log["date"] for log in logs], type_=ARRAY(Date)),
+                bindparam("time_spent", [log["time_spent"] for log in logs], type_=ARRAY(Integer)),
+                bindparam("descriptions", [log.get("description") for log in logs], type_=ARRAY(Text)),
+                bindparam("notes", [log.get("notes") for log in logs], type_=ARRAY(Text))
+            ).table_valued("skill_id", "date", "time_spent", "description", "notes").render_derived()
+        ).cte("entries")
+        
+        # Joined from the entries so each is one probe of the unique index
+        previous = select(ProgressLog.skill_id, ProgressLog.date, ProgressLog.time_spent).select_from(
+            entries.join(
+                ProgressLog,
+                and_(
+                    ProgressLog.user_id == user_id,
+                    ProgressLog.skill_id == entries.c.skill_id,
+                    ProgressLog.date == entries.c.date
+                )
+            )
+        ).with_for_update(of=ProgressLog).cte("previous")
+        
+        stmt = pg_insert(ProgressLog).from_select(
+            ["user_id", "skill_id", "date", "time_spent", "description", "notes"],
+            select(
+                literal(user_id, Integer),
+                entries.c.skill_id,
+                entries.c.date,
+                entries.c.time_spent,
+                entries.c.description,
+                entries.c.notes
+            )
+        )
+        new_time_spent = (
+            ProgressLog.time_spent + stmt.excluded.time_spent if accumulate else stmt.excluded.time_spent
+        )
+        # The row's time_spent before this statement, if it existed. SQLAlchemy
+        # does not correlate to an INSERT's table, so the conflicting (or
+        # returned) row is referenced by name
+        previous_time = select(previous.c.time_spent).where(
+            and_(
+                previous.c.skill_id == literal_column("progress_logs.skill_id"),
+                previous.c.date == literal_column("progress_logs.date")
+            )
+        )
+        return stmt.on_conflict_do_update(
+            index_elements=[ProgressLog.user_id, ProgressLog.skill_id, ProgressLog.date],
+            set_={
+                "time_spent": new_time_spent,
+                "description": func.coalesce(stmt.excluded.description, ProgressLog.description),
+                "notes": func.coalesce(stmt.excluded.notes, ProgressLog.notes),
+                "updated_at": func.now()
+            },
+            where=and_(previous_time.exists(), new_time_spent <= max_time_spent)
+        ).returning(
+            ProgressLog, previous_time.scalar_subquery()
+        ).execution_options(populate_existing=True)
+    
+    async def get_by_id(self, log_id: int, user_id: int) -> Optional[ProgressLog]:
         """Get progress log by ID for a specific user."""
-        return self.db.query(ProgressLog).options(
-            joinedload(ProgressLog.skill)
-        ).filter(
-            and_(ProgressLog.id == log_id, ProgressLog.user_id == user_id)
-        ).first()
+        return await self.db.scalar(
+            select(ProgressLog).options(
+                joinedload(ProgressLog.skill)
+            ).where(
+                and_(
+                    ProgressLog.id == log_id,
+                    ProgressLog.user_id == user_id,
+                    ProgressLog.skill_id.not_in(deleted_skill_ids(user_id))
+                )
+            )
+        )
     
-    def get_all(
+    async def get_all(
         self,
         user_id: int,
         skill_id: Optional[int] = None,
         start_date: Optional[date] = None,
         end_date: Optional[date] = None,
         skip: int = 0,
-        limit: int = 20
-    ) -> Tuple[List[ProgressLog], int]:
-        """Get all progress logs for a user with filters and pagination."""
-        query = self.db.query(ProgressLog).options(
-            joinedload(ProgressLog.skill)
-        ).filter(ProgressLog.user_id == user_id)
+        limit: int = 20,
+        after: Optional[Tuple[date, datetime, int]] = None
+    ) -> List[ProgressLog]:
+        """
+        Get progress logs for a user, newest first.
+        
+        Pages either by `skip` or, with `after`, by keyset on
+        (date, created_at, id) from a previous page's last row.
+        """
+        filters = [ProgressLog.user_id == user_id, ProgressLog.skill_id.not_in(deleted_skill_ids(user_id))]
         
         # Apply filters
         if skill_id:
-            query = query.filter(ProgressLog.skill_id == skill_id)
+            filters.append(ProgressLog.skill_id == skill_id)
         
         if start_date:
-            query = query.filter(ProgressLog.date >= start_date)
+            filters.append(ProgressLog.date >= start_date)
         
         if end_date:
-            query = query.filter(ProgressLog.date <= end_date)
+            filters.append(ProgressLog.date <= end_date)
+        
+        sort_key = (ProgressLog.date, ProgressLog.created_at, ProgressLog.id)
+        if after:
+            filters.append(after_cursor(sort_key, after))
+        
+        result = await self.db.scalars(
+            select(ProgressLog).options(
+                joinedload(ProgressLog.skill)
+            ).where(*filters).order_by(
+                *(desc(column) for column in sort_key)
+            ).offset(skip).limit(limit)
+        )
+        return list(result.all())
+        
+    async def count(
+        self,
+        user_id: int,
+        skill_id: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> int:
+        """Count progress logs for a user, read from the per-day rollup."""
+        filters = self._rollup_filters(user_id)
+        
+        if skill_id:
+            filters.append(ProgressDailyRollup.skill_id == skill_id)
         
-        # Get total count
-        total = query.count()
+        if start_date:
+            filters.append(ProgressDailyRollup.date >= start_date)
         
-        # Get paginated results
-        logs = query.order_by(desc(ProgressLog.date), desc(ProgressLog.created_at)).offset(skip).limit(limit).all()
+        if end_date:
+            filters.append(ProgressDailyRollup.date <= end_date)
         
-        return logs, total
+        total = await self.db.scalar(
+            select(func.sum(ProgressDailyRollup.log_count)).where(*filters)
+        )
+        return total or 0
     
-    def update(self, progress_log: ProgressLog, **kwargs) -> ProgressLog:
+    async def update(self, progress_log: ProgressLog, **kwargs) -> ProgressLog:
         """Update progress log with provided fields."""
         for key, value in kwargs.items():
             if value is not None and hasattr(progress_log, key):
                 setattr(progress_log, key, value)
         
         progress_log.updated_at = datetime.utcnow()
-        self.db.commit()
-        self.db.refresh(progress_log)
+        await self.db.flush()
         return progress_log
     
-    def delete(self, progress_log: ProgressLog) -> None:
+    async def delete(self, progress_log: ProgressLog) -> None:
         """Delete a progress log."""
-        self.db.delete(progress_log)
-        self.db.commit()
+        await self.db.delete(progress_log)
+        await self.db.flush()
     
-    def get_daily_stats(self, user_id: int, target_date: date) -> dict:
+    async def get_daily_stats(self, user_id: int, target_date: date) -> dict:
         """Get statistics for a specific day."""
-        stats = self.db.query(
-            func.sum(ProgressLog.time_spent).label("total_time"),
-            func.count(func.distinct(ProgressLog.skill_id)).label("skills_practiced"),
-            func.count(ProgressLog.id).label("log_count")
-        ).filter(
-            and_(ProgressLog.user_id == user_id, ProgressLog.date == target_date)
-        ).first()
+        stats = (await self.db.execute(
+            select(
+                func.sum(ProgressDailyRollup.minutes).label("total_time"),
+                func.count(func.distinct(ProgressDailyRollup.skill_id)).label("skills_practiced"),
+                func.sum(ProgressDailyRollup.log_count).label("log_count")
+            ).where(
+                *self._rollup_filters(user_id), ProgressDailyRollup.date == target_date
+            )
+        )).one()
         
         return {
             "date": target_date,
@@ -111,52 +311,122 @@ class ProgressRepository:
             "log_count": stats.log_count or 0
         }
     
-    def get_weekly_stats(self, user_id: int, week_start: date) -> dict:
+    async def get_weekly_stats(self, user_id: int, week_start: date) -> dict:
         """Get statistics for a week."""
         week_end = week_start + timedelta(days=6)
-        
-        # Overall week stats
-        stats = self.db.query(
-            func.sum(ProgressLog.time_spent).label("total_time"),
-            func.count(func.distinct(ProgressLog.skill_id)).label("skills_practiced"),
-            func.count(ProgressLog.id).label("log_count")
-        ).filter(
-            and_(
-                ProgressLog.user_id == user_id,
-                ProgressLog.date >= week_start,
-                ProgressLog.date <= week_end
-            )
-        ).first()
-        
-        # Daily breakdown
-        daily_stats = []
-        for i in range(7):
-            day = week_start + timedelta(days=i)
-            daily_stats.append(self.get_daily_stats(user_id, day))
+        stats = await self.get_range_stats(user_id, week_start, week_end, "day")
         
         return {
             "week_start": week_start,
             "week_end": week_end,
-            "total_time": stats.total_time or 0,
-            "skills_practiced": stats.skills_practiced or 0,
-            "log_count": stats.log_count or 0,
-            "daily_breakdown": daily_stats
+            "total_time": stats["total_time"],
+            "skills_practiced": stats["skills_practiced"],
+            "log_count": stats["log_count"],
+            "daily_breakdown": [
+                {
+                    "date": bucket["bucket_start"],
+                    "total_time": bucket["total_time"],
+                    "skills_practiced": bucket["skills_practiced"],
+                    "log_count": bucket["log_count"]
+                }
+                for bucket in stats["series"]
+            ]
         }
     
-    def get_monthly_stats(self, user_id: int, year: int, month: int) -> dict:
+    async def get_range_stats(
+        self,
+        user_id: int,
+        start_date: date,
+        end_date: date,
+        bucket: str = "day",
+        skill_id: Optional[int] = None
+    ) -> dict:
+        """
+        Get totals and a zero-filled series for a date range in one query.
+        
+        A generate_series of bucket starts is left joined to the daily
+        rollup, and GROUP BY ROLLUP adds the whole-range totals as an extra
+        row, so empty buckets come back as zeros without extra round trips.
+        Week buckets start on Monday, so the first bucket may begin before
+        `start_date`; only days inside the range are counted.
+        """
+        bucket_start = cast(
+            func.date_trunc(bucket, cast(ProgressDailyRollup.date, DateTime)), Date
+        )
+        series = select(
+            cast(
+                func.generate_series(
+                    func.date_trunc(bucket, cast(literal(start_date, Date), DateTime)),
+                    cast(literal(end_date, Date), DateTime),
+                    cast(literal(f"1 {bucket}"), Interval)
+                ),
+                Date
+            ).label("bucket_start")
+        ).subquery("series")
+        
+        join_on = [
+            *self._rollup_filters(user_id),
+            ProgressDailyRollup.date >= start_date,
+            ProgressDailyRollup.date <= end_date,
+            bucket_start == series.c.bucket_start
+        ]
+        if skill_id:
+            join_on.append(ProgressDailyRollup.skill_id == skill_id)
+        
+        rows = (await self.db.execute(
+            select(
+                series.c.bucket_start,
+                func.grouping(series.c.bucket_start).label("is_total"),
+                func.coalesce(func.sum(ProgressDailyRollup.minutes), 0).label("total_time"),
+                func.count(func.distinct(ProgressDailyRollup.skill_id)).label("skills_practiced"),
+                func.coalesce(func.sum(ProgressDailyRollup.log_count), 0).label("log_count"),
+                func.count(func.distinct(ProgressDailyRollup.date)).label("active_days")
+            ).select_from(
+                series.outerjoin(ProgressDailyRollup, and_(*join_on))
+            ).group_by(
+                func.rollup(series.c.bucket_start)
+            ).order_by(series.c.bucket_start)
+        )).all()
+        
+        totals = next(row for row in rows if row.is_total)
+        
+        return {
+            "start_date": start_date,
+            "end_date": end_date,
+            "bucket": bucket,
+            "total_time": totals.total_time,
+            "skills_practiced": totals.skills_practiced,
+            "log_count": totals.log_count,
+            "active_days": totals.active_days,
+            "series": [
+                {
+                    "bucket_start": row.bucket_start,
+                    "total_time": row.total_time,
+                    "skills_practiced": row.skills_practiced,
+                    "log_count": row.log_count
+                }
+                for row in rows if not row.is_total
+            ]
+        }
+    
+    async def get_monthly_stats(self, user_id: int, year: int, month: int) -> dict:
         """Get statistics for a month."""
-        stats = self.db.query(
-            func.sum(ProgressLog.time_spent).label("total_time"),
-            func.count(func.distinct(ProgressLog.skill_id)).label("skills_practiced"),
-            func.count(ProgressLog.id).label("log_count"),
-            func.count(func.distinct(ProgressLog.date)).label("active_days")
-        ).filter(
-            and_(
-                ProgressLog.user_id == user_id,
-                extract("year", ProgressLog.date) == year,
-                extract("month", ProgressLog.date) == month
+        # Filter on a date range so the (user_id, date) index bounds the scan
+        month_start = date(year, month, 1)
+        next_month = date(year + month // 12, month % 12 + 1, 1)
+        
+        stats = (await self.db.execute(
+            select(
+                func.sum(ProgressDailyRollup.minutes).label("total_time"),
+                func.count(func.distinct(ProgressDailyRollup.skill_id)).label("skills_practiced"),
+                func.sum(ProgressDailyRollup.log_count).label("log_count"),
+                func.count(func.distinct(ProgressDailyRollup.date)).label("active_days")
+            ).where(
+                *self._rollup_filters(user_id),
+                ProgressDailyRollup.date >= month_start,
+                ProgressDailyRollup.date < next_month
             )
-        ).first()
+        )).one()
         
         return {
             "month": f"{year}-{month:02d}",
@@ -166,72 +436,88 @@ class ProgressRepository:
             "active_days": stats.active_days or 0
         }
     
-    def get_overall_stats(self, user_id: int) -> dict:
-        """Get overall progress statistics."""
+    async def get_overall_stats(self, user_id: int) -> dict:
+        """
+        Get overall progress statistics in a single round trip.
+        
+        Period totals use FILTER aggregates over the user's daily rollup and
+        the streaks come from the user's maintained streak state row.
+        """
         today = date.today()
+        yesterday = today - timedelta(days=1)
         week_start = today - timedelta(days=today.weekday())
         month_start = today.replace(day=1)
         
-        # Total stats
-        total_stats = self.db.query(
-            func.count(ProgressLog.id).label("total_logs"),
-            func.sum(ProgressLog.time_spent).label("total_time"),
-            func.count(func.distinct(ProgressLog.skill_id)).label("skills_tracked")
-        ).filter(ProgressLog.user_id == user_id).first()
-        
-        # Today's time
-        today_time = self.db.query(func.sum(ProgressLog.time_spent)).filter(
-            and_(ProgressLog.user_id == user_id, ProgressLog.date == today)
-        ).scalar() or 0
-        
-        # This week's time
-        week_time = self.db.query(func.sum(ProgressLog.time_spent)).filter(
-            and_(
-                ProgressLog.user_id == user_id,
-                ProgressLog.date >= week_start,
-                ProgressLog.date <= today
-            )
-        ).scalar() or 0
-        
-        # This month's time
-        month_time = self.db.query(func.sum(ProgressLog.time_spent)).filter(
-            and_(
-                ProgressLog.user_id == user_id,
-                ProgressLog.date >= month_start,
-                ProgressLog.date <= today
-            )
-        ).scalar() or 0
-        
-        # Calculate streaks
-        current_streak = self._calculate_current_streak(user_id)
-        longest_streak = self._calculate_longest_streak(user_id)
+        totals = select(
+            func.coalesce(func.sum(ProgressDailyRollup.log_count), 0).label("total_logs"),
+            func.coalesce(func.sum(ProgressDailyRollup.minutes), 0).label("total_time"),
+            func.count(func.distinct(ProgressDailyRollup.skill_id)).label("skills_tracked"),
+            func.coalesce(
+                func.sum(ProgressDailyRollup.minutes).filter(ProgressDailyRollup.date == today), 0
+            ).label("today_time"),
+            func.coalesce(
+                func.sum(ProgressDailyRollup.minutes).filter(
+                    and_(ProgressDailyRollup.date >= week_start, ProgressDailyRollup.date <= today)
+                ), 0
+            ).label("this_week_time"),
+            func.coalesce(
+                func.sum(ProgressDailyRollup.minutes).filter(
+                    and_(ProgressDailyRollup.date >= month_start, ProgressDailyRollup.date <= today)
+                ), 0
+            ).label("this_month_time")
+        ).where(*self._rollup_filters(user_id)).subquery("totals")
+        
+        streak = select(StreakState).where(
+            and_(StreakState.user_id == user_id, StreakState.skill_id.is_(None))
+        ).subquery("streak")
+        
+        stats = (await self.db.execute(
+            select(
+                totals,
+                case(
+                    (streak.c.last_active_date >= yesterday, streak.c.current_streak),
+                    else_=0
+                ).label("current_streak"),
+                func.coalesce(streak.c.longest_streak, 0).label("longest_streak")
+            ).select_from(totals.outerjoin(streak, true()))
+        )).one()
         
         return {
-            "total_logs": total_stats.total_logs or 0,
-            "total_time": total_stats.total_time or 0,
-            "skills_tracked": total_stats.skills_tracked or 0,
-            "current_streak": current_streak,
-            "longest_streak": longest_streak,
-            "today_time": today_time,
-            "this_week_time": week_time,
-            "this_month_time": month_time
+            "total_logs": stats.total_logs,
+            "total_time": stats.total_time,
+            "skills_tracked": stats.skills_tracked,
+            "current_streak": stats.current_streak,
+            "longest_streak": stats.longest_streak,
+            "today_time": stats.today_time,
+            "this_week_time": stats.this_week_time,
+            "this_month_time": stats.this_month_time
         }
     
-    def get_skill_progress_summary(self, user_id: int, skill_id: int) -> dict:
+    @staticmethod
+    def _rollup_filters(user_id: int) -> list:
+        # Skip the rollups of deleted skills the purge has not reached yet
+        return [
+            ProgressDailyRollup.user_id == user_id,
+            ProgressDailyRollup.skill_id.not_in(deleted_skill_ids(user_id))
+        ]
+    
+    async def get_skill_progress_summary(self, user_id: int, skill_id: int) -> dict:
         """Get progress summary for a specific skill."""
-        stats = self.db.query(
-            func.sum(ProgressLog.time_spent).label("total_time"),
-            func.count(ProgressLog.id).label("log_count"),
-            func.max(ProgressLog.date).label("last_practiced")
-        ).filter(
-            and_(ProgressLog.user_id == user_id, ProgressLog.skill_id == skill_id)
-        ).first()
+        stats = (await self.db.execute(
+            select(
+                func.sum(ProgressDailyRollup.minutes).label("total_time"),
+                func.sum(ProgressDailyRollup.log_count).label("log_count"),
+                func.max(ProgressDailyRollup.date).label("last_practiced")
+            ).where(
+                and_(ProgressDailyRollup.user_id == user_id, ProgressDailyRollup.skill_id == skill_id)
+            )
+        )).one()
         
         # Get skill name
-        skill = self.db.query(Skill).filter(Skill.id == skill_id).first()
+        skill_name = await self.db.scalar(select(Skill.name).where(Skill.id == skill_id))
         
-        # Calculate streak for this skill
-        current_streak = self._calculate_skill_streak(skill_id)
+        # Current streak for this skill
+        current_streak = await StreakRepository(self.db).get_current_streak(user_id, skill_id)
         
         # Calculate average daily time
         if stats.log_count and stats.log_count > 0:
@@ -241,7 +527,7 @@ class ProgressRepository:
         
         return {
             "skill_id": skill_id,
-            "skill_name": skill.name if skill else "Unknown",
+            "skill_name": skill_name or "Unknown",
             "total_time": stats.total_time or 0,
             "log_count": stats.log_count or 0,
             "last_practiced": stats.last_practiced,
@@ -249,88 +535,9 @@ class ProgressRepository:
             "average_daily_time": average_daily
         }
     
-    def _calculate_current_streak(self, user_id: int) -> int:
-        """Calculate current consecutive days streak."""
-        today = date.today()
-        
-        # Get all unique dates
-        dates = self.db.query(func.distinct(ProgressLog.date)).filter(
-            ProgressLog.user_id == user_id
-        ).order_by(desc(ProgressLog.date)).all()
-        
-        if not dates:
-            return 0
-        
-        dates = [d[0] for d in dates]
-        
-        # Check if practiced today or yesterday
-        if dates[0] != today and dates[0] != today - timedelta(days=1):
-            return 0
-        
-        # Count consecutive days
-        streak = 1
-        for i in range(len(dates) - 1):
-            diff = (dates[i] - dates[i + 1]).days
-            if diff == 1:
-                streak += 1
-            else:
-                break
-        
-        return streak
-    
-    def _calculate_longest_streak(self, user_id: int) -> int:
-        """Calculate longest consecutive days streak."""
-        dates = self.db.query(func.distinct(ProgressLog.date)).filter(
-            ProgressLog.user_id == user_id
-        ).order_by(ProgressLog.date).all()
-        
-        if not dates:
-            return 0
-        
-        dates = [d[0] for d in dates]
-        
-        max_streak = 1
-        current_streak = 1
-        
-        for i in range(len(dates) - 1):
-            diff = (dates[i + 1] - dates[i]).days
-            if diff == 1:
-                current_streak += 1
-                max_streak = max(max_streak, current_streak)
-            else:
-                current_streak = 1
-        
-        return max_streak
-    
-    def _calculate_skill_streak(self, skill_id: int) -> int:
-        """Calculate current streak for a specific skill."""
-        today = date.today()
-        
-        dates = self.db.query(func.distinct(ProgressLog.date)).filter(
-            ProgressLog.skill_id == skill_id
-        ).order_by(desc(ProgressLog.date)).limit(30).all()
-        
-        if not dates:
-            return 0
-        
-        dates = [d[0] for d in dates]
-        
-        if dates[0] != today and dates[0] != today - timedelta(days=1):
-            return 0
-        
-        streak = 1
-        for i in range(len(dates) - 1):
-            diff = (dates[i] - dates[i + 1]).days
-            if diff == 1:
-                streak += 1
-            else:
-                break
-        
-        return streak
-    
-    def check_duplicate(self, user_id: int, skill_id: int, log_date: date, exclude_id: Optional[int] = None) -> bool:
+    async def check_duplicate(self, user_id: int, skill_id: int, log_date: date, exclude_id: Optional[int] = None) -> bool:
         """Check if a progress log already exists for the same skill and date."""
-        query = self.db.query(ProgressLog).filter(
+        query = select(ProgressLog.id).where(
             and_(
                 ProgressLog.user_id == user_id,
                 ProgressLog.skill_id == skill_id,
@@ -339,6 +546,6 @@ class ProgressRepository:
         )
         
         if exclude_id:
-            query = query.filter(ProgressLog.id != exclude_id)
+            query = query.where(ProgressLog.id != exclude_id)
         
-        return query.first() is not None
\ No newline at end of file
+        return await self.db.scalar(query.limit(1)) is not None
@@ -1,18 +1,21 @@
 from typing import List, Optional, Tuple
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, and_, desc, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager, joinedload
+from sqlalchemy import select, func, and_, desc, case
+from datetime import datetime
 
 from app.models.resource import Resource, ResourceType
 from app.models.skill import Skill
+from app.utils.pagination import after_cursor
 
 
 class ResourceRepository:
     """Repository for Resource database operations."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def create(
+    async def create(
         self,
         skill_id: int,
         title: str,
@@ -31,74 +34,106 @@ class ResourceRepository:
         )
         
         self.db.add(resource)
-        self.db.commit()
-        self.db.refresh(resource)
+        await self.db.flush()
         return resource
     
-    def get_by_id(self, resource_id: int) -> Optional[Resource]:
-        """Get resource by ID."""
-        return self.db.query(Resource).options(
-            joinedload(Resource.skill)
-        ).filter(Resource.id == resource_id).first()
+    async def get_by_id(self, resource_id: int) -> Optional[Resource]:
+        """Get resource by ID, unless its skill was deleted."""
+        return await self.db.scalar(
+            select(Resource).join(Resource.skill).options(
+                contains_eager(Resource.skill)
+            ).where(Resource.id == resource_id, Skill.deleted_at.is_(None))
+        )
     
-    def get_all(
+    async def get_all(
         self,
         user_id: int,
         skill_id: Optional[int] = None,
         resource_type: Optional[ResourceType] = None,
         is_completed: Optional[bool] = None,
         skip: int = 0,
-        limit: int = 20
-    ) -> Tuple[List[Resource], int]:
-        """Get all resources for a user with filters."""
-        query = self.db.query(Resource).join(Skill).filter(
-            Skill.user_id == user_id
-        ).options(joinedload(Resource.skill))
+        limit: int = 20,
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> List[Resource]:
+        """
+        Get resources for a user, newest first.
+        
+        Pages either by `skip` or, with `after`, by keyset on
+        (created_at, id) from a previous page's last row.
+        """
+        filters = self._list_filters(user_id, skill_id, resource_type, is_completed)
+        
+        sort_key = (Resource.created_at, Resource.id)
+        if after:
+            filters.append(after_cursor(sort_key, after))
+        
+        resources = (await self.db.scalars(
+            select(Resource).join(Skill).where(*filters).options(
+                joinedload(Resource.skill)
+            ).order_by(
+                *(desc(column) for column in sort_key)
+            ).offset(skip).limit(limit)
+        )).all()
+        return list(resources)
+    
+    async def count(
+        self,
+        user_id: int,
+        skill_id: Optional[int] = None,
+        resource_type: Optional[ResourceType] = None,
+        is_completed: Optional[bool] = None
+    ) -> int:
+        """Count resources for a user matching the list filters."""
+        filters = self._list_filters(user_id, skill_id, resource_type, is_completed)
+        return await self.db.scalar(
+            select(func.count(Resource.id)).join(Skill).where(*filters)
+        ) or 0
+    
+    @staticmethod
+    def _list_filters(
+        user_id: int,
+        skill_id: Optional[int],
+        resource_type: Optional[ResourceType],
+        is_completed: Optional[bool]
+    ) -> list:
+        filters = [Skill.user_id == user_id, Skill.deleted_at.is_(None)]
         
         # Apply filters
         if skill_id:
-            query = query.filter(Resource.skill_id == skill_id)
+            filters.append(Resource.skill_id == skill_id)
         
         if resource_type:
-            query = query.filter(Resource.resource_type == resource_type)
+            filters.append(Resource.resource_type == resource_type)
         
         if is_completed is not None:
-            query = query.filter(Resource.is_completed == is_completed)
+            filters.append(Resource.is_completed == is_completed)
         
-        # Get total count
-        total = query.count()
-        
-        # Get paginated results
-        resources = query.order_by(desc(Resource.created_at)).offset(skip).limit(limit).all()
-        
-        return resources, total
+        return filters
     
-    def update(self, resource: Resource, **kwargs) -> Resource:
+    async def update(self, resource: Resource, **kwargs) -> Resource:
         """Update resource with provided fields."""
         for key, value in kwargs.items():
             if value is not None and hasattr(resource, key):
                 setattr(resource, key, value)
         
-        self.db.commit()
-        self.db.refresh(resource)
+        await self.db.flush()
         return resource
     
-    def delete(self, resource: Resource) -> None:
+    async def delete(self, resource: Resource) -> None:
         """Delete a resource."""
-        self.db.delete(resource)
-        self.db.commit()
+        await self.db.delete(resource)
+        await self.db.flush()
     
-    def mark_completed(self, resource: Resource, completed: bool = True) -> Resource:
+    async def mark_completed(self, resource: Resource, completed: bool = True) -> Resource:
         """Mark resource as completed or not completed."""
         resource.is_completed = completed
-        self.db.commit()
-        self.db.refresh(resource)
+        await self.db.flush()
         return resource
 
-    def get_stats(self, user_id: int) -> dict:
+    async def get_stats(self, user_id: int) -> dict:
         """Get resource statistics for user."""
         # Query through the Skill relationship since Resource doesn't have user_id
-        stats = self.db.query(
+        stats = (await self.db.execute(select(
             func.count(Resource.id).label("total"),
             func.coalesce(
                 func.sum(
@@ -109,16 +144,18 @@ class ResourceRepository:
                 ),
                 0
             ).label("completed")
-        ).join(Skill).filter(Skill.user_id == user_id).first()
+        ).join(Skill).where(Skill.user_id == user_id, Skill.deleted_at.is_(None)))).one()
         
         # Count by type
         by_type = {}
-        type_counts = self.db.query(
-            Resource.resource_type,
-            func.count(Resource.id).label("count")
-        ).join(Skill).filter(Skill.user_id == user_id).group_by(
-            Resource.resource_type
-        ).all()
+        type_counts = (await self.db.execute(
+            select(
+                Resource.resource_type,
+                func.count(Resource.id).label("count")
+            ).join(Skill).where(Skill.user_id == user_id, Skill.deleted_at.is_(None)).group_by(
+                Resource.resource_type
+            )
+        )).all()
         
         for resource_type, count in type_counts:
             by_type[resource_type.value] = count
@@ -137,8 +174,11 @@ class ResourceRepository:
 
 
 
-    def get_by_skill(self, skill_id: int) -> List[Resource]:
+    async def get_by_skill(self, skill_id: int) -> List[Resource]:
         """Get all resources for a specific skill."""
-        return self.db.query(Resource).filter(
-            Resource.skill_id == skill_id
-        ).order_by(desc(Resource.created_at)).all()
\ No newline at end of file
+        resources = await self.db.scalars(
+            select(Resource).where(
+                Resource.skill_id == skill_id
+            ).order_by(desc(Resource.created_at))
+        )
+        return list(resources.all())
\ No newline at end of file
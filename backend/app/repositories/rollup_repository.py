@@ -0,0 +1,95 @@
+from typing import List, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, insert, func, and_, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from datetime import date
+
+from app.models.progress import ProgressLog
+from app.models.rollup import ProgressDailyRollup
+
+
+class RollupRepository:
+    """Repository for the per-day progress rollup."""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def apply_delta(
+        self,
+        user_id: int,
+        skill_id: int,
+        day: date,
+        minutes: int,
+        log_count: int
+    ) -> None:
+        """
+        Add a change in minutes and log count to a (user, skill, day) row.
+        
+        Runs inside the caller's transaction; the row is dropped once it no
+        longer covers any logs.
+        """
+        await self.apply_deltas(user_id, [(skill_id, day, minutes, log_count)])
+    
+    async def apply_deltas(self, user_id: int, deltas: List[Tuple[int, date, int, int]]) -> None:
+        """
+        Apply (skill_id, day, minutes, log_count) changes with one multi-row upsert.
+        
+        Each (skill, day) may appear only once. Rows left without logs are
+        dropped by a single DELETE.
+        """
+        stmt = pg_insert(ProgressDailyRollup)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                ProgressDailyRollup.user_id,
+                ProgressDailyRollup.date,
+                ProgressDailyRollup.skill_id
+            ],
+            set_={
+                "minutes": ProgressDailyRollup.minutes + stmt.excluded.minutes,
+                "log_count": ProgressDailyRollup.log_count + stmt.excluded.log_count
+            }
+        ).returning(ProgressDailyRollup.skill_id, ProgressDailyRollup.date, ProgressDailyRollup.log_count)
+        
+        # Parameter sets keep the statement cacheable; they are still sent
+        # as one multi-row INSERT
+        result = await self.db.execute(stmt, [
+            {
+                "user_id": user_id,
+                "skill_id": skill_id,
+                "date": day,
+                "minutes": minutes,
+                "log_count": log_count
+            }
+            for skill_id, day, minutes, log_count in deltas
+        ])
+        emptied = [(skill_id, day) for skill_id, day, remaining in result.all() if remaining <= 0]
+        if emptied:
+            await self.db.execute(
+                delete(ProgressDailyRollup).where(
+                    and_(
+                        ProgressDailyRollup.user_id == user_id,
+                        tuple_(ProgressDailyRollup.skill_id, ProgressDailyRollup.date).in_(emptied)
+                    )
+                )
+            )
+    
+    async def rebuild(self, user_ids: List[int]) -> None:
+        """Recompute rollup rows for the given users from raw progress logs."""
+        await self.db.execute(
+            delete(ProgressDailyRollup).where(ProgressDailyRollup.user_id.in_(user_ids))
+        )
+        
+        await self.db.execute(
+            insert(ProgressDailyRollup).from_select(
+                ["user_id", "date", "skill_id", "minutes", "log_count"],
+                select(
+                    ProgressLog.user_id,
+                    ProgressLog.date,
+                    ProgressLog.skill_id,
+                    func.sum(ProgressLog.time_spent),
+                    func.count(ProgressLog.id)
+                ).where(ProgressLog.user_id.in_(user_ids)).group_by(
+                    ProgressLog.user_id, ProgressLog.date, ProgressLog.skill_id
+                )
+            )
+        )
@@ -1,21 +1,33 @@
 
-from typing import List, Optional, Tuple, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_, desc, case
+from typing import Iterable, List, Optional, Tuple, Dict, Any, Type
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Select, select, update, insert, delete, func, and_, or_, desc, case, values, column, Integer, tuple_
 from datetime import datetime, date
 
+from app.core.database import Base
 from app.models.skill import Skill, SkillLevel, SkillStatus
 from app.models.progress import ProgressLog
+from app.repositories.streak_repository import StreakRepository
+from app.utils.pagination import after_cursor
 
 
+def deleted_skill_ids(user_id: int) -> Select:
+    """
+    Ids of the user's deleted skills that are still being purged.
+    
+    Reads of progress logs and rollups exclude these, so a deleted skill's
+    history disappears at once even though its rows go in the background.
+    """
+    return select(Skill.id).where(Skill.user_id == user_id, Skill.deleted_at.is_not(None))
+
 
 class SkillRepository:
     """Repository for Skill database operations."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def create(
+    async def create(
         self,
         user_id: int,
         name: str,
@@ -35,17 +47,54 @@ class SkillRepository:
         )
         
         self.db.add(skill)
-        self.db.commit()
-        self.db.refresh(skill)
+        await self.db.flush()
         return skill
     
-    def get_by_id(self, skill_id: int, user_id: int) -> Optional[Skill]:
+    async def get_by_id(self, skill_id: int, user_id: int) -> Optional[Skill]:
         """Get skill by ID for a specific user."""
-        return self.db.query(Skill).filter(
-            and_(Skill.id == skill_id, Skill.user_id == user_id)
-        ).first()
+        return await self.db.scalar(
+            select(Skill).where(
+                and_(Skill.id == skill_id, Skill.user_id == user_id, Skill.deleted_at.is_(None))
+            )
+        )
+    
+    async def get_names(self, user_id: int, skill_ids: List[int]) -> Dict[int, str]:
+        """Names of those of `skill_ids` that belong to the user, by id."""
+        rows = await self.db.execute(
+            select(Skill.id, Skill.name).where(
+                and_(Skill.user_id == user_id, Skill.id.in_(skill_ids), Skill.deleted_at.is_(None))
+            )
+        )
+        return dict(rows.all())
     
-    def get_all(
+    async def get_ids_by_name(self, user_id: int, names: Iterable[str]) -> Dict[str, int]:
+        """Ids of the user's skills named one of `names`; the oldest wins a duplicated name."""
+        rows = await self.db.execute(
+            select(Skill.name, Skill.id).where(
+                and_(Skill.user_id == user_id, Skill.name.in_(list(names)), Skill.deleted_at.is_(None))
+            ).order_by(Skill.id.desc())
+        )
+        return dict(rows.all())
+    
+    async def create_many(self, user_id: int, names: List[str]) -> Dict[str, int]:
+        """Create active beginner skills with the given names in one INSERT; returns their ids by name."""
+        rows = await self.db.execute(
+            insert(Skill).returning(Skill.name, Skill.id),
+            [
+                {
+                    "user_id": user_id,
+                    "name": name,
+                    "target_level": SkillLevel.INTERMEDIATE,
+                    "current_level": SkillLevel.BEGINNER,
+                    "status": SkillStatus.ACTIVE,
+                    "total_hours": 0
+                }
+                for name in names
+            ]
+        )
+        return dict(rows.all())
+    
+    async def get_all(
         self,
         user_id: int,
         status: Optional[SkillStatus] = None,
@@ -53,83 +102,198 @@ class SkillRepository:
         target_level: Optional[SkillLevel] = None,
         search: Optional[str] = None,
         skip: int = 0,
-        limit: int = 20
-    ) -> Tuple[List[Skill], int]:
-        """Get all skills for a user with filters and pagination."""
-        query = self.db.query(Skill).filter(Skill.user_id == user_id)
+        limit: int = 20,
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> List[Skill]:
+        """
+        Get skills for a user, newest first.
+        
+        Pages either by `skip` or, with `after`, by keyset on
+        (created_at, id) from a previous page's last row.
+        """
+        filters = self._list_filters(user_id, status, current_level, target_level, search)
+        
+        sort_key = (Skill.created_at, Skill.id)
+        if after:
+            filters.append(after_cursor(sort_key, after))
+        
+        skills = (await self.db.scalars(
+            select(Skill).where(*filters).order_by(
+                *(desc(column) for column in sort_key)
+            ).offset(skip).limit(limit)
+        )).all()
+        return list(skills)
+    
+    async def count(
+        self,
+        user_id: int,
+        status: Optional[SkillStatus] = None,
+        current_level: Optional[SkillLevel] = None,
+        target_level: Optional[SkillLevel] = None,
+        search: Optional[str] = None
+    ) -> int:
+        """Count skills for a user matching the list filters."""
+        filters = self._list_filters(user_id, status, current_level, target_level, search)
+        return await self.db.scalar(select(func.count(Skill.id)).where(*filters)) or 0
+    
+    @staticmethod
+    def _list_filters(
+        user_id: int,
+        status: Optional[SkillStatus],
+        current_level: Optional[SkillLevel],
+        target_level: Optional[SkillLevel],
+        search: Optional[str]
+    ) -> list:
+        filters = [Skill.user_id == user_id, Skill.deleted_at.is_(None)]
         
         # Apply filters
         if status:
-            query = query.filter(Skill.status == status)
+            filters.append(Skill.status == status)
         
         if current_level:
-            query = query.filter(Skill.current_level == current_level)
+            filters.append(Skill.current_level == current_level)
         
         if target_level:
-            query = query.filter(Skill.target_level == target_level)
+            filters.append(Skill.target_level == target_level)
         
         if search:
             search_pattern = f"%{search}%"
-            query = query.filter(
+            filters.append(
                 or_(
                     Skill.name.ilike(search_pattern),
                     Skill.description.ilike(search_pattern)
                 )
             )
         
-        # Get total count
-        total = query.count()
-        
-        # Get paginated results
-        skills = query.order_by(desc(Skill.created_at)).offset(skip).limit(limit).all()
-        
-        return skills, total
+        return filters
     
-    def update(self, skill: Skill, **kwargs) -> Skill:
+    async def update(self, skill: Skill, **kwargs) -> Skill:
         """Update skill with provided fields."""
         for key, value in kwargs.items():
             if value is not None and hasattr(skill, key):
                 setattr(skill, key, value)
         
         skill.updated_at = datetime.utcnow()
-        self.db.commit()
-        self.db.refresh(skill)
+        await self.db.flush()
         return skill
     
-    def delete(self, skill: Skill) -> None:
-        """Delete a skill (hard delete)."""
-        self.db.delete(skill)
-        self.db.commit()
+    async def soft_delete(self, skill: Skill) -> None:
+        """
+        Mark a skill deleted.
+        
+        Only the skill row is written, so this is quick however much history
+        the skill has; `purge_children` and `purge` remove the rest later.
+        """
+        skill.deleted_at = func.now()
+        await self.db.flush()
+    
+    async def get_deleted(self, skill_ids: Optional[List[int]] = None) -> List[int]:
+        """Ids of deleted skills waiting for the purge, optionally only those in `skill_ids`."""
+        query = select(Skill.id).where(Skill.deleted_at.is_not(None))
+        if skill_ids is not None:
+            query = query.where(Skill.id.in_(skill_ids))
+        result = await self.db.scalars(query.order_by(Skill.deleted_at, Skill.id))
+        return list(result.all())
     
-    def update_total_hours(self, skill_id: int) -> None:
-        """Recalculate and update total hours for a skill."""
-        total_minutes = self.db.query(func.sum(ProgressLog.time_spent)).filter(
-            ProgressLog.skill_id == skill_id
-        ).scalar() or 0
+    async def purge_children(self, model: Type[Base], skill_id: int, limit: int) -> int:
+        """
+        Delete up to `limit` rows of `model` that belong to a deleted skill.
+        
+        Rows locked by another purge of the same skill are skipped rather than
+        waited for. Returns how many rows were deleted.
+        """
+        key = tuple_(*model.__table__.primary_key.columns)
+        batch = select(*model.__table__.primary_key.columns).where(
+            model.skill_id == skill_id
+        ).limit(limit).with_for_update(skip_locked=True)
         
-        self.db.query(Skill).filter(Skill.id == skill_id).update(
-            {"total_hours": total_minutes}
+        result = await self.db.execute(
+            delete(model).where(key.in_(batch)).execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+    
+    async def purge(self, skill_id: int) -> None:
+        """Delete a deleted skill's row; anything written to it since is removed by ON DELETE CASCADE."""
+        await self.db.execute(
+            delete(Skill).where(
+                and_(Skill.id == skill_id, Skill.deleted_at.is_not(None))
+            ).execution_options(synchronize_session=False)
         )
-        self.db.commit()
     
-    def get_skill_with_stats(self, skill_id: int, user_id: int) -> Optional[dict]:
+    async def add_total_hours(self, skill_id: int, minutes: int) -> None:
+        """
+        Add a change in logged minutes to a skill's running total.
+        
+        Runs inside the caller's transaction, as a single UPDATE, so the cost
+        does not depend on how many logs the skill has.
+        """
+        await self.db.execute(
+            update(Skill).where(Skill.id == skill_id).values(
+                total_hours=func.coalesce(Skill.total_hours, 0) + minutes
+            )
+        )
+    
+    async def add_total_hours_many(self, minutes_by_skill: Dict[int, int]) -> None:
+        """
+        Add logged minutes to several skills' totals with one
+        UPDATE ... FROM (VALUES ...), in the caller's transaction.
+        """
+        deltas = values(
+            column("skill_id", Integer), column("minutes", Integer), name="deltas"
+        ).data(sorted(minutes_by_skill.items()))
+        await self.db.execute(
+            update(Skill).where(Skill.id == deltas.c.skill_id).values(
+                total_hours=func.coalesce(Skill.total_hours, 0) + deltas.c.minutes
+            )
+        )
+        
+    async def reconcile_total_hours(self, after_id: int, limit: int) -> Tuple[List[int], List[Tuple[int, int]]]:
+        """
+        Repair drifted totals for the next batch of skills by id.
+        
+        Returns the ids checked (empty once past the last skill) and
+        (skill_id, corrected total) for every skill that drifted.
+        """
+        # Lock the batch before summing. Writers insert their log and then
+        # update the skill row, so once the rows are locked every committed
+        # log is visible to the next statement and uncommitted ones will add
+        # their delta after us.
+        skill_ids = list((await self.db.scalars(
+            select(Skill.id).where(Skill.id > after_id).order_by(Skill.id).limit(limit).with_for_update()
+        )).all())
+        if not skill_ids:
+            return [], []
+        
+        logged = select(
+            func.coalesce(func.sum(ProgressLog.time_spent), 0)
+        ).where(ProgressLog.skill_id == Skill.id).scalar_subquery()
+        
+        result = await self.db.execute(
+            update(Skill).where(
+                Skill.id.in_(skill_ids),
+                Skill.total_hours.is_distinct_from(logged)
+            ).values(total_hours=logged).returning(Skill.id, Skill.total_hours)
+        )
+        return skill_ids, [tuple(row) for row in result.all()]
+    
+    async def get_skill_with_stats(self, skill_id: int, user_id: int) -> Optional[dict]:
         """Get skill with additional statistics."""
-        skill = self.get_by_id(skill_id, user_id)
+        skill = await self.get_by_id(skill_id, user_id)
         if not skill:
             return None
         
         # Count progress logs
-        progress_count = self.db.query(func.count(ProgressLog.id)).filter(
-            ProgressLog.skill_id == skill_id
-        ).scalar()
+        progress_count = await self.db.scalar(
+            select(func.count(ProgressLog.id)).where(ProgressLog.skill_id == skill_id)
+        )
         
         # Get last practice date
-        last_practiced = self.db.query(func.max(ProgressLog.date)).filter(
-            ProgressLog.skill_id == skill_id
-        ).scalar()
+        last_practiced = await self.db.scalar(
+            select(func.max(ProgressLog.date)).where(ProgressLog.skill_id == skill_id)
+        )
         
-        # Calculate streak (simplified - consecutive days)
-        streak_days = self._calculate_streak(skill_id)
+        # Current streak from the maintained streak state
+        streak_days = await StreakRepository(self.db).get_current_streak(user_id, skill_id)
         
         return {
             "skill": skill,
@@ -164,11 +328,11 @@ class SkillRepository:
     
 
 
-    def get_user_stats(self, user_id: int) -> Dict[str, Any]:
+    async def get_user_stats(self, user_id: int) -> Dict[str, Any]:
         """Get statistics about user's skills."""
 
-        stats = (
-            self.db.query(
+        stats = (await self.db.execute(
+            select(
                 func.count(Skill.id).label("total_skills"),
 
                 func.sum(
@@ -196,9 +360,8 @@ class SkillRepository:
                 .label("total_learning_time"),
             )
             .outerjoin(ProgressLog, ProgressLog.skill_id == Skill.id)
-            .filter(Skill.user_id == user_id)
-            .first()
-        )
+            .where(Skill.user_id == user_id, Skill.deleted_at.is_(None))
+        )).one()
 
         return {
             "total_skills": stats.total_skills or 0,
@@ -211,52 +374,24 @@ class SkillRepository:
 
 
 
-    def bulk_update_status(self, user_id: int, skill_ids: List[int], status: SkillStatus) -> int:
+    async def bulk_update_status(self, user_id: int, skill_ids: List[int], status: SkillStatus) -> int:
         """Update status for multiple skills."""
-        result = self.db.query(Skill).filter(
-            and_(Skill.user_id == user_id, Skill.id.in_(skill_ids))
-        ).update(
-            {"status": status, "updated_at": datetime.utcnow()},
-            synchronize_session=False
+        result = await self.db.execute(
+            update(Skill).where(
+                and_(Skill.user_id == user_id, Skill.id.in_(skill_ids), Skill.deleted_at.is_(None))
+            ).values(
+                status=status, updated_at=datetime.utcnow()
+            ).execution_options(synchronize_session=False)
         )
-        self.db.commit()
-        return result
-    
-    def _calculate_streak(self, skill_id: int) -> int:
-        """Calculate current learning streak for a skill."""
-        # Get last 30 days of progress
-        dates = self.db.query(ProgressLog.date).filter(
-            ProgressLog.skill_id == skill_id
-        ).order_by(desc(ProgressLog.date)).limit(30).all()
-        
-        if not dates:
-            return 0
-        
-        dates = [d[0] for d in dates]
-        today = date.today()
-        
-        # Check if practiced today or yesterday
-        if dates[0] != today and dates[0] != today.replace(day=today.day - 1):
-            return 0
-        
-        # Count consecutive days
-        streak = 1
-        for i in range(len(dates) - 1):
-            diff = (dates[i] - dates[i + 1]).days
-            if diff == 1:
-                streak += 1
-            else:
-                break
-        
-        return streak
+        return result.rowcount
     
-    def check_skill_exists(self, user_id: int, name: str, exclude_id: Optional[int] = None) -> bool:
+    async def check_skill_exists(self, user_id: int, name: str, exclude_id: Optional[int] = None) -> bool:
         """Check if a skill with the same name exists for the user."""
-        query = self.db.query(Skill).filter(
-            and_(Skill.user_id == user_id, Skill.name == name)
+        query = select(Skill.id).where(
+            and_(Skill.user_id == user_id, Skill.name == name, Skill.deleted_at.is_(None))
         )
         
         if exclude_id:
-            query = query.filter(Skill.id != exclude_id)
+            query = query.where(Skill.id != exclude_id)
         
-        return query.first() is not None
+        return await self.db.scalar(query.limit(1)) is not None
@@ -0,0 +1,425 @@
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, insert, func, and_, cast, null, union_all, Integer, ColumnElement
+from sqlalchemy.dialects.postgresql import insert as pg_insert, array_agg, aggregate_order_by
+from datetime import date, timedelta
+
+from app.models.progress import ProgressLog
+from app.models.skill import Skill
+from app.models.streak import StreakState
+
+
+def _runs_cte(days, partition: List[str]):
+    """
+    Collapse active days into runs of consecutive dates (gaps and islands).
+    
+    Consecutive dates share the same `day - row_number()` value, so grouping
+    on it yields one row per run with its end date and length.
+    """
+    keys = [days.c[name] for name in partition]
+    islands = select(
+        *keys,
+        days.c.day,
+        (
+            days.c.day
+            - cast(func.row_number().over(partition_by=keys or None, order_by=days.c.day), Integer)
+        ).label("island")
+    ).cte("islands")
+    
+    island_keys = [islands.c[name] for name in partition]
+    return select(
+        *island_keys,
+        func.max(islands.c.day).label("run_end"),
+        func.count().label("run_length")
+    ).group_by(*island_keys, islands.c.island).cte("runs")
+
+
+def _live_logs(owner: ColumnElement) -> ColumnElement:
+    """
+    Exclude logs of deleted skills still waiting for the purge; `owner`
+    limits the deleted skills looked up to the users concerned.
+    """
+    return ProgressLog.skill_id.not_in(
+        select(Skill.id).where(owner, Skill.deleted_at.is_not(None))
+    )
+
+
+class StreakRepository:
+    """Repository for incrementally maintained streak state."""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def get(self, user_id: int, skill_id: Optional[int] = None) -> Optional[StreakState]:
+        """Get streak state for a user, or for one of their skills."""
+        return await self.db.scalar(
+            select(StreakState).where(*self._state_filters(user_id, skill_id))
+        )
+    
+    async def get_current_streak(self, user_id: int, skill_id: Optional[int] = None) -> int:
+        """Current streak, which lapses once a full day passes without practice."""
+        state = await self.get(user_id, skill_id)
+        if not state or not state.last_active_date:
+            return 0
+        
+        if state.last_active_date < date.today() - timedelta(days=1):
+            return 0
+        return state.current_streak
+    
+    async def record_log_added(self, user_id: int, skill_id: int, day: date) -> None:
+        """
+        Update streaks after a progress log was flushed for `day`.
+        
+        The skill always gains the day (one log per skill per day); the
+        user only gains it if this is their first log on that day.
+        """
+        await self.record_logs_added(user_id, [(skill_id, day)])
+    
+    async def record_logs_added(self, user_id: int, logs: List[Tuple[int, date]]) -> None:
+        """
+        Update streaks after new progress logs, given as (skill_id, date)
+        pairs, were flushed.
+        
+        Each affected skill, and the user, is updated once with all of the
+        days it gained, however many logs there are.
+        """
+        # Lock the user row first: it serializes concurrent writes for the
+        # user, so the per-day log counts below see committed neighbours.
+        user_state = await self._get_for_update(user_id, None)
+        
+        days_by_skill = defaultdict(set)
+        for skill_id, day in logs:
+            days_by_skill[skill_id].add(day)
+        for skill_id in sorted(days_by_skill):
+            await self._days_added(await self._get_for_update(user_id, skill_id), days_by_skill[skill_id])
+        
+        # The user gains the days on which these are their only logs
+        added = Counter(day for _, day in logs)
+        logged = await self._logs_per_day(user_id, set(added))
+        new_days = {day for day, count in added.items() if logged.get(day) == count}
+        if new_days:
+            await self._days_added(user_state, new_days)
+    
+    async def record_log_removed(self, user_id: int, skill_id: int, day: date) -> None:
+        """Update streaks after a progress log for `day` was deleted and flushed."""
+        user_state = await self._get_for_update(user_id, None)
+        await self._days_removed(await self._get_for_update(user_id, skill_id), {day})
+        
+        if await self._logs_on_day(user_id, day) == 0:
+            await self._days_removed(user_state, {day})
+    
+    async def record_skill_removed(self, user_id: int, skill_id: int) -> None:
+        """
+        Update streaks after a skill was soft deleted and flushed.
+        
+        The skill's own state is dropped, and the user loses the days on
+        which the skill had their only logs.
+        """
+        user_state = await self._get_for_update(user_id, None)
+        await self.db.execute(
+            delete(StreakState).where(*self._state_filters(user_id, skill_id))
+        )
+        
+        days = await self.db.scalars(
+            select(ProgressLog.date).where(ProgressLog.skill_id == skill_id)
+        )
+        await self._days_removed(user_state, set(days.all()))
+    
+    async def rebuild(self, user_ids: List[int]) -> None:
+        """Recompute user and skill streak state from the progress logs."""
+        # Take the user row locks the incremental updates take, so a rebuild
+        # waits for them and for other rebuilds of the same user instead of
+        # inserting state rows they are writing too
+        for user_id in sorted(set(user_ids)):
+            await self._get_for_update(user_id, None)
+        
+        await self.db.execute(
+            delete(StreakState).where(StreakState.user_id.in_(user_ids))
+        )
+        
+        logged = and_(
+            ProgressLog.user_id.in_(user_ids),
+            _live_logs(Skill.user_id.in_(user_ids))
+        )
+        
+        skill_days = select(
+            ProgressLog.user_id,
+            ProgressLog.skill_id,
+            ProgressLog.date.label("day")
+        ).where(logged)
+        
+        user_days = select(
+            ProgressLog.user_id,
+            cast(null(), Integer).label("skill_id"),
+            ProgressLog.date.label("day")
+        ).where(logged).distinct()
+        
+        days = union_all(skill_days, user_days).cte("days")
+        runs = _runs_cte(days, ["user_id", "skill_id"])
+        
+        lengths = select(
+            runs.c.user_id,
+            runs.c.skill_id,
+            runs.c.run_length,
+            func.count().label("runs")
+        ).group_by(runs.c.user_id, runs.c.skill_id, runs.c.run_length).cte("lengths")
+        
+        summary = select(
+            lengths.c.user_id,
+            lengths.c.skill_id,
+            func.max(lengths.c.run_length).label("longest_streak"),
+            func.jsonb_object_agg(lengths.c.run_length, lengths.c.runs).label("run_lengths")
+        ).group_by(lengths.c.user_id, lengths.c.skill_id).cte("summary")
+        
+        latest = select(
+            runs.c.user_id,
+            runs.c.skill_id,
+            array_agg(aggregate_order_by(runs.c.run_length, runs.c.run_end.desc()))[1].label("current_streak"),
+            func.max(runs.c.run_end).label("last_active_date")
+        ).group_by(runs.c.user_id, runs.c.skill_id).cte("latest")
+        
+        await self.db.execute(
+            insert(StreakState).from_select(
+                ["user_id", "skill_id", "current_streak", "longest_streak", "last_active_date", "run_lengths"],
+                select(
+                    latest.c.user_id,
+                    latest.c.skill_id,
+                    latest.c.current_streak,
+                    summary.c.longest_streak,
+                    latest.c.last_active_date,
+                    summary.c.run_lengths
+                ).join(
+                    summary,
+                    and_(
+                        summary.c.user_id == latest.c.user_id,
+                        summary.c.skill_id.is_not_distinct_from(latest.c.skill_id)
+                    )
+                )
+            )
+        )
+    
+    async def _days_added(self, state: StreakState, days: Set[date]) -> None:
+        """Update `state` after `days` became active; their logs are flushed."""
+        last = state.last_active_date
+        
+        if last is None or min(days) > last:
+            # Common case: days after anything logged before, whose only
+            # possible neighbour is the run ending at last_active_date
+            active = set(days)
+            if last is not None:
+                active.update(last - timedelta(days=i) for i in range(state.current_streak))
+        else:
+            # Backdated days may bridge runs. Only runs through the days can
+            # change, and they reach at most longest_streak days past them.
+            window = timedelta(days=state.longest_streak + 1)
+            active = await self._active_dates(state, min(days) - window, max(days) + window)
+        
+        runs = self._runs_through(active, days)
+        self._move_runs(state, self._runs_through(active - days, self._neighbours(days)), runs)
+        state.longest_streak = max([state.longest_streak] + [self._length(run) for run in runs])
+        if last is None or max(days) > last:
+            state.last_active_date = max(days)
+        for run in runs:
+            if run[1] == state.last_active_date:
+                state.current_streak = self._length(run)
+    
+    async def _days_removed(self, state: StreakState, days: Set[date]) -> None:
+        """Update `state` after `days` stopped being active; their logs are deleted and flushed."""
+        last = state.last_active_date
+        days = {day for day in days if last is not None and day <= last}
+        if not days:
+            return
+        
+        # Only runs through the days can change, and they reached at most
+        # longest_streak days past them
+        window = timedelta(days=state.longest_streak + 1)
+        active = await self._active_dates(state, min(days) - window, max(days) + window)
+        days -= active
+        if not days:
+            return
+        
+        removed = self._runs_through(active | days, days)
+        remaining = self._runs_through(active, self._neighbours(days))
+        self._move_runs(state, removed, remaining)
+        
+        if last in days:
+            previous = max(active) if active else await self.db.scalar(
+                select(func.max(ProgressLog.date)).where(*self._log_filters(state))
+            )
+            if previous is None:
+                state.current_streak = 0
+                state.longest_streak = 0
+                state.last_active_date = None
+                state.run_lengths = {}
+                return
+            start = previous - timedelta(days=self._count_run(active, previous, -1))
+            if start <= min(days) - window:
+                # The run may carry on below the dates fetched
+                start, _ = await self._run_around(state, previous)
+            state.last_active_date = previous
+            state.current_streak = (previous - start).days + 1
+        else:
+            # Split the current run; only the days after the removed ones remain
+            for run in remaining:
+                if run[1] == last:
+                    state.current_streak = self._length(run)
+        
+        # Only a split of a longest run can lower longest_streak
+        if max(self._length(run) for run in removed) < state.longest_streak:
+            return
+        if state.run_lengths is None:
+            state.run_lengths = await self._scan_run_lengths(state)
+        state.longest_streak = max(map(int, state.run_lengths), default=0)
+    
+    async def _run_around(self, state: StreakState, day: date):
+        """First and last date of the run of active days containing `day`."""
+        window = state.longest_streak + 1
+        active = await self._active_dates(
+            state,
+            day - timedelta(days=window),
+            day + timedelta(days=window)
+        )
+        start = day - timedelta(days=self._count_run(active, day, -1))
+        end = day + timedelta(days=self._count_run(active, day, 1))
+        return start, end
+    
+    async def _scan_run_lengths(self, state: StreakState) -> Dict[str, int]:
+        """Count the runs of active days by length, from all of the logs."""
+        days = select(ProgressLog.date.label("day")).where(
+            *self._log_filters(state)
+        ).distinct().cte("days")
+        runs = _runs_cte(days, [])
+        
+        rows = await self.db.execute(
+            select(runs.c.run_length, func.count()).group_by(runs.c.run_length)
+        )
+        return {str(length): count for length, count in rows.all()}
+    
+    async def _active_dates(self, state: StreakState, start: date, end: date) -> Set[date]:
+        dates = await self.db.scalars(
+            select(ProgressLog.date).where(
+                *self._log_filters(state),
+                ProgressLog.date >= start,
+                ProgressLog.date <= end
+            ).distinct()
+        )
+        return set(dates.all())
+    
+    async def _logs_per_day(self, user_id: int, days: Set[date]) -> Dict[date, int]:
+        rows = await self.db.execute(
+            select(ProgressLog.date, func.count(ProgressLog.id)).where(
+                ProgressLog.user_id == user_id,
+                ProgressLog.date.in_(days),
+                _live_logs(Skill.user_id == user_id)
+            ).group_by(ProgressLog.date)
+        )
+        return dict(rows.all())
+    
+    async def _logs_on_day(self, user_id: int, day: date) -> int:
+        return await self.db.scalar(
+            select(func.count(ProgressLog.id)).where(
+                ProgressLog.user_id == user_id,
+                ProgressLog.date == day,
+                _live_logs(Skill.user_id == user_id)
+            )
+        )
+    
+    async def _get_for_update(self, user_id: int, skill_id: Optional[int]) -> StreakState:
+        """Fetch the state row with a row lock, creating it if missing."""
+        query = select(StreakState).where(
+            *self._state_filters(user_id, skill_id)
+        ).with_for_update()
+        
+        if skill_id is None:
+            conflict = {"index_elements": ["user_id"], "index_where": StreakState.skill_id.is_(None)}
+        else:
+            conflict = {"index_elements": ["user_id", "skill_id"], "index_where": StreakState.skill_id.isnot(None)}
+        
+        # A rebuild replaces the row while we wait for its lock, so the row
+        # may be gone once the lock is granted; look again for its successor
+        while True:
+            state = await self.db.scalar(query)
+            if state:
+                return state
+            
+            await self.db.execute(
+                pg_insert(StreakState).values(
+                    user_id=user_id,
+                    skill_id=skill_id,
+                    current_streak=0,
+                    longest_streak=0,
+                    run_lengths={}
+                ).on_conflict_do_nothing(**conflict)
+            )
+    
+    @staticmethod
+    def _count_run(active: Set[date], day: date, step: int) -> int:
+        """Number of consecutive active days next to `day` in one direction."""
+        count = 0
+        current = day + timedelta(days=step)
+        while current in active:
+            count += 1
+            current += timedelta(days=step)
+        return count
+    
+    @staticmethod
+    def _runs_through(active: Set[date], days: Set[date]) -> List[Tuple[date, date]]:
+        """First and last date of each run of `active` dates containing one of `days`."""
+        runs = []
+        for day in sorted(days):
+            if day not in active or (runs and day <= runs[-1][1]):
+                continue
+            runs.append((
+                day - timedelta(days=StreakRepository._count_run(active, day, -1)),
+                day + timedelta(days=StreakRepository._count_run(active, day, 1))
+            ))
+        return runs
+    
+    @staticmethod
+    def _move_runs(
+        state: StreakState,
+        removed: List[Tuple[date, date]],
+        added: List[Tuple[date, date]]
+    ) -> None:
+        """Replace the `removed` runs with the `added` ones in the run length counts."""
+        if state.run_lengths is None:
+            return
+        
+        counts = dict(state.run_lengths)
+        for run in removed:
+            key = str(StreakRepository._length(run))
+            counts[key] = counts.get(key, 0) - 1
+            if counts[key] < 0:
+                # Out of step with the logs; counted again when next needed
+                state.run_lengths = None
+                return
+            if not counts[key]:
+                del counts[key]
+        for run in added:
+            key = str(StreakRepository._length(run))
+            counts[key] = counts.get(key, 0) + 1
+        state.run_lengths = counts
+    
+    @staticmethod
+    def _neighbours(days: Set[date]) -> Set[date]:
+        return {day + timedelta(days=step) for day in days for step in (-1, 1)}
+    
+    @staticmethod
+    def _length(run: Tuple[date, date]) -> int:
+        return (run[1] - run[0]).days + 1
+    
+    @staticmethod
+    def _state_filters(user_id: int, skill_id: Optional[int]) -> list:
+        if skill_id is None:
+            return [StreakState.user_id == user_id, StreakState.skill_id.is_(None)]
+        return [StreakState.user_id == user_id, StreakState.skill_id == skill_id]
+    
+    @staticmethod
+    def _log_filters(state: StreakState) -> list:
+        filters = [ProgressLog.user_id == state.user_id]
+        if state.skill_id is not None:
+            filters.append(ProgressLog.skill_id == state.skill_id)
+        else:
+            filters.append(_live_logs(Skill.user_id == state.user_id))
+        return filters
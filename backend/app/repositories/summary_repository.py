@@ -1,21 +1,23 @@
 
 from typing import List, Optional, Tuple
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, desc, extract
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, and_, desc, extract
 from datetime import date, timedelta
 
 from app.models.summary import WeeklySummary
-from app.models.progress import ProgressLog
+from app.models.rollup import ProgressDailyRollup
 from app.models.skill import Skill
+from app.repositories.skill_repository import deleted_skill_ids
+from app.utils.pagination import after_cursor
 
 
 class SummaryRepository:
     """Repository for WeeklySummary database operations."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def create(
+    async def create(
         self,
         user_id: int,
         week_start: date,
@@ -35,100 +37,126 @@ class SummaryRepository:
         )
         
         self.db.add(summary)
-        self.db.commit()
-        self.db.refresh(summary)
+        await self.db.flush()
         return summary
     
-    def get_by_id(self, summary_id: int, user_id: int) -> Optional[WeeklySummary]:
+    async def get_by_id(self, summary_id: int, user_id: int) -> Optional[WeeklySummary]:
         """Get summary by ID for a specific user."""
-        return self.db.query(WeeklySummary).filter(
-            and_(WeeklySummary.id == summary_id, WeeklySummary.user_id == user_id)
-        ).first()
+        return await self.db.scalar(
+            select(WeeklySummary).where(
+                and_(WeeklySummary.id == summary_id, WeeklySummary.user_id == user_id)
+            )
+        )
     
-    def get_by_week(self, user_id: int, week_start: date) -> Optional[WeeklySummary]:
+    async def get_by_week(self, user_id: int, week_start: date) -> Optional[WeeklySummary]:
         """Get summary for a specific week."""
-        return self.db.query(WeeklySummary).filter(
-            and_(WeeklySummary.user_id == user_id, WeeklySummary.week_start == week_start)
-        ).first()
+        return await self.db.scalar(
+            select(WeeklySummary).where(
+                and_(WeeklySummary.user_id == user_id, WeeklySummary.week_start == week_start)
+            )
+        )
     
-    def get_all(
+    async def get_all(
         self,
         user_id: int,
         year: Optional[int] = None,
         month: Optional[int] = None,
         skip: int = 0,
-        limit: int = 20
-    ) -> Tuple[List[WeeklySummary], int]:
-        """Get all summaries for a user with filters and pagination."""
-        query = self.db.query(WeeklySummary).filter(WeeklySummary.user_id == user_id)
+        limit: int = 20,
+        after: Optional[Tuple[date, int]] = None
+    ) -> List[WeeklySummary]:
+        """
+        Get summaries for a user, latest week first.
+        
+        Pages either by `skip` or, with `after`, by keyset on
+        (week_start, id) from a previous page's last row.
+        """
+        filters = self._list_filters(user_id, year, month)
+        
+        sort_key = (WeeklySummary.week_start, WeeklySummary.id)
+        if after:
+            filters.append(after_cursor(sort_key, after))
+        
+        summaries = (await self.db.scalars(
+            select(WeeklySummary).where(*filters).order_by(
+                *(desc(column) for column in sort_key)
+            ).offset(skip).limit(limit)
+        )).all()
+        return list(summaries)
+    
+    async def count(
+        self,
+        user_id: int,
+        year: Optional[int] = None,
+        month: Optional[int] = None
+    ) -> int:
+        """Count summaries for a user matching the list filters."""
+        filters = self._list_filters(user_id, year, month)
+        return await self.db.scalar(
+            select(func.count(WeeklySummary.id)).where(*filters)
+        ) or 0
+    
+    @staticmethod
+    def _list_filters(user_id: int, year: Optional[int], month: Optional[int]) -> list:
+        filters = [WeeklySummary.user_id == user_id]
         
         # Apply filters
         if year:
-            query = query.filter(extract("year", WeeklySummary.week_start) == year)
+            filters.append(extract("year", WeeklySummary.week_start) == year)
         
         if month:
-            query = query.filter(extract("month", WeeklySummary.week_start) == month)
-        
-        # Get total count
-        total = query.count()
+            filters.append(extract("month", WeeklySummary.week_start) == month)
         
-        # Get paginated results
-        summaries = query.order_by(desc(WeeklySummary.week_start)).offset(skip).limit(limit).all()
-        
-        return summaries, total
+        return filters
     
-    def update(self, summary: WeeklySummary, **kwargs) -> WeeklySummary:
+    async def update(self, summary: WeeklySummary, **kwargs) -> WeeklySummary:
         """Update summary with provided fields."""
         for key, value in kwargs.items():
             if value is not None and hasattr(summary, key):
                 setattr(summary, key, value)
         
-        self.db.commit()
-        self.db.refresh(summary)
+        await self.db.flush()
         return summary
     
-    def delete(self, summary: WeeklySummary) -> None:
+    async def delete(self, summary: WeeklySummary) -> None:
         """Delete a summary."""
-        self.db.delete(summary)
-        self.db.commit()
+        await self.db.delete(summary)
+        await self.db.flush()
     
-    def get_week_data(self, user_id: int, week_start: date, week_end: date) -> dict:
+    async def get_week_data(self, user_id: int, week_start: date, week_end: date) -> dict:
         """Get aggregated data for a week."""
+        in_week = and_(
+            ProgressDailyRollup.user_id == user_id,
+            ProgressDailyRollup.skill_id.not_in(deleted_skill_ids(user_id)),
+            ProgressDailyRollup.date >= week_start,
+            ProgressDailyRollup.date <= week_end
+        )
+        
         # Total time and skills count
-        stats = self.db.query(
-            func.sum(ProgressLog.time_spent).label("total_time"),
-            func.count(func.distinct(ProgressLog.skill_id)).label("skills_count")
-        ).filter(
-            and_(
-                ProgressLog.user_id == user_id,
-                ProgressLog.date >= week_start,
-                ProgressLog.date <= week_end
-            )
-        ).first()
+        stats = (await self.db.execute(
+            select(
+                func.sum(ProgressDailyRollup.minutes).label("total_time"),
+                func.count(func.distinct(ProgressDailyRollup.skill_id)).label("skills_count")
+            ).where(in_week)
+        )).one()
         
         # Skills breakdown
-        skills_breakdown = self.db.query(
-            Skill.name,
-            func.sum(ProgressLog.time_spent).label("time_spent")
-        ).join(ProgressLog).filter(
-            and_(
-                ProgressLog.user_id == user_id,
-                ProgressLog.date >= week_start,
-                ProgressLog.date <= week_end
-            )
-        ).group_by(Skill.name).order_by(desc("time_spent")).all()
+        skills_breakdown = (await self.db.execute(
+            select(
+                Skill.name,
+                func.sum(ProgressDailyRollup.minutes).label("time_spent")
+            ).join(Skill, Skill.id == ProgressDailyRollup.skill_id).where(
+                in_week
+            ).group_by(Skill.name).order_by(desc("time_spent"))
+        )).all()
         
         # Daily breakdown
-        daily_breakdown = self.db.query(
-            ProgressLog.date,
-            func.sum(ProgressLog.time_spent).label("time_spent")
-        ).filter(
-            and_(
-                ProgressLog.user_id == user_id,
-                ProgressLog.date >= week_start,
-                ProgressLog.date <= week_end
-            )
-        ).group_by(ProgressLog.date).order_by(ProgressLog.date).all()
+        daily_breakdown = (await self.db.execute(
+            select(
+                ProgressDailyRollup.date,
+                func.sum(ProgressDailyRollup.minutes).label("time_spent")
+            ).where(in_week).group_by(ProgressDailyRollup.date).order_by(ProgressDailyRollup.date)
+        )).all()
         
         total_time = stats.total_time or 0
         
@@ -160,20 +188,24 @@ class SummaryRepository:
             "average_daily_time": total_time // 7 if total_time > 0 else 0
         }
     
-    def get_stats(self, user_id: int) -> dict:
+    async def get_stats(self, user_id: int) -> dict:
         """Get overall summary statistics."""
-        stats = self.db.query(
-            func.count(WeeklySummary.id).label("total"),
-            func.avg(WeeklySummary.total_hours).label("avg_time")
-        ).filter(WeeklySummary.user_id == user_id).first()
+        stats = (await self.db.execute(
+            select(
+                func.count(WeeklySummary.id).label("total"),
+                func.avg(WeeklySummary.total_hours).label("avg_time")
+            ).where(WeeklySummary.user_id == user_id)
+        )).one()
         
         # Find most productive week
-        most_productive = self.db.query(
-            WeeklySummary.week_start,
-            WeeklySummary.total_hours
-        ).filter(WeeklySummary.user_id == user_id).order_by(
-            desc(WeeklySummary.total_hours)
-        ).first()
+        most_productive = (await self.db.execute(
+            select(
+                WeeklySummary.week_start,
+                WeeklySummary.total_hours
+            ).where(WeeklySummary.user_id == user_id).order_by(
+                desc(WeeklySummary.total_hours)
+            ).limit(1)
+        )).first()
         
         return {
             "total_summaries": stats.total or 0,
@@ -1,68 +1,94 @@
 
 from typing import Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import select, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async
 
 
 class UserRepository:
     """Repository for User database operations."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def get_by_id(self, user_id: int) -> Optional[User]:
+    async def get_by_id(self, user_id: int) -> Optional[User]:
         """Get user by ID."""
-        return self.db.query(User).filter(User.id == user_id).first()
+        return await self.db.scalar(select(User).where(User.id == user_id))
     
-    def get_by_email(self, email: str) -> Optional[User]:
+    async def get_by_email(self, email: str) -> Optional[User]:
         """Get user by email."""
-        return self.db.query(User).filter(User.email == email).first()
+        return await self.db.scalar(select(User).where(User.email == email))
     
-    def get_by_username(self, username: str) -> Optional[User]:
+    async def get_by_username(self, username: str) -> Optional[User]:
         """Get user by username."""
-        return self.db.query(User).filter(User.username == username).first()
+        return await self.db.scalar(select(User).where(User.username == username))
     
-    def create(self, email: str, username: str, password: str, full_name: Optional[str] = None) -> User:
-        """Create a new user."""
-        hashed_password = get_password_hash(password)
+    async def release_connection(self) -> None:
+        """
+        End the current read transaction so the pooled connection is
+        returned while bcrypt runs on the hashing pool.
+        """
+        await self.db.commit()
+    
+    async def create(self, email: str, username: str, password: str, full_name: Optional[str] = None) -> User:
+        """
+        Create a new user with a single INSERT ... RETURNING.
         
-        user = User(
-            email=email,
-            username=username,
-            hashed_password=hashed_password,
-            full_name=full_name,
-            is_active=True,
-            is_verified=False
-        )
+        Email and username uniqueness is left to the unique indexes, so a
+        duplicate raises IntegrityError for the caller to map.
+        """
+        hashed_password = await get_password_hash_async(password)
         
-        self.db.add(user)
-        self.db.commit()
-        self.db.refresh(user)
-        return user
+        return await self.db.scalar(
+            insert(User)
+            .values(
+                email=email,
+                username=username,
+                hashed_password=hashed_password,
+                full_name=full_name,
+                is_active=True,
+                is_verified=False
+            )
+            .returning(User)
+        )
     
-    def update(self, user: User) -> User:
-        """Update user."""
-        self.db.commit()
-        self.db.refresh(user)
+    async def update(self, user: User) -> User:
+        """Write pending changes to a user; updated_at comes back through RETURNING."""
+        await self.db.flush()
         return user
     
-    def update_password(self, user: User, new_password: str) -> User:
+    async def update_password(self, user: User, new_password: str) -> User:
         """Update user password."""
-        user.hashed_password = get_password_hash(new_password)
-        return self.update(user)
+        await self.release_connection()
+        user.hashed_password = await get_password_hash_async(new_password)
+        return await self.update(user)
+    
+    async def replace_password_hash(self, user_id: int, old_hash: str, new_hash: str) -> bool:
+        """
+        Swap a password hash for an equivalent one at another cost.
+        
+        Only applies if the stored hash is still `old_hash`, so it cannot
+        undo a password change made in the meantime.
+        """
+        result = await self.db.execute(
+            update(User)
+            .where(User.id == user_id, User.hashed_password == old_hash)
+            .values(hashed_password=new_hash)
+        )
+        return result.rowcount == 1
     
-    def deactivate(self, user: User) -> User:
+    async def deactivate(self, user: User) -> User:
         """Deactivate user account."""
         user.is_active = False
-        return self.update(user)
+        return await self.update(user)
     
-    def activate(self, user: User) -> User:
+    async def activate(self, user: User) -> User:
         """Activate user account."""
         user.is_active = True
-        return self.update(user)
+        return await self.update(user)
     
-    def verify_email(self, user: User) -> User:
+    async def verify_email(self, user: User) -> User:
         """Mark user email as verified."""
         user.is_verified = True
-        return self.update(user)
\ No newline at end of file
+        return await self.update(user)
\ No newline at end of file
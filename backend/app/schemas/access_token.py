@@ -0,0 +1,43 @@
+from pydantic import BaseModel, Field, validator
+from typing import Optional, List
+from datetime import datetime
+
+from app.models.access_token import TokenScope
+
+
+# Request Schemas
+class AccessTokenCreate(BaseModel):
+    """Schema for creating a personal access token."""
+    name: str = Field(..., min_length=1, max_length=100)
+    scopes: List[TokenScope] = Field(..., min_length=1)
+    expires_in_days: Optional[int] = Field(None, ge=1, le=3650)  # None never expires
+    
+    @validator("name")
+    def name_not_empty(cls, v):
+        if not v.strip():
+            raise ValueError("Name cannot be empty")
+        return v.strip()
+    
+    @validator("scopes")
+    def unique_scopes(cls, v):
+        return list(dict.fromkeys(v))
+
+
+# Response Schemas
+class AccessTokenResponse(BaseModel):
+    """Schema for a personal access token, without its secret."""
+    id: int
+    name: str
+    key_id: str
+    scopes: List[str]
+    expires_at: Optional[datetime]
+    last_used_at: Optional[datetime]
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class AccessTokenCreatedResponse(AccessTokenResponse):
+    """Schema for a newly created token; the only time the token is shown."""
+    token: str
@@ -78,6 +78,17 @@ class UserResponse(BaseModel):
         from_attributes = True
 
 
+class SessionResponse(BaseModel):
+    """Schema for a signed-in device session."""
+    id: str
+    device: Optional[str]
+    ip: Optional[str]
+    created_at: datetime
+    last_seen: datetime
+    expires_at: datetime
+    current: bool = False
+
+
 class AuthResponse(BaseModel):
     """Schema for authentication response."""
     user: UserResponse
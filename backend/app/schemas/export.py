@@ -0,0 +1,15 @@
+from enum import Enum
+
+
+# Enums
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+    PARQUET = "parquet"
+
+
+class ExportSection(str, Enum):
+    SKILLS = "skills"
+    PROGRESS_LOGS = "progress_logs"
+    RESOURCES = "resources"
+    SUMMARIES = "summaries"
@@ -0,0 +1,50 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+from enum import Enum
+
+
+# Enums
+class ImportFormatEnum(str, Enum):
+    CSV = "csv"
+    JSONL = "jsonl"
+    ICS = "ics"
+
+
+class ImportStatusEnum(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+# Response Schemas
+class ImportRowErrorResponse(BaseModel):
+    """A skipped row of an import file."""
+    line: int
+    reason: str
+
+
+class ImportJobResponse(BaseModel):
+    """Schema for an import job and how far it has got."""
+    id: int
+    format: ImportFormatEnum
+    mode: str
+    status: ImportStatusEnum
+    filename: Optional[str]
+    total_bytes: int
+    processed_bytes: int
+    progress: float = 0  # Share of the file processed, 0-1
+    rows_read: int
+    rows_skipped: int
+    logs_created: int
+    logs_updated: int
+    skills_created: int
+    errors: List[ImportRowErrorResponse]  # The first skipped rows
+    error: Optional[str]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    
+    class Config:
+        from_attributes = True
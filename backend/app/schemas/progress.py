@@ -2,6 +2,7 @@
 from pydantic import BaseModel, Field, validator
 from typing import Optional, List, Dict
 from datetime import datetime, date
+from enum import Enum
 
 
 # Request Schemas
@@ -28,6 +29,22 @@ class ProgressLogCreate(BaseModel):
         return v
 
 
+class ProgressLogBatchCreate(BaseModel):
+    """Schema for creating many progress logs at once."""
+    logs: List[ProgressLogCreate] = Field(..., min_length=1, max_length=1000)
+
+
+class ProgressUpsertMode(str, Enum):
+    """How an upsert combines with an existing log for the day."""
+    REPLACE = "replace"
+    ACCUMULATE = "accumulate"
+
+
+class ProgressLogUpsert(ProgressLogCreate):
+    """Schema for logging time on a day that may already have a log."""
+    mode: ProgressUpsertMode = ProgressUpsertMode.ACCUMULATE
+
+
 class ProgressLogUpdate(BaseModel):
     """Schema for updating a progress log."""
     time_spent: Optional[int] = Field(None, gt=0, description="Time spent in minutes")
@@ -80,6 +97,33 @@ class ProgressLogResponse(BaseModel):
         return f"{minutes}m"
 
 
+class ProgressLogUpsertResponse(ProgressLogResponse):
+    """Progress log after an upsert."""
+    created: bool
+
+
+class BatchItemStatus(str, Enum):
+    """Outcome of one item of a batch."""
+    CREATED = "created"
+    DUPLICATE = "duplicate"
+    SKILL_NOT_FOUND = "skill_not_found"
+
+
+class ProgressBatchItemResult(BaseModel):
+    """Result for the batch item at `index`."""
+    index: int
+    status: BatchItemStatus
+    log: Optional[ProgressLogResponse] = None
+    detail: Optional[str] = None
+
+
+class ProgressLogBatchResponse(BaseModel):
+    """Per-item results of a batch, in request order."""
+    created: int
+    failed: int
+    results: List[ProgressBatchItemResult]
+
+
 class ProgressLogWithSkill(ProgressLogResponse):
     """Progress log with skill details."""
     # skill_name: str
@@ -90,10 +134,11 @@ class ProgressLogWithSkill(ProgressLogResponse):
 class ProgressListResponse(BaseModel):
     """Paginated progress log list response."""
     logs: List[ProgressLogResponse]
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 class DailyProgressStats(BaseModel):
@@ -144,6 +189,33 @@ class MonthlyProgressStats(BaseModel):
         return f"{hours}h"
 
 
+class StatsBucket(str, Enum):
+    """Bucket size for range statistics."""
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+class ProgressBucketStats(BaseModel):
+    """Progress totals for one bucket of a date range."""
+    bucket_start: date  # First day of the day/week (Monday)/month
+    total_time: int  # Minutes
+    skills_practiced: int
+    log_count: int
+
+
+class ProgressRangeStats(BaseModel):
+    """Progress statistics for an arbitrary date range."""
+    start_date: date
+    end_date: date
+    bucket: StatsBucket
+    total_time: int  # Minutes
+    skills_practiced: int
+    log_count: int
+    active_days: int
+    series: List[ProgressBucketStats]  # Zero-filled, one entry per bucket
+
+
 class ProgressStatsResponse(BaseModel):
     """Overall progress statistics."""
     total_logs: int
@@ -80,10 +80,11 @@ class ResourceResponse(BaseModel):
 class ResourceListResponse(BaseModel):
     """Paginated resource list response."""
     resources: List[ResourceResponse]
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 class ResourceStatsResponse(BaseModel):
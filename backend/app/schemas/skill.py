@@ -101,10 +101,11 @@ class SkillWithStats(SkillResponse):
 class SkillListResponse(BaseModel):
     """Paginated skill list response."""
     skills: List[SkillResponse]
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 class SkillStatsResponse(BaseModel):
@@ -60,10 +60,11 @@ class WeeklySummaryWithDetails(WeeklySummaryResponse):
 class SummaryListResponse(BaseModel):
     """Paginated summary list response."""
     summaries: List[WeeklySummaryResponse]
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 class SummaryStatsResponse(BaseModel):
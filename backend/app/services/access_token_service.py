@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta, timezone
+from typing import List
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repositories.access_token_repository import AccessTokenRepository
+from app.core.access_tokens import generate_access_token
+from app.core.dependencies import access_token_cache
+from app.schemas.access_token import (
+    AccessTokenCreate,
+    AccessTokenResponse,
+    AccessTokenCreatedResponse
+)
+
+
+class AccessTokenService:
+    """Service for personal access token management."""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.token_repo = AccessTokenRepository(db)
+    
+    async def create_token(self, user_id: int, token_data: AccessTokenCreate) -> AccessTokenCreatedResponse:
+        """Create a token; the plaintext is returned once and never stored."""
+        token, key_id, secret_hash = generate_access_token()
+        expires_at = None
+        if token_data.expires_in_days:
+            expires_at = datetime.now(timezone.utc) + timedelta(days=token_data.expires_in_days)
+        
+        created = await self.token_repo.create(
+            user_id=user_id,
+            name=token_data.name,
+            key_id=key_id,
+            secret_hash=secret_hash,
+            scopes=[scope.value for scope in token_data.scopes],
+            expires_at=expires_at
+        )
+        await self.db.commit()
+        
+        return AccessTokenCreatedResponse(
+            **AccessTokenResponse.from_orm(created).dict(),
+            token=token
+        )
+    
+    async def list_tokens(self, user_id: int) -> List[AccessTokenResponse]:
+        """List a user's tokens."""
+        tokens = await self.token_repo.get_all(user_id)
+        return [AccessTokenResponse.from_orm(token) for token in tokens]
+    
+    async def revoke_token(self, user_id: int, token_id: int) -> None:
+        """Delete a token so it stops working."""
+        key_id = await self.token_repo.delete(token_id, user_id)
+        await self.db.commit()
+        if key_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Access token not found"
+            )
+        access_token_cache.invalidate(key_id)
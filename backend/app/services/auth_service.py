@@ -1,72 +1,105 @@
 
 from datetime import timedelta
-from typing import Tuple
-from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
-import redis
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import BackgroundTasks, HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+import redis.asyncio as aioredis
 
 from app.repositories.user_repository import UserRepository
+from app.core.database import AsyncSessionLocal, violated_constraint
 from app.core.security import (
-    verify_password,
+    bcrypt_cost,
+    get_password_hash_async,
+    verify_password_async,
     create_access_token,
     create_refresh_token,
     decode_token
 )
-from app.core.config import settings
+from app.core.dependencies import login_admission, principal_cache, session_store, token_revocation
 from app.models.user import User
 from app.schemas.auth import Token
 
+# Unique index behind each registration conflict
+REGISTRATION_CONFLICTS = {
+    "ix_users_email": "Email already registered",
+    "ix_users_username": "Username already taken"
+}
+
 
 class AuthService:
     """Service for authentication operations."""
     
-    def __init__(self, db: Session, redis_client: redis.Redis):
+    def __init__(self, db: AsyncSession, redis_client: aioredis.Redis):
         self.db = db
         self.redis = redis_client
         self.user_repo = UserRepository(db)
     
-    def register(self, email: str, username: str, password: str, full_name: str = None) -> User:
-        """Register a new user."""
-        # Check if email exists
-        if self.user_repo.get_by_email(email):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
+    async def register(
+        self,
+        email: str,
+        username: str,
+        password: str,
+        full_name: str = None,
+        device: Optional[str] = None,
+        ip: Optional[str] = None
+    ) -> Tuple[User, Token]:
+        """
+        Register a new user and start their first session.
         
-        # Check if username exists
-        if self.user_repo.get_by_username(username):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already taken"
-            )
+        One bcrypt hash and one INSERT ... RETURNING; the unique indexes
+        reject a taken email or username, and tokens are minted from the
+        created row instead of logging in again.
+        """
+        async with login_admission.attempt(email, ip):
+            try:
+                user = await self.user_repo.create(
+                    email=email,
+                    username=username,
+                    password=password,
+                    full_name=full_name
+                )
+                await self.db.commit()
+            except IntegrityError as exc:
+                await self.db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=REGISTRATION_CONFLICTS.get(violated_constraint(exc), "Email or username already registered")
+                )
         
-        # Create user
-        user = self.user_repo.create(
-            email=email,
-            username=username,
-            password=password,
-            full_name=full_name
-        )
-        
-        return user
+        return user, await self._start_session(user, device, ip)
     
-    def login(self, email: str, password: str) -> Tuple[User, Token]:
-        """Authenticate user and return tokens."""
-        # Get user
-        user = self.user_repo.get_by_email(email)
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Incorrect email or password"
-            )
+    async def login(
+        self,
+        email: str,
+        password: str,
+        device: Optional[str] = None,
+        ip: Optional[str] = None,
+        background_tasks: Optional[BackgroundTasks] = None
+    ) -> Tuple[User, Token]:
+        """
+        Authenticate user and return tokens for a new device session.
         
-        # Verify password
-        if not verify_password(password, user.hashed_password):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Incorrect email or password"
-            )
+        The attempt must be admitted first, so floods are rejected with 429
+        before any lookup or bcrypt work. A password hashed at another cost
+        than the current one is rehashed after the response is sent.
+        """
+        async with login_admission.attempt(email, ip):
+            # Get user
+            user = await self.user_repo.get_by_email(email)
+            if not user:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Incorrect email or password"
+                )
+            
+            # Verify password
+            await self.user_repo.release_connection()
+            if not await verify_password_async(password, user.hashed_password):
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Incorrect email or password"
+                )
         
         # Check if user is active
         if not user.is_active:
@@ -75,16 +108,20 @@ class AuthService:
                 detail="Account is inactive"
             )
         
-        # Generate tokens
-        tokens = self._generate_tokens(user)
-        
-        # Store refresh token in Redis
-        self._store_refresh_token(user.id, tokens.refresh_token)
+        # Move the stored hash to the current cost without delaying the response
+        if background_tasks is not None and bcrypt_cost.needs_rehash(user.hashed_password):
+            background_tasks.add_task(rehash_password, user.id, password, user.hashed_password)
         
-        return user, tokens
+        return user, await self._start_session(user, device, ip)
     
-    def refresh_access_token(self, refresh_token: str) -> Token:
-        """Generate new access token from refresh token."""
+    async def refresh_access_token(self, refresh_token: str, ip: Optional[str] = None) -> Token:
+        """
+        Generate new access token from refresh token.
+        
+        The session is rotated by one Redis script that also checks the
+        token generation, so this is a single round trip and no SELECT;
+        deactivating a user revokes all their sessions.
+        """
         # Decode refresh token
         payload = decode_token(refresh_token)
         if not payload:
@@ -100,101 +137,142 @@ class AuthService:
                 detail="Invalid token type"
             )
         
-        # Check if token is blacklisted
-        if self.redis.get(f"blacklist:{refresh_token}"):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token has been revoked"
-            )
-        
-        user_id = payload.get("sub")
-        if not user_id:
+        if not token_revocation.has_claims(payload) or "sid" not in payload:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid token payload"
             )
         
-        # Verify token is in Redis
-        stored_token = self.redis.get(f"refresh_token:{user_id}")
-        if stored_token != refresh_token:
+        # Generate new tokens for the same session
+        new_tokens, refresh, access = self._generate_tokens(
+            int(payload["sub"]), payload.get("email"), payload["gen"], payload["sid"]
+        )
+        
+        # Swap them in only if the presented token is still the session's current one
+        result = await session_store.rotate(payload, refresh, access, ip)
+        if result == "revoked":
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token not found or expired"
+                detail="Token has been revoked"
             )
-        
-        # Get user
-        user = self.user_repo.get_by_id(int(user_id))
-        if not user or not user.is_active:
+        if result != "ok":
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found or inactive"
+                detail="Token not found or expired"
             )
         
-        # Generate new tokens
-        new_tokens = self._generate_tokens(user)
-        
-        # Blacklist old refresh token
-        self._blacklist_token(refresh_token)
-        
-        # Store new refresh token
-        self._store_refresh_token(user.id, new_tokens.refresh_token)
-        
         return new_tokens
     
-    def logout(self, user_id: int, access_token: str, refresh_token: str = None):
-        """Logout user by blacklisting tokens."""
-        # Blacklist access token
-        self._blacklist_token(access_token, expire_minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    async def logout(self, user_id: int, access_token: str, refresh_token: str = None):
+        """Logout user by revoking the access token and ending its session."""
+        pipe = self.redis.pipeline(transaction=False)
         
-        # Blacklist refresh token if provided
-        if refresh_token:
-            self._blacklist_token(refresh_token, expire_days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        # Revoke the access token, and end the session of either token
+        for token in (access_token, refresh_token):
+            payload = decode_token(token) if token else None
+            if payload and token_revocation.has_claims(payload) and int(payload["sub"]) == user_id:
+                if payload.get("type") == "access":
+                    token_revocation.queue_revoke(pipe, payload)
+                if "sid" in payload:
+                    session_store.queue_end(pipe, user_id, payload["sid"])
         
-        # Remove refresh token from Redis
-        self.redis.delete(f"refresh_token:{user_id}")
+        await pipe.execute()
+    
+    async def logout_all(self, user_id: int) -> None:
+        """Logout user everywhere by revoking every token issued so far."""
+        await session_store.revoke_all(user_id)
+    
+    async def list_sessions(self, user_id: int) -> List[Dict[str, Any]]:
+        """List the user's signed-in devices."""
+        return await session_store.list(user_id)
+    
+    async def revoke_session(self, user_id: int, session_id: str) -> None:
+        """Sign one device out."""
+        if not await session_store.revoke(user_id, session_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Session not found"
+            )
     
-    def change_password(self, user: User, old_password: str, new_password: str) -> User:
+    async def get_user(self, user_id: int) -> User:
+        """Get the full user row for an authenticated principal."""
+        user = await self.user_repo.get_by_id(user_id)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        return user
+    
+    async def change_password(self, user_id: int, old_password: str, new_password: str) -> User:
         """Change user password."""
+        user = await self.get_user(user_id)
+        
         # Verify old password
-        if not verify_password(old_password, user.hashed_password):
+        await self.user_repo.release_connection()
+        if not await verify_password_async(old_password, user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Incorrect password"
             )
         
         # Update password
-        updated_user = self.user_repo.update_password(user, new_password)
+        updated_user = await self.user_repo.update_password(user, new_password)
+        await self.db.commit()
         
-        # Invalidate all refresh tokens
-        self.redis.delete(f"refresh_token:{user.id}")
+        # Invalidate all outstanding tokens and the cached principal
+        await self.logout_all(user.id)
+        await principal_cache.invalidate(user.id)
         
         return updated_user
     
-    def _generate_tokens(self, user: User) -> Token:
-        """Generate access and refresh tokens."""
-        token_data = {"sub": str(user.id), "email": user.email}
+    async def _start_session(self, user: User, device: Optional[str], ip: Optional[str]) -> Token:
+        """Issue tokens for a new device session and store the session in Redis."""
+        session_id = session_store.new_session_id()
+        tokens, refresh, access = self._generate_tokens(
+            user.id, user.email, await token_revocation.generation(user.id), session_id
+        )
+        
+        pipe = self.redis.pipeline(transaction=False)
+        session_store.queue_create(pipe, user.id, session_id, refresh, access, device, ip)
+        await pipe.execute()
+        return tokens
+    
+    def _generate_tokens(
+        self,
+        user_id: int,
+        email: str,
+        generation: int,
+        session_id: str
+    ) -> Tuple[Token, Dict[str, Any], Dict[str, Any]]:
+        """Generate access and refresh tokens for a session, with their claims."""
+        token_data = {
+            "sub": str(user_id),
+            "email": email,
+            "gen": generation,
+            "sid": session_id
+        }
         
         access_token = create_access_token(token_data)
         refresh_token = create_refresh_token(token_data)
         
-        return Token(
+        tokens = Token(
             access_token=access_token,
             refresh_token=refresh_token,
             token_type="bearer"
         )
+        return tokens, decode_token(refresh_token), decode_token(access_token)
+
+
+async def rehash_password(user_id: int, password: str, old_hash: str) -> None:
+    """Rehash a verified password at the current bcrypt cost, in the background."""
+    try:
+        new_hash = await get_password_hash_async(password)
+    except HTTPException:
+        # Hashing pool is saturated; the next login tries again
+        return
     
-    def _store_refresh_token(self, user_id: int, token: str):
-        """Store refresh token in Redis."""
-        ttl = settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60  # Convert to seconds
-        self.redis.setex(f"refresh_token:{user_id}", ttl, token)
-    
-    def _blacklist_token(self, token: str, expire_minutes: int = None, expire_days: int = None):
-        """Add token to blacklist in Redis."""
-        if expire_days:
-            ttl = expire_days * 24 * 60 * 60
-        elif expire_minutes:
-            ttl = expire_minutes * 60
-        else:
-            ttl = 3600  # Default 1 hour
-        
-        self.redis.setex(f"blacklist:{token}", ttl, "1")
\ No newline at end of file
+    async with AsyncSessionLocal() as db:
+        if await UserRepository(db).replace_password_hash(user_id, old_hash, new_hash):
+            await db.commit()
+            bcrypt_cost.record_rehash()
\ No newline at end of file
@@ -0,0 +1,202 @@
+import asyncio
+import csv
+import enum
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import Any, AsyncIterator, List, Optional
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.repositories.export_repository import ExportRepository
+from app.schemas.export import ExportFormat, ExportSection
+from app.utils.parquet import MEDIA_TYPE as PARQUET_MEDIA_TYPE, ParquetStream
+
+# Serialized bytes collected before a piece is compressed and sent
+FLUSH_SIZE = 64 * 1024
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv"
+}
+
+# Exports hold a database connection for as long as the client keeps reading
+_export_slots = asyncio.Semaphore(settings.EXPORT_MAX_CONCURRENT)
+
+
+class ExportService:
+    """Service for streaming a user's data out as NDJSON, CSV or Parquet."""
+    
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal):
+        # The export outlives the request's session, which is closed before
+        # the response body is sent, so it opens its own
+        self.session_factory = session_factory
+    
+    def export_account(
+        self,
+        user_id: int,
+        fmt: ExportFormat,
+        sections: Optional[List[ExportSection]],
+        compress: bool,
+        all_users: bool = False
+    ) -> AsyncIterator[bytes]:
+        """
+        Return the body of an account export.
+        
+        NDJSON has one object per row with a "section" field; CSV has a
+        header row per section, and every row starts with its section name.
+        Parquet holds a single section (progress logs unless another is
+        asked for) and is compressed by its own encoding rather than gzip.
+        Rows are read from server-side cursors EXPORT_BATCH_SIZE at a time
+        and encoded as they arrive, so memory stays flat whatever the size
+        of the account. Administrators can set `all_users` to export every
+        user's rows, with a leading user_id column.
+        """
+        if all_users and user_id not in settings.ADMIN_USER_IDS:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only administrators can export every user's data"
+            )
+        wanted = self._sections(fmt, sections)
+        if _export_slots.locked():
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many exports are running, try again shortly",
+                headers={"Retry-After": "5"}
+            )
+        return self._stream(None if all_users else user_id, fmt, wanted, compress)
+    
+    def filename(
+        self,
+        fmt: ExportFormat,
+        sections: Optional[List[ExportSection]],
+        compress: bool,
+        all_users: bool = False
+    ) -> str:
+        name = "skillsync-platform" if all_users else "skillsync"
+        if fmt == ExportFormat.PARQUET:
+            return f"{name}-{self._sections(fmt, sections)[0].value}-{date.today().isoformat()}.parquet"
+        return f"{name}-export-{date.today().isoformat()}.{fmt.value}" + (".gz" if compress else "")
+    
+    @staticmethod
+    def media_type(fmt: ExportFormat, compress: bool) -> str:
+        if fmt == ExportFormat.PARQUET:
+            return PARQUET_MEDIA_TYPE
+        return "application/gzip" if compress else MEDIA_TYPES[fmt]
+    
+    @staticmethod
+    def _sections(fmt: ExportFormat, sections: Optional[List[ExportSection]]) -> List[ExportSection]:
+        if fmt == ExportFormat.PARQUET:
+            wanted = set(sections or [ExportSection.PROGRESS_LOGS])
+            if len(wanted) > 1:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="A Parquet export holds one section; ask for each section separately"
+                )
+            return list(wanted)
+        # Keep the documented order whatever order they were asked for in
+        return [section for section in ExportSection if not sections or section in sections]
+    
+    async def _stream(
+        self,
+        user_id: Optional[int],
+        fmt: ExportFormat,
+        sections: List[ExportSection],
+        compress: bool
+    ) -> AsyncIterator[bytes]:
+        async with _export_slots:
+            async with self.session_factory() as db:
+                # One snapshot for every section, so logs and totals agree
+                await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+                export_repo = ExportRepository(db)
+                
+                if fmt == ExportFormat.PARQUET:
+                    pieces = self._parquet(export_repo, user_id, sections[0])
+                else:
+                    pieces = self._text(export_repo, user_id, fmt, sections, compress)
+                async for piece in pieces:
+                    if piece:
+                        yield piece
+    
+    async def _text(
+        self,
+        export_repo: ExportRepository,
+        user_id: Optional[int],
+        fmt: ExportFormat,
+        sections: List[ExportSection],
+        compress: bool
+    ) -> AsyncIterator[bytes]:
+        # wbits=31 writes a gzip header and trailer around the deflate stream
+        encoder = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        
+        for section in sections:
+            columns = [name for name, _ in export_repo.columns(section, user_id)]
+            if fmt == ExportFormat.CSV:
+                writer.writerow(["section", *columns])
+                
+            async for rows in export_repo.stream(section, user_id, settings.EXPORT_BATCH_SIZE):
+                if fmt == ExportFormat.CSV:
+                    writer.writerows(
+                        [section.value, *(_csv_value(value) for value in row)] for row in rows
+                    )
+                else:
+                    for row in rows:
+                        record = {"section": section.value}
+                        record.update(zip(columns, (_json_value(value) for value in row)))
+                        buffer.write(json.dumps(record, separators=(",", ":")))
+                        buffer.write("\n")
+                    
+                if buffer.tell() >= FLUSH_SIZE:
+                    yield _drain(buffer, encoder)
+        
+        piece = _drain(buffer, encoder)
+        if encoder is not None:
+            piece += encoder.flush()
+        yield piece
+    
+    async def _parquet(
+        self,
+        export_repo: ExportRepository,
+        user_id: Optional[int],
+        section: ExportSection
+    ) -> AsyncIterator[bytes]:
+        parquet = ParquetStream(export_repo.columns(section, user_id), settings.EXPORT_PARQUET_ROW_GROUP_SIZE)
+        async for rows in export_repo.stream(section, user_id, settings.EXPORT_BATCH_SIZE):
+            parquet.add(rows)
+            if parquet.full:
+                # Encoding and compressing a row group takes a while; pyarrow
+                # releases the GIL, so do it off the event loop
+                yield await run_in_threadpool(parquet.write_row_group)
+        yield await run_in_threadpool(parquet.close)
+
+
+def _drain(buffer: io.StringIO, encoder: Optional[Any]) -> bytes:
+    """Empty the buffer into the next piece of the body."""
+    data = buffer.getvalue().encode()
+    buffer.seek(0)
+    buffer.truncate()
+    return encoder.compress(data) if encoder is not None else data
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
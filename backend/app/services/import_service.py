@@ -0,0 +1,320 @@
+import os
+import uuid
+from collections import defaultdict
+from itertools import islice
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from datetime import date
+from fastapi import HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.tasks import enqueue
+from app.models.import_job import ImportJob, ImportFormat, ImportStatus
+from app.repositories.import_job_repository import ImportJobRepository
+from app.repositories.progress_repository import ProgressRepository
+from app.repositories.skill_repository import SkillRepository
+from app.repositories.streak_repository import StreakRepository
+from app.repositories.rollup_repository import RollupRepository
+from app.schemas.import_job import ImportFormatEnum, ImportJobResponse
+from app.schemas.progress import ProgressUpsertMode
+from app.services.progress_service import MAX_TIME_SPENT
+from app.utils.importers import (
+    MAX_DESCRIPTION_LENGTH,
+    MAX_NOTES_LENGTH,
+    ByteCounter,
+    ImportEntry,
+    ImportRow,
+    ImportRowError,
+    parse
+)
+
+# Formats recognised from the file name when none is given
+FORMAT_BY_EXTENSION = {
+    ".csv": ImportFormat.CSV,
+    ".jsonl": ImportFormat.JSONL,
+    ".ndjson": ImportFormat.JSONL,
+    ".ics": ImportFormat.ICS,
+    ".ical": ImportFormat.ICS
+}
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class ImportService:
+    """Service for importing progress history from other time trackers."""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.job_repo = ImportJobRepository(db)
+        self.progress_repo = ProgressRepository(db)
+        self.skill_repo = SkillRepository(db)
+        self.streak_repo = StreakRepository(db)
+        self.rollup_repo = RollupRepository(db)
+    
+    async def create_job(
+        self,
+        user_id: int,
+        upload: UploadFile,
+        fmt: Optional[ImportFormatEnum],
+        mode: ProgressUpsertMode
+    ) -> ImportJobResponse:
+        """
+        Store an uploaded file and queue it for the import worker.
+        
+        The API only copies the file to IMPORT_UPLOAD_DIR, in a thread and in
+        1 MB pieces; parsing and writing happen in a Celery worker.
+        """
+        if fmt is not None:
+            import_format = ImportFormat(fmt.value)
+        else:
+            extension = os.path.splitext(upload.filename or "")[1].lower()
+            import_format = FORMAT_BY_EXTENSION.get(extension)
+        if import_format is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Unknown file type; set format to csv, jsonl or ics"
+            )
+        
+        os.makedirs(settings.IMPORT_UPLOAD_DIR, exist_ok=True)
+        file_path = os.path.join(settings.IMPORT_UPLOAD_DIR, f"{uuid.uuid4().hex}.{import_format.value}")
+        size = await run_in_threadpool(_store_upload, upload.file, file_path, settings.IMPORT_MAX_BYTES)
+        if size is None:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Import files cannot exceed {settings.IMPORT_MAX_BYTES // (1024 * 1024)} MB"
+            )
+        if size == 0:
+            _remove(file_path)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="The file is empty"
+            )
+        
+        job = await self.job_repo.create(
+            user_id=user_id,
+            fmt=import_format,
+            mode=mode.value,
+            filename=(upload.filename or "")[:255] or None,
+            file_path=file_path,
+            total_bytes=size
+        )
+        await self.db.commit()
+        
+        try:
+            await enqueue("app.tasks.imports.import_progress_logs", job.id)
+        except Exception:
+            _remove(file_path)
+            await self.job_repo.finish(job.id, ImportStatus.FAILED, "The import could not be queued")
+            await self.db.commit()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Imports are unavailable, try again later"
+            )
+        
+        return self._to_response(job)
+    
+    async def get_job(self, user_id: int, job_id: int) -> ImportJobResponse:
+        """Get an import job with its progress."""
+        job = await self.job_repo.get_by_id(job_id, user_id)
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Import job not found"
+            )
+        return self._to_response(job)
+    
+    async def list_jobs(self, user_id: int, limit: int) -> List[ImportJobResponse]:
+        """List a user's recent import jobs."""
+        jobs = await self.job_repo.get_all(user_id, limit)
+        return [self._to_response(job) for job in jobs]
+    
+    async def run_job(self, job_id: int) -> Optional[ImportJob]:
+        """
+        Import a pending job's file; called by the import worker.
+        
+        The file is parsed as a stream and written IMPORT_CHUNK_SIZE rows at
+        a time, each chunk in its own transaction together with the job's
+        counters, so memory stays flat, row locks are short, and the status
+        endpoint shows what has been written so far. Streaks are rebuilt
+        once at the end. Returns None if the job was not pending.
+        """
+        job = await self.job_repo.claim(job_id)
+        await self.db.commit()
+        if job is None:
+            return None
+        
+        user_id, file_path = job.user_id, job.file_path
+        try:
+            await self._import_file(job)
+            await self.streak_repo.rebuild([user_id])
+            await self.job_repo.finish(job_id, ImportStatus.COMPLETED)
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            # Chunks committed before the failure stay imported
+            await self.streak_repo.rebuild([user_id])
+            await self.job_repo.finish(
+                job_id, ImportStatus.FAILED, "The import stopped unexpectedly; the rows counted so far were imported"
+            )
+            await self.db.commit()
+            raise
+        finally:
+            _remove(file_path)
+        
+        return job
+    
+    async def _import_file(self, job: ImportJob) -> None:
+        # In replace mode a day's first chunk replaces the existing log and
+        # later chunks add to it, so the days written so far are remembered
+        replaced: Optional[Set[Tuple[int, date]]] = (
+            None if job.mode == ProgressUpsertMode.ACCUMULATE.value else set()
+        )
+        skill_ids: Dict[str, int] = {}
+        
+        with open(job.file_path, "rb") as raw:
+            counter = ByteCounter(raw)
+            for chunk in _chunks(parse(job.format, counter), settings.IMPORT_CHUNK_SIZE):
+                await self._import_chunk(job, chunk, skill_ids, replaced)
+                job.processed_bytes = counter.bytes_read
+                await self.db.commit()
+        
+        job.processed_bytes = job.total_bytes
+    
+    async def _import_chunk(
+        self,
+        job: ImportJob,
+        chunk: List[ImportEntry],
+        skill_ids: Dict[str, int],
+        replaced: Optional[Set[Tuple[int, date]]]
+    ) -> None:
+        """Write one chunk of entries and update the job's counters."""
+        rows = [entry for entry in chunk if isinstance(entry, ImportRow)]
+        skipped = [entry for entry in chunk if isinstance(entry, ImportRowError)]
+        await self._resolve_skills(job, {row.skill for row in rows}, skill_ids)
+        
+        # Fold entries into one log per skill and day, as time trackers
+        # usually export several entries a day
+        days: Dict[Tuple[int, date], Dict[str, Any]] = {}
+        for row in rows:
+            key = (skill_ids[row.skill], row.date)
+            day = days.get(key)
+            if day is None:
+                days[key] = {
+                    "skill_id": key[0],
+                    "date": row.date,
+                    "time_spent": row.minutes,
+                    "description": row.description,
+                    "notes": row.notes,
+                    "lines": [row.line]
+                }
+            elif day["time_spent"] + row.minutes > MAX_TIME_SPENT:
+                skipped.append(ImportRowError(row.line, "Day total would exceed 24 hours"))
+            else:
+                day["time_spent"] += row.minutes
+                day["description"] = _join(day["description"], row.description, MAX_DESCRIPTION_LENGTH)
+                day["notes"] = _join(day["notes"], row.notes, MAX_NOTES_LENGTH)
+                day["lines"].append(row.line)
+        
+        to_add, to_replace = [], []
+        for key, day in days.items():
+            if replaced is None or key in replaced:
+                to_add.append(day)
+            else:
+                to_replace.append(day)
+                replaced.add(key)
+        
+        written = []
+        for logs, accumulate in ((to_add, True), (to_replace, False)):
+            if logs:
+                written.extend(await self.progress_repo.upsert_many(
+                    job.user_id, logs, accumulate, MAX_TIME_SPENT
+                ))
+        
+        # Days left out would have gone over 24 hours with what was logged before
+        written_keys = {(log.skill_id, log.date) for log, _ in written}
+        for key, day in days.items():
+            if key not in written_keys:
+                skipped.extend(ImportRowError(line, "Day total would exceed 24 hours") for line in day["lines"])
+        
+        # Apply the exact change of each log to totals and rollups
+        minutes_by_skill = defaultdict(int)
+        rollup_deltas = []
+        for progress_log, previous_time in written:
+            created = previous_time is None
+            delta = progress_log.time_spent - (previous_time or 0)
+            if delta:
+                minutes_by_skill[progress_log.skill_id] += delta
+            if delta or created:
+                rollup_deltas.append((progress_log.skill_id, progress_log.date, delta, int(created)))
+            job.logs_created += created
+            job.logs_updated += not created
+        
+        minutes_by_skill = {skill_id: minutes for skill_id, minutes in minutes_by_skill.items() if minutes}
+        if minutes_by_skill:
+            await self.skill_repo.add_total_hours_many(minutes_by_skill)
+        if rollup_deltas:
+            await self.rollup_repo.apply_deltas(job.user_id, rollup_deltas)
+        
+        job.rows_read += len(chunk)
+        job.rows_skipped += len(skipped)
+        room = settings.IMPORT_MAX_ERRORS - len(job.errors)
+        if skipped and room > 0:
+            skipped.sort(key=lambda error: error.line)
+            job.errors = job.errors + [{"line": error.line, "reason": error.reason} for error in skipped[:room]]
+    
+    async def _resolve_skills(self, job: ImportJob, names: Set[str], skill_ids: Dict[str, int]) -> None:
+        """Add the ids of `names` to `skill_ids`, creating the skills that do not exist yet."""
+        missing = names - skill_ids.keys()
+        if not missing:
+            return
+        
+        skill_ids.update(await self.skill_repo.get_ids_by_name(job.user_id, missing))
+        new_names = sorted(missing - skill_ids.keys())
+        if new_names:
+            skill_ids.update(await self.skill_repo.create_many(job.user_id, new_names))
+            job.skills_created += len(new_names)
+    
+    @staticmethod
+    def _to_response(job: ImportJob) -> ImportJobResponse:
+        response = ImportJobResponse.from_orm(job)
+        response.progress = round(job.processed_bytes / job.total_bytes, 4) if job.total_bytes else 1.0
+        return response
+
+
+def _store_upload(source: BinaryIO, file_path: str, max_bytes: int) -> Optional[int]:
+    """Copy an upload to `file_path`; returns its size, or None (and no file) if it is over `max_bytes`."""
+    size = 0
+    with open(file_path, "wb") as target:
+        while chunk := source.read(COPY_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_bytes:
+                break
+            target.write(chunk)
+    
+    if size > max_bytes:
+        _remove(file_path)
+        return None
+    return size
+
+
+def _remove(file_path: str) -> None:
+    try:
+        os.remove(file_path)
+    except FileNotFoundError:
+        pass
+
+
+def _chunks(entries: Iterable[ImportEntry], size: int) -> Iterator[List[ImportEntry]]:
+    iterator = iter(entries)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _join(current: Optional[str], extra: Optional[str], max_length: int) -> Optional[str]:
+    """Append a description of another entry on the same day, once."""
+    if not extra or (current and extra in current):
+        return current
+    if not current:
+        return extra
+    return f"{current}; {extra}"[:max_length]
@@ -1,71 +1,223 @@
 
+from collections import defaultdict
 from typing import Optional
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date, timedelta, datetime
 from math import ceil
+import redis.asyncio as aioredis
 
 from app.repositories.progress_repository import ProgressRepository
 from app.repositories.skill_repository import SkillRepository
+from app.repositories.streak_repository import StreakRepository
+from app.repositories.rollup_repository import RollupRepository
+from app.utils.pagination import decode_cursor, split_page, total_cache_key, cached_total
 from app.schemas.progress import (
     ProgressLogCreate,
+    ProgressLogBatchCreate,
+    ProgressLogUpsert,
+    ProgressUpsertMode,
     ProgressLogUpdate,
     ProgressLogResponse,
+    ProgressLogUpsertResponse,
+    ProgressLogBatchResponse,
+    ProgressBatchItemResult,
+    BatchItemStatus,
     ProgressLogWithSkill,
     ProgressListResponse,
     DailyProgressStats,
     WeeklyProgressStats,
     MonthlyProgressStats,
     ProgressStatsResponse,
+    ProgressRangeStats,
+    StatsBucket,
     SkillProgressSummary
 )
 
 
+# Longest range allowed per bucket size, so a chart series stays bounded
+MAX_RANGE_DAYS = {
+    StatsBucket.DAY: 366,
+    StatsBucket.WEEK: 5 * 366,
+    StatsBucket.MONTH: 10 * 366
+}
+
+# A day's log cannot hold more than the day
+MAX_TIME_SPENT = 24 * 60
+
+
 class ProgressService:
     """Service for progress log operations."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.progress_repo = ProgressRepository(db)
         self.skill_repo = SkillRepository(db)
+        self.streak_repo = StreakRepository(db)
+        self.rollup_repo = RollupRepository(db)
     
-    def create_progress_log(self, user_id: int, log_data: ProgressLogCreate) -> ProgressLogResponse:
+    async def create_progress_log(self, user_id: int, log_data: ProgressLogCreate) -> ProgressLogResponse:
         """Create a new progress log."""
         # Verify skill exists and belongs to user
-        skill = self.skill_repo.get_by_id(log_data.skill_id, user_id)
+        skill = await self.skill_repo.get_by_id(log_data.skill_id, user_id)
         if not skill:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Skill not found"
             )
         
-        # Check for duplicate (same skill, same date)
-        if self.progress_repo.check_duplicate(user_id, log_data.skill_id, log_data.date):
+        # Create progress log; the unique index rejects a duplicate
+        try:
+            progress_log = await self.progress_repo.create(
+                user_id=user_id,
+                skill_id=log_data.skill_id,
+                log_date=log_data.date,
+                time_spent=log_data.time_spent,
+                description=log_data.description,
+                notes=log_data.notes
+            )
+        except IntegrityError:
+            await self.db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Progress log already exists for this skill on this date. Please update the existing log."
             )
         
-        # Create progress log
-        progress_log = self.progress_repo.create(
+        # Update skill's total hours, rollup and streaks in the same transaction
+        await self.skill_repo.add_total_hours(log_data.skill_id, log_data.time_spent)
+        await self.rollup_repo.apply_delta(user_id, log_data.skill_id, log_data.date, log_data.time_spent, 1)
+        await self.streak_repo.record_log_added(user_id, log_data.skill_id, log_data.date)
+        await self.db.commit()
+        
+        response = ProgressLogResponse.from_orm(progress_log)
+        response.skill_name = skill.name
+        return response
+    
+    async def create_progress_logs(self, user_id: int, batch: ProgressLogBatchCreate) -> ProgressLogBatchResponse:
+        """
+        Create a batch of progress logs in one transaction.
+        
+        Every referenced skill is checked with one query and the logs are
+        written with one multi-row INSERT. Items for an unknown skill or an
+        already logged day are reported per item instead of failing the
+        batch. Skill totals and rollups are updated with one statement each,
+        and the streaks of each affected skill and the user once, however
+        many logs were created.
+        """
+        skill_names = await self.skill_repo.get_names(
+            user_id, list({item.skill_id for item in batch.logs})
+        )
+        
+        results = [None] * len(batch.logs)
+        pending = {}
+        for index, item in enumerate(batch.logs):
+            if item.skill_id not in skill_names:
+                results[index] = ProgressBatchItemResult(
+                    index=index, status=BatchItemStatus.SKILL_NOT_FOUND, detail="Skill not found"
+                )
+            elif (item.skill_id, item.date) in pending:
+                results[index] = ProgressBatchItemResult(
+                    index=index, status=BatchItemStatus.DUPLICATE, detail="Skill already logged on this date in this batch"
+                )
+            else:
+                pending[(item.skill_id, item.date)] = index
+        
+        created = []
+        if pending:
+            created = await self.progress_repo.create_many(
+                user_id, [batch.logs[index].dict() for index in pending.values()]
+            )
+        
+        for progress_log in created:
+            index = pending.pop((progress_log.skill_id, progress_log.date))
+            response = ProgressLogResponse.from_orm(progress_log)
+            response.skill_name = skill_names[progress_log.skill_id]
+            results[index] = ProgressBatchItemResult(index=index, status=BatchItemStatus.CREATED, log=response)
+        
+        # Whatever is left was skipped by ON CONFLICT: the day already has a log
+        for index in pending.values():
+            results[index] = ProgressBatchItemResult(
+                index=index, status=BatchItemStatus.DUPLICATE, detail="Progress log already exists for this skill on this date"
+            )
+        
+        # Update skill totals, rollups and streaks in the same transaction
+        if created:
+            minutes_by_skill = defaultdict(int)
+            for progress_log in created:
+                minutes_by_skill[progress_log.skill_id] += progress_log.time_spent
+            await self.skill_repo.add_total_hours_many(minutes_by_skill)
+            await self.rollup_repo.apply_deltas(
+                user_id,
+                [(log.skill_id, log.date, log.time_spent, 1) for log in created]
+            )
+            await self.streak_repo.record_logs_added(
+                user_id, [(log.skill_id, log.date) for log in created]
+            )
+        await self.db.commit()
+        
+        return ProgressLogBatchResponse(
+            created=len(created),
+            failed=len(batch.logs) - len(created),
+            results=results
+        )
+    
+    async def upsert_progress_log(self, user_id: int, log_data: ProgressLogUpsert) -> ProgressLogUpsertResponse:
+        """
+        Log time for a skill on a day, whether or not the day has a log yet.
+        
+        In replace mode the day's time_spent becomes the given value, in
+        accumulate mode the value is added to it, so a client can log each
+        session as it ends. The log is written by one atomic statement and
+        totals, rollup and streaks move by exactly the change it made.
+        """
+        # Verify skill exists and belongs to user
+        skill = await self.skill_repo.get_by_id(log_data.skill_id, user_id)
+        if not skill:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Skill not found"
+            )
+        
+        result = await self.progress_repo.upsert(
             user_id=user_id,
             skill_id=log_data.skill_id,
             log_date=log_data.date,
             time_spent=log_data.time_spent,
             description=log_data.description,
-            notes=log_data.notes
+            notes=log_data.notes,
+            accumulate=log_data.mode == ProgressUpsertMode.ACCUMULATE,
+            max_time_spent=MAX_TIME_SPENT
         )
+        if result is None:
+            await self.db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Time spent on a day cannot exceed 24 hours (1440 minutes)"
+            )
         
-        # Update skill's total hours
-        self.skill_repo.update_total_hours(log_data.skill_id)
+        progress_log, previous_time = result
+        created = previous_time is None
+        delta = progress_log.time_spent - (previous_time or 0)
         
-        response = ProgressLogResponse.from_orm(progress_log)
-        response.skill_name = skill.name
-        return response
+        # Update skill's total hours, rollup and streaks in the same transaction
+        if delta:
+            await self.skill_repo.add_total_hours(log_data.skill_id, delta)
+        if delta or created:
+            await self.rollup_repo.apply_delta(user_id, log_data.skill_id, log_data.date, delta, int(created))
+        if created:
+            await self.streak_repo.record_log_added(user_id, log_data.skill_id, log_data.date)
+        await self.db.commit()
+        
+        return ProgressLogUpsertResponse(
+            **ProgressLogResponse.from_orm(progress_log).dict(exclude={"skill_name"}),
+            skill_name=skill.name,
+            created=created
+        )
     
-    def get_progress_log(self, log_id: int, user_id: int) -> ProgressLogWithSkill:
+    async def get_progress_log(self, log_id: int, user_id: int) -> ProgressLogWithSkill:
         """Get a single progress log by ID."""
-        progress_log = self.progress_repo.get_by_id(log_id, user_id)
+        progress_log = await self.progress_repo.get_by_id(log_id, user_id)
         if not progress_log:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -81,37 +233,53 @@ class ProgressService:
             skill_status=progress_log.skill.status.value
         )
     
-    def get_all_progress_logs(
+    async def get_all_progress_logs(
         self,
         user_id: int,
         skill_id: Optional[int] = None,
         start_date: Optional[date] = None,
         end_date: Optional[date] = None,
         page: int = 1,
-        page_size: int = 20
+        page_size: int = 20,
+        cursor: Optional[str] = None,
+        include_total: bool = False,
+        redis_client: Optional[aioredis.Redis] = None
     ) -> ProgressListResponse:
-        """Get all progress logs for user with filters and pagination."""
+        """
+        Get all progress logs for user with filters and pagination.
+        
+        Pages by number, or by keyset when given a previous page's
+        next_cursor; in cursor mode the total is optional and cached.
+        """
         # Verify skill if provided
         if skill_id:
-            skill = self.skill_repo.get_by_id(skill_id, user_id)
+            skill = await self.skill_repo.get_by_id(skill_id, user_id)
             if not skill:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Skill not found"
                 )
         
-        skip = (page - 1) * page_size
+        filters = dict(user_id=user_id, skill_id=skill_id, start_date=start_date, end_date=end_date)
         
-        logs, total = self.progress_repo.get_all(
-            user_id=user_id,
-            skill_id=skill_id,
-            start_date=start_date,
-            end_date=end_date,
-            skip=skip,
-            limit=page_size
-        )
+        # Fetch one row past the page to know whether there is a next one
+        if cursor:
+            after = decode_cursor(cursor, (date, datetime, int))
+            logs = await self.progress_repo.get_all(**filters, limit=page_size + 1, after=after)
+            page = total = total_pages = None
+            if include_total:
+                total = await cached_total(
+                    redis_client,
+                    total_cache_key("progress_logs", **filters),
+                    lambda: self.progress_repo.count(**filters)
+                )
+        else:
+            skip = (page - 1) * page_size
+            logs = await self.progress_repo.get_all(**filters, skip=skip, limit=page_size + 1)
+            total = await self.progress_repo.count(**filters)
+            total_pages = ceil(total / page_size) if total > 0 else 0
         
-        total_pages = ceil(total / page_size) if total > 0 else 0
+        logs, next_cursor = split_page(logs, page_size, lambda log: (log.date, log.created_at, log.id))
         
         # Add skill names to responses
         log_responses = []
@@ -125,17 +293,18 @@ class ProgressService:
             total=total,
             page=page,
             page_size=page_size,
-            total_pages=total_pages
+            total_pages=total_pages,
+            next_cursor=next_cursor
         )
     
-    def update_progress_log(
+    async def update_progress_log(
         self,
         log_id: int,
         user_id: int,
         log_data: ProgressLogUpdate
     ) -> ProgressLogResponse:
         """Update an existing progress log."""
-        progress_log = self.progress_repo.get_by_id(log_id, user_id)
+        progress_log = await self.progress_repo.get_by_id(log_id, user_id)
         if not progress_log:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -144,22 +313,28 @@ class ProgressService:
         
         old_time = progress_log.time_spent
         skill_id = progress_log.skill_id
+        skill_name = progress_log.skill.name
         
         # Update progress log
         update_data = log_data.dict(exclude_unset=True)
-        updated_log = self.progress_repo.update(progress_log, **update_data)
+        updated_log = await self.progress_repo.update(progress_log, **update_data)
         
-        # Update skill's total hours if time changed
+        # Update skill's total hours if time changed. The log date cannot be
+        # edited, so the set of active days and the streaks stay the same.
         if log_data.time_spent and log_data.time_spent != old_time:
-            self.skill_repo.update_total_hours(skill_id)
+            await self.skill_repo.add_total_hours(skill_id, log_data.time_spent - old_time)
+            await self.rollup_repo.apply_delta(
+                user_id, skill_id, updated_log.date, log_data.time_spent - old_time, 0
+            )
+        await self.db.commit()
         
         response = ProgressLogResponse.from_orm(updated_log)
-        response.skill_name = updated_log.skill.name
+        response.skill_name = skill_name
         return response
     
-    def delete_progress_log(self, log_id: int, user_id: int) -> None:
+    async def delete_progress_log(self, log_id: int, user_id: int) -> None:
         """Delete a progress log."""
-        progress_log = self.progress_repo.get_by_id(log_id, user_id)
+        progress_log = await self.progress_repo.get_by_id(log_id, user_id)
         if not progress_log:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -167,25 +342,30 @@ class ProgressService:
             )
         
         skill_id = progress_log.skill_id
+        log_date = progress_log.date
+        time_spent = progress_log.time_spent
         
         # Delete progress log
-        self.progress_repo.delete(progress_log)
+        await self.progress_repo.delete(progress_log)
         
-        # Update skill's total hours
-        self.skill_repo.update_total_hours(skill_id)
+        # Update skill's total hours, rollup and streaks in the same transaction
+        await self.skill_repo.add_total_hours(skill_id, -time_spent)
+        await self.rollup_repo.apply_delta(user_id, skill_id, log_date, -time_spent, -1)
+        await self.streak_repo.record_log_removed(user_id, skill_id, log_date)
+        await self.db.commit()
     
-    def get_daily_stats(self, user_id: int, target_date: date) -> DailyProgressStats:
+    async def get_daily_stats(self, user_id: int, target_date: date) -> DailyProgressStats:
         """Get statistics for a specific day."""
-        stats = self.progress_repo.get_daily_stats(user_id, target_date)
+        stats = await self.progress_repo.get_daily_stats(user_id, target_date)
         return DailyProgressStats(**stats)
     
-    def get_weekly_stats(self, user_id: int, week_start: Optional[date] = None) -> WeeklyProgressStats:
+    async def get_weekly_stats(self, user_id: int, week_start: Optional[date] = None) -> WeeklyProgressStats:
         """Get statistics for a week."""
         if not week_start:
             today = date.today()
             week_start = today - timedelta(days=today.weekday())
         
-        stats = self.progress_repo.get_weekly_stats(user_id, week_start)
+        stats = await self.progress_repo.get_weekly_stats(user_id, week_start)
         
         return WeeklyProgressStats(
             week_start=stats["week_start"],
@@ -196,30 +376,65 @@ class ProgressService:
             daily_breakdown=[DailyProgressStats(**d) for d in stats["daily_breakdown"]]
         )
     
-    def get_monthly_stats(self, user_id: int, year: Optional[int] = None, month: Optional[int] = None) -> MonthlyProgressStats:
+    async def get_monthly_stats(self, user_id: int, year: Optional[int] = None, month: Optional[int] = None) -> MonthlyProgressStats:
         """Get statistics for a month."""
         if not year or not month:
             today = date.today()
             year = today.year
             month = today.month
         
-        stats = self.progress_repo.get_monthly_stats(user_id, year, month)
+        stats = await self.progress_repo.get_monthly_stats(user_id, year, month)
         return MonthlyProgressStats(**stats)
     
-    def get_overall_stats(self, user_id: int) -> ProgressStatsResponse:
+    async def get_range_stats(
+        self,
+        user_id: int,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        bucket: StatsBucket = StatsBucket.DAY,
+        skill_id: Optional[int] = None
+    ) -> ProgressRangeStats:
+        """Get totals and a zero-filled series for any date range."""
+        end_date = end_date or date.today()
+        start_date = start_date or end_date - timedelta(days=29)
+        
+        if start_date > end_date:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="start_date must be on or before end_date"
+            )
+        
+        if (end_date - start_date).days + 1 > MAX_RANGE_DAYS[bucket]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Range too long for {bucket.value} buckets (max {MAX_RANGE_DAYS[bucket]} days)"
+            )
+        
+        if skill_id and not await self.skill_repo.get_by_id(skill_id, user_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Skill not found"
+            )
+        
+        stats = await self.progress_repo.get_range_stats(
+            user_id, start_date, end_date, bucket.value, skill_id
+        )
+        return ProgressRangeStats(**stats)
+    
+    async def get_overall_stats(self, user_id: int) -> ProgressStatsResponse:
         """Get overall progress statistics."""
-        stats = self.progress_repo.get_overall_stats(user_id)
+        stats = await self.progress_repo.get_overall_stats(user_id)
         return ProgressStatsResponse(**stats)
     
-    def get_skill_progress_summary(self, user_id: int, skill_id: int) -> SkillProgressSummary:
+    async def get_skill_progress_summary(self, user_id: int, skill_id: int) -> SkillProgressSummary:
         """Get progress summary for a specific skill."""
         # Verify skill exists
-        skill = self.skill_repo.get_by_id(skill_id, user_id)
+        skill = await self.skill_repo.get_by_id(skill_id, user_id)
         if not skill:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Skill not found"
             )
         
-        stats = self.progress_repo.get_skill_progress_summary(user_id, skill_id)
+        stats = await self.progress_repo.get_skill_progress_summary(user_id, skill_id)
         return SkillProgressSummary(**stats)
\ No newline at end of file
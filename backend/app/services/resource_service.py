@@ -1,10 +1,13 @@
 from typing import Optional
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from math import ceil
+from datetime import datetime
+import redis.asyncio as aioredis
 
 from app.repositories.resource_repository import ResourceRepository
 from app.repositories.skill_repository import SkillRepository
+from app.utils.pagination import decode_cursor, split_page, total_cache_key, cached_total
 from app.schemas.resource import (
     ResourceCreate,
     ResourceUpdate,
@@ -18,15 +21,15 @@ from app.schemas.resource import (
 class ResourceService:
     """Service for resource operations."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.resource_repo = ResourceRepository(db)
         self.skill_repo = SkillRepository(db)
     
-    def create_resource(self, user_id: int, resource_data: ResourceCreate) -> ResourceResponse:
+    async def create_resource(self, user_id: int, resource_data: ResourceCreate) -> ResourceResponse:
         """Create a new resource."""
         # Verify skill exists and belongs to user
-        skill = self.skill_repo.get_by_id(resource_data.skill_id, user_id)
+        skill = await self.skill_repo.get_by_id(resource_data.skill_id, user_id)
         if not skill:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -34,21 +37,22 @@ class ResourceService:
             )
         
         # Create resource
-        resource = self.resource_repo.create(
+        resource = await self.resource_repo.create(
             skill_id=resource_data.skill_id,
             title=resource_data.title,
             url=resource_data.url,
             resource_type=resource_data.resource_type,
             description=resource_data.description
         )
+        await self.db.commit()
         
         response = ResourceResponse.from_orm(resource)
         response.skill_name = skill.name
         return response
     
-    def get_resource(self, resource_id: int, user_id: int) -> ResourceResponse:
+    async def get_resource(self, resource_id: int, user_id: int) -> ResourceResponse:
         """Get a single resource by ID."""
-        resource = self.resource_repo.get_by_id(resource_id)
+        resource = await self.resource_repo.get_by_id(resource_id)
         if not resource:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -66,37 +70,60 @@ class ResourceService:
         response.skill_name = resource.skill.name
         return response
     
-    def get_all_resources(
+    async def get_all_resources(
         self,
         user_id: int,
         skill_id: Optional[int] = None,
         resource_type: Optional[ResourceTypeEnum] = None,
         is_completed: Optional[bool] = None,
         page: int = 1,
-        page_size: int = 20
+        page_size: int = 20,
+        cursor: Optional[str] = None,
+        include_total: bool = False,
+        redis_client: Optional[aioredis.Redis] = None
     ) -> ResourceListResponse:
-        """Get all resources for user with filters and pagination."""
+        """
+        Get all resources for user with filters and pagination.
+        
+        Pages by number, or by keyset when given a previous page's
+        next_cursor; in cursor mode the total is optional and cached.
+        """
         # Verify skill if provided
         if skill_id:
-            skill = self.skill_repo.get_by_id(skill_id, user_id)
+            skill = await self.skill_repo.get_by_id(skill_id, user_id)
             if not skill:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Skill not found"
                 )
         
-        skip = (page - 1) * page_size
-        
-        resources, total = self.resource_repo.get_all(
+        filters = dict(
             user_id=user_id,
             skill_id=skill_id,
             resource_type=resource_type,
-            is_completed=is_completed,
-            skip=skip,
-            limit=page_size
+            is_completed=is_completed
         )
         
-        total_pages = ceil(total / page_size) if total > 0 else 0
+        # Fetch one row past the page to know whether there is a next one
+        if cursor:
+            after = decode_cursor(cursor, (datetime, int))
+            resources = await self.resource_repo.get_all(**filters, limit=page_size + 1, after=after)
+            page = total = total_pages = None
+            if include_total:
+                total = await cached_total(
+                    redis_client,
+                    total_cache_key("resources", **filters),
+                    lambda: self.resource_repo.count(**filters)
+                )
+        else:
+            skip = (page - 1) * page_size
+            resources = await self.resource_repo.get_all(**filters, skip=skip, limit=page_size + 1)
+            total = await self.resource_repo.count(**filters)
+            total_pages = ceil(total / page_size) if total > 0 else 0
+        
+        resources, next_cursor = split_page(
+            resources, page_size, lambda resource: (resource.created_at, resource.id)
+        )
         
         # Add skill names to responses
         resource_responses = []
@@ -110,17 +137,18 @@ class ResourceService:
             total=total,
             page=page,
             page_size=page_size,
-            total_pages=total_pages
+            total_pages=total_pages,
+            next_cursor=next_cursor
         )
     
-    def update_resource(
+    async def update_resource(
         self,
         resource_id: int,
         user_id: int,
         resource_data: ResourceUpdate
     ) -> ResourceResponse:
         """Update an existing resource."""
-        resource = self.resource_repo.get_by_id(resource_id)
+        resource = await self.resource_repo.get_by_id(resource_id)
         if not resource:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -135,16 +163,18 @@ class ResourceService:
             )
         
         # Update resource
+        skill_name = resource.skill.name
         update_data = resource_data.dict(exclude_unset=True)
-        updated_resource = self.resource_repo.update(resource, **update_data)
+        updated_resource = await self.resource_repo.update(resource, **update_data)
+        await self.db.commit()
         
         response = ResourceResponse.from_orm(updated_resource)
-        response.skill_name = updated_resource.skill.name
+        response.skill_name = skill_name
         return response
     
-    def delete_resource(self, resource_id: int, user_id: int) -> None:
+    async def delete_resource(self, resource_id: int, user_id: int) -> None:
         """Delete a resource."""
-        resource = self.resource_repo.get_by_id(resource_id)
+        resource = await self.resource_repo.get_by_id(resource_id)
         if not resource:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -158,11 +188,12 @@ class ResourceService:
                 detail="Not authorized to delete this resource"
             )
         
-        self.resource_repo.delete(resource)
+        await self.resource_repo.delete(resource)
+        await self.db.commit()
     
-    def mark_completed(self, resource_id: int, user_id: int, completed: bool = True) -> ResourceResponse:
+    async def mark_completed(self, resource_id: int, user_id: int, completed: bool = True) -> ResourceResponse:
         """Mark resource as completed or not completed."""
-        resource = self.resource_repo.get_by_id(resource_id)
+        resource = await self.resource_repo.get_by_id(resource_id)
         if not resource:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -176,13 +207,15 @@ class ResourceService:
                 detail="Not authorized to update this resource"
             )
         
-        updated_resource = self.resource_repo.mark_completed(resource, completed)
+        skill_name = resource.skill.name
+        updated_resource = await self.resource_repo.mark_completed(resource, completed)
+        await self.db.commit()
         
         response = ResourceResponse.from_orm(updated_resource)
-        response.skill_name = updated_resource.skill.name
+        response.skill_name = skill_name
         return response
     
-    def get_stats(self, user_id: int) -> ResourceStatsResponse:
+    async def get_stats(self, user_id: int) -> ResourceStatsResponse:
         """Get resource statistics for user."""
-        stats = self.resource_repo.get_stats(user_id)
+        stats = await self.resource_repo.get_stats(user_id)
         return ResourceStatsResponse(**stats)
\ No newline at end of file
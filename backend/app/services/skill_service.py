@@ -1,11 +1,17 @@
 
-from typing import List, Tuple
+import logging
+from typing import List, Optional, Tuple
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from math import ceil
+from datetime import datetime
+import redis.asyncio as aioredis
 
+from app.core.tasks import enqueue
 from app.repositories.skill_repository import SkillRepository
+from app.repositories.streak_repository import StreakRepository
 from app.models.skill import Skill, SkillStatus, SkillLevel
+from app.utils.pagination import decode_cursor, split_page, total_cache_key, cached_total
 from app.schemas.skill import (
     SkillCreate,
     SkillUpdate,
@@ -15,18 +21,21 @@ from app.schemas.skill import (
     SkillStatsResponse
 )
 
+logger = logging.getLogger(__name__)
+
 
 class SkillService:
     """Service for skill operations."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.skill_repo = SkillRepository(db)
+        self.streak_repo = StreakRepository(db)
     
-    def create_skill(self, user_id: int, skill_data: SkillCreate) -> SkillResponse:
+    async def create_skill(self, user_id: int, skill_data: SkillCreate) -> SkillResponse:
         """Create a new skill for user."""
         # Check if skill with same name exists
-        if self.skill_repo.check_skill_exists(user_id, skill_data.name):
+        if await self.skill_repo.check_skill_exists(user_id, skill_data.name):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Skill with name '{skill_data.name}' already exists"
@@ -43,20 +52,21 @@ class SkillService:
             )
         
         # Create skill
-        skill = self.skill_repo.create(
+        skill = await self.skill_repo.create(
             user_id=user_id,
             name=skill_data.name,
             description=skill_data.description,
             target_level=skill_data.target_level,
             current_level=skill_data.current_level
         )
+        await self.db.commit()
         
         return SkillResponse.from_orm(skill)
     
-    def get_skill(self, skill_id: int, user_id: int, with_stats: bool = False) -> SkillResponse:
+    async def get_skill(self, skill_id: int, user_id: int, with_stats: bool = False) -> SkillResponse:
         """Get a single skill by ID."""
         if with_stats:
-            stats_data = self.skill_repo.get_skill_with_stats(skill_id, user_id)
+            stats_data = await self.skill_repo.get_skill_with_stats(skill_id, user_id)
             if not stats_data:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -71,7 +81,7 @@ class SkillService:
                 streak_days=stats_data["streak_days"]
             )
         
-        skill = self.skill_repo.get_by_id(skill_id, user_id)
+        skill = await self.skill_repo.get_by_id(skill_id, user_id)
         if not skill:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -80,7 +90,7 @@ class SkillService:
         
         return SkillResponse.from_orm(skill)
     
-    def get_all_skills(
+    async def get_all_skills(
         self,
         user_id: int,
         status: SkillStatus = None,
@@ -88,39 +98,61 @@ class SkillService:
         target_level: SkillLevel = None,
         search: str = None,
         page: int = 1,
-        page_size: int = 20
+        page_size: int = 20,
+        cursor: Optional[str] = None,
+        include_total: bool = False,
+        redis_client: Optional[aioredis.Redis] = None
     ) -> SkillListResponse:
-        """Get all skills for user with filters and pagination."""
-        skip = (page - 1) * page_size
+        """
+        Get all skills for user with filters and pagination.
         
-        skills, total = self.skill_repo.get_all(
+        Pages by number, or by keyset when given a previous page's
+        next_cursor; in cursor mode the total is optional and cached.
+        """
+        filters = dict(
             user_id=user_id,
             status=status,
             current_level=current_level,
             target_level=target_level,
-            search=search,
-            skip=skip,
-            limit=page_size
+            search=search
         )
         
-        total_pages = ceil(total / page_size) if total > 0 else 0
+        # Fetch one row past the page to know whether there is a next one
+        if cursor:
+            after = decode_cursor(cursor, (datetime, int))
+            skills = await self.skill_repo.get_all(**filters, limit=page_size + 1, after=after)
+            page = total = total_pages = None
+            if include_total:
+                total = await cached_total(
+                    redis_client,
+                    total_cache_key("skills", **filters),
+                    lambda: self.skill_repo.count(**filters)
+                )
+        else:
+            skip = (page - 1) * page_size
+            skills = await self.skill_repo.get_all(**filters, skip=skip, limit=page_size + 1)
+            total = await self.skill_repo.count(**filters)
+            total_pages = ceil(total / page_size) if total > 0 else 0
+        
+        skills, next_cursor = split_page(skills, page_size, lambda skill: (skill.created_at, skill.id))
         
         return SkillListResponse(
             skills=[SkillResponse.from_orm(skill) for skill in skills],
             total=total,
             page=page,
             page_size=page_size,
-            total_pages=total_pages
+            total_pages=total_pages,
+            next_cursor=next_cursor
         )
     
-    def update_skill(
+    async def update_skill(
         self,
         skill_id: int,
         user_id: int,
         skill_data: SkillUpdate
     ) -> SkillResponse:
         """Update an existing skill."""
-        skill = self.skill_repo.get_by_id(skill_id, user_id)
+        skill = await self.skill_repo.get_by_id(skill_id, user_id)
         if not skill:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -129,7 +161,7 @@ class SkillService:
         
         # Check if name is being updated and already exists
         if skill_data.name and skill_data.name != skill.name:
-            if self.skill_repo.check_skill_exists(
+            if await self.skill_repo.check_skill_exists(
                 user_id,
                 skill_data.name,
                 exclude_id=skill_id
@@ -151,27 +183,43 @@ class SkillService:
         
         # Update skill
         update_data = skill_data.dict(exclude_unset=True)
-        updated_skill = self.skill_repo.update(skill, **update_data)
+        updated_skill = await self.skill_repo.update(skill, **update_data)
+        await self.db.commit()
         
         return SkillResponse.from_orm(updated_skill)
     
-    def delete_skill(self, skill_id: int, user_id: int) -> None:
-        """Delete a skill."""
-        skill = self.skill_repo.get_by_id(skill_id, user_id)
+    async def delete_skill(self, skill_id: int, user_id: int) -> None:
+        """
+        Delete a skill.
+        
+        The skill is only marked deleted, which hides it and its logs and
+        resources at once, and its days are taken off the user's streaks in
+        the same transaction; a maintenance task removes the rows in small
+        batches.
+        """
+        skill = await self.skill_repo.get_by_id(skill_id, user_id)
         if not skill:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Skill not found"
             )
         
-        self.skill_repo.delete(skill)
+        await self.skill_repo.soft_delete(skill)
+        await self.streak_repo.record_skill_removed(user_id, skill_id)
+        await self.db.commit()
+        
+        try:
+            await enqueue("app.tasks.purge.purge_deleted_skills", [skill_id])
+        except Exception as exc:
+            # The periodic purge picks the skill up instead
+            logger.warning(f"Could not queue the purge of skill {skill_id}: {exc}")
     
-    def get_user_stats(self, user_id: int) -> SkillStatsResponse:
+    async def get_user_stats(self, user_id: int) -> SkillStatsResponse:
         """Get overall skill statistics for user."""
-        stats = self.skill_repo.get_user_stats(user_id)
+        stats = await self.skill_repo.get_user_stats(user_id)
         return SkillStatsResponse(**stats)
     
-    def bulk_update_status(
+    async def bulk_update_status(
         self,
         user_id: int,
         skill_ids: List[int],
@@ -184,11 +232,12 @@ class SkillService:
                 detail="No skill IDs provided"
             )
         
-        updated_count = self.skill_repo.bulk_update_status(
+        updated_count = await self.skill_repo.bulk_update_status(
             user_id,
             skill_ids,
             new_status
         )
+        await self.db.commit()
         
         return {
             "updated_count": updated_count,
@@ -1,12 +1,15 @@
 
 from typing import Optional
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from datetime import date, timedelta
 from math import ceil
+import redis.asyncio as aioredis
 
 from app.repositories.summary_repository import SummaryRepository
 from app.utils.summary_generator import SummaryGenerator
+from app.utils.pagination import decode_cursor, split_page, total_cache_key, cached_total
 from app.schemas.summary import (
     WeeklySummaryResponse,
     WeeklySummaryWithDetails,
@@ -18,12 +21,12 @@ from app.schemas.summary import (
 class SummaryService:
     """Service for weekly summary operations."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.summary_repo = SummaryRepository(db)
         self.summary_generator = SummaryGenerator()
     
-    def generate_weekly_summary(
+    async def generate_weekly_summary(
         self,
         user_id: int,
         week_start: date,
@@ -34,31 +37,33 @@ class SummaryService:
         week_end = week_start + timedelta(days=6)
         
         # Check if summary already exists
-        existing_summary = self.summary_repo.get_by_week(user_id, week_start)
+        existing_summary = await self.summary_repo.get_by_week(user_id, week_start)
         if existing_summary and not force_regenerate:
             return WeeklySummaryResponse.from_orm(existing_summary)
         
         # Get week data
-        week_data = self.summary_repo.get_week_data(user_id, week_start, week_end)
+        week_data = await self.summary_repo.get_week_data(user_id, week_start, week_end)
         
         # Generate AI summary text
         week_data["week_start"] = week_start
         week_data["week_end"] = week_end
-        summary_text = self.summary_generator.generate_ai_summary(week_data)
+        # The AI client is blocking, so keep it off the event loop
+        summary_text = await run_in_threadpool(self.summary_generator.generate_ai_summary, week_data)
         
         # Create or update summary
         if existing_summary:
             # Update existing
-            updated_summary = self.summary_repo.update(
+            updated_summary = await self.summary_repo.update(
                 existing_summary,
                 total_hours=week_data["total_time"],
                 summary_text=summary_text,
                 skills_worked_on=week_data["skills_count"]
             )
+            await self.db.commit()
             return WeeklySummaryResponse.from_orm(updated_summary)
         else:
             # Create new
-            summary = self.summary_repo.create(
+            summary = await self.summary_repo.create(
                 user_id=user_id,
                 week_start=week_start,
                 week_end=week_end,
@@ -66,11 +71,12 @@ class SummaryService:
                 summary_text=summary_text,
                 skills_worked_on=week_data["skills_count"]
             )
+            await self.db.commit()
             return WeeklySummaryResponse.from_orm(summary)
     
-    def get_summary(self, summary_id: int, user_id: int, with_details: bool = False) -> WeeklySummaryResponse:
+    async def get_summary(self, summary_id: int, user_id: int, with_details: bool = False) -> WeeklySummaryResponse:
         """Get a single summary by ID."""
-        summary = self.summary_repo.get_by_id(summary_id, user_id)
+        summary = await self.summary_repo.get_by_id(summary_id, user_id)
         if not summary:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -81,7 +87,7 @@ class SummaryService:
             return WeeklySummaryResponse.from_orm(summary)
         
         # Get detailed breakdown
-        week_data = self.summary_repo.get_week_data(
+        week_data = await self.summary_repo.get_week_data(
             user_id,
             summary.week_start,
             summary.week_end
@@ -95,77 +101,96 @@ class SummaryService:
             average_daily_time=week_data["average_daily_time"]
         )
     
-    def get_all_summaries(
+    async def get_all_summaries(
         self,
         user_id: int,
         year: Optional[int] = None,
         month: Optional[int] = None,
         page: int = 1,
-        page_size: int = 20
+        page_size: int = 20,
+        cursor: Optional[str] = None,
+        include_total: bool = False,
+        redis_client: Optional[aioredis.Redis] = None
     ) -> SummaryListResponse:
-        """Get all summaries for user with filters and pagination."""
-        skip = (page - 1) * page_size
-        
-        summaries, total = self.summary_repo.get_all(
-            user_id=user_id,
-            year=year,
-            month=month,
-            skip=skip,
-            limit=page_size
-        )
+        """
+        Get all summaries for user with filters and pagination.
+        
+        Pages by number, or by keyset when given a previous page's
+        next_cursor; in cursor mode the total is optional and cached.
+        """
+        filters = dict(user_id=user_id, year=year, month=month)
+        
+        # Fetch one row past the page to know whether there is a next one
+        if cursor:
+            after = decode_cursor(cursor, (date, int))
+            summaries = await self.summary_repo.get_all(**filters, limit=page_size + 1, after=after)
+            page = total = total_pages = None
+            if include_total:
+                total = await cached_total(
+                    redis_client,
+                    total_cache_key("summaries", **filters),
+                    lambda: self.summary_repo.count(**filters)
+                )
+        else:
+            skip = (page - 1) * page_size
+            summaries = await self.summary_repo.get_all(**filters, skip=skip, limit=page_size + 1)
+            total = await self.summary_repo.count(**filters)
+            total_pages = ceil(total / page_size) if total > 0 else 0
         
-        total_pages = ceil(total / page_size) if total > 0 else 0
+        summaries, next_cursor = split_page(summaries, page_size, lambda s: (s.week_start, s.id))
         
         return SummaryListResponse(
             summaries=[WeeklySummaryResponse.from_orm(s) for s in summaries],
             total=total,
             page=page,
             page_size=page_size,
-            total_pages=total_pages
+            total_pages=total_pages,
+            next_cursor=next_cursor
         )
     
-    def delete_summary(self, summary_id: int, user_id: int) -> None:
+    async def delete_summary(self, summary_id: int, user_id: int) -> None:
         """Delete a summary."""
-        summary = self.summary_repo.get_by_id(summary_id, user_id)
+        summary = await self.summary_repo.get_by_id(summary_id, user_id)
         if not summary:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Summary not found"
             )
         
-        self.summary_repo.delete(summary)
+        await self.summary_repo.delete(summary)
+        await self.db.commit()
     
-    def get_stats(self, user_id: int) -> SummaryStatsResponse:
+    async def get_stats(self, user_id: int) -> SummaryStatsResponse:
         """Get summary statistics."""
-        stats = self.summary_repo.get_stats(user_id)
+        stats = await self.summary_repo.get_stats(user_id)
         return SummaryStatsResponse(**stats)
     
-    def get_current_week_summary(self, user_id: int) -> WeeklySummaryWithDetails:
+    async def get_current_week_summary(self, user_id: int) -> WeeklySummaryWithDetails:
         """Get or generate summary for current week."""
         today = date.today()
         week_start = today - timedelta(days=today.weekday())
         
         # Try to get existing summary
-        existing = self.summary_repo.get_by_week(user_id, week_start)
+        existing = await self.summary_repo.get_by_week(user_id, week_start)
         
         if existing:
-            return self.get_summary(existing.id, user_id, with_details=True)
+            return await self.get_summary(existing.id, user_id, with_details=True)
         
         # Generate new summary
-        summary = self.generate_weekly_summary(user_id, week_start)
-        return self.get_summary(summary.id, user_id, with_details=True)
+        summary = await self.generate_weekly_summary(user_id, week_start)
+        return await self.get_summary(summary.id, user_id, with_details=True)
     
-    def get_last_week_summary(self, user_id: int) -> WeeklySummaryWithDetails:
+    async def get_last_week_summary(self, user_id: int) -> WeeklySummaryWithDetails:
         """Get or generate summary for last week."""
         today = date.today()
         last_week_start = today - timedelta(days=today.weekday() + 7)
         
         # Try to get existing summary
-        existing = self.summary_repo.get_by_week(user_id, last_week_start)
+        existing = await self.summary_repo.get_by_week(user_id, last_week_start)
         
         if existing:
-            return self.get_summary(existing.id, user_id, with_details=True)
+            return await self.get_summary(existing.id, user_id, with_details=True)
         
         # Generate new summary
-        summary = self.generate_weekly_summary(user_id, last_week_start)
-        return self.get_summary(summary.id, user_id, with_details=True)
\ No newline at end of file
+        summary = await self.generate_weekly_summary(user_id, last_week_start)
+        return await self.get_summary(summary.id, user_id, with_details=True)
\ No newline at end of file
@@ -1,11 +1,12 @@
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.repositories.user_repository import UserRepository
 from app.repositories.skill_repository import SkillRepository
 from app.repositories.progress_repository import ProgressRepository
 from app.repositories.resource_repository import ResourceRepository
-from app.core.security import verify_password
+from app.core.security import verify_password_async
+from app.core.dependencies import principal_cache, session_store
 from app.schemas.user import (
     UserProfileUpdate,
     UserEmailUpdate,
@@ -20,16 +21,16 @@ from app.models.user import User
 class UserService:
     """Service for user profile operations."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.user_repo = UserRepository(db)
         self.skill_repo = SkillRepository(db)
         self.progress_repo = ProgressRepository(db)
         self.resource_repo = ResourceRepository(db)
     
-    def get_profile(self, user_id: int) -> UserProfileResponse:
+    async def get_profile(self, user_id: int) -> UserProfileResponse:
         """Get user profile."""
-        user = self.user_repo.get_by_id(user_id)
+        user = await self.user_repo.get_by_id(user_id)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -38,9 +39,9 @@ class UserService:
         
         return UserProfileResponse.from_orm(user)
     
-    def update_profile(self, user_id: int, profile_data: UserProfileUpdate) -> UserProfileResponse:
+    async def update_profile(self, user_id: int, profile_data: UserProfileUpdate) -> UserProfileResponse:
         """Update user profile."""
-        user = self.user_repo.get_by_id(user_id)
+        user = await self.user_repo.get_by_id(user_id)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -49,7 +50,7 @@ class UserService:
         
         # Check if username is being updated and already exists
         if profile_data.username and profile_data.username != user.username:
-            existing_user = self.user_repo.get_by_username(profile_data.username)
+            existing_user = await self.user_repo.get_by_username(profile_data.username)
             if existing_user:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -62,12 +63,14 @@ class UserService:
         if profile_data.username:
             user.username = profile_data.username
         
-        updated_user = self.user_repo.update(user)
+        updated_user = await self.user_repo.update(user)
+        await self.db.commit()
+        await principal_cache.invalidate(user_id)
         return UserProfileResponse.from_orm(updated_user)
     
-    def update_email(self, user_id: int, email_data: UserEmailUpdate) -> UserProfileResponse:
+    async def update_email(self, user_id: int, email_data: UserEmailUpdate) -> UserProfileResponse:
         """Update user email with password confirmation."""
-        user = self.user_repo.get_by_id(user_id)
+        user = await self.user_repo.get_by_id(user_id)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -75,14 +78,15 @@ class UserService:
             )
         
         # Verify password
-        if not verify_password(email_data.password, user.hashed_password):
+        await self.user_repo.release_connection()
+        if not await verify_password_async(email_data.password, user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Incorrect password"
             )
         
         # Check if email already exists
-        existing_user = self.user_repo.get_by_email(email_data.email)
+        existing_user = await self.user_repo.get_by_email(email_data.email)
         if existing_user and existing_user.id != user_id:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -93,12 +97,14 @@ class UserService:
         user.email = email_data.email
         user.is_verified = False  # Require re-verification
         
-        updated_user = self.user_repo.update(user)
+        updated_user = await self.user_repo.update(user)
+        await self.db.commit()
+        await principal_cache.invalidate(user_id)
         return UserProfileResponse.from_orm(updated_user)
     
-    def get_dashboard(self, user_id: int) -> UserDashboardResponse:
+    async def get_dashboard(self, user_id: int) -> UserDashboardResponse:
         """Get complete user dashboard with all statistics."""
-        user = self.user_repo.get_by_id(user_id)
+        user = await self.user_repo.get_by_id(user_id)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -106,13 +112,13 @@ class UserService:
             )
         
         # Get skill stats
-        skill_stats = self.skill_repo.get_user_stats(user_id)
+        skill_stats = await self.skill_repo.get_user_stats(user_id)
         
         # Get progress stats
-        progress_stats = self.progress_repo.get_overall_stats(user_id)
+        progress_stats = await self.progress_repo.get_overall_stats(user_id)
         
         # Get resource stats
-        resource_stats = self.resource_repo.get_stats(user_id)
+        resource_stats = await self.resource_repo.get_stats(user_id)
         
         return UserDashboardResponse(
             profile=UserProfileResponse.from_orm(user),
@@ -125,10 +131,10 @@ class UserService:
             completed_resources=resource_stats["completed_resources"]
         )
     
-    def get_quick_stats(self, user_id: int) -> UserStatsResponse:
+    async def get_quick_stats(self, user_id: int) -> UserStatsResponse:
         """Get quick user statistics."""
-        skill_stats = self.skill_repo.get_user_stats(user_id)
-        progress_stats = self.progress_repo.get_overall_stats(user_id)
+        skill_stats = await self.skill_repo.get_user_stats(user_id)
+        progress_stats = await self.progress_repo.get_overall_stats(user_id)
         
         return UserStatsResponse(
             total_skills=skill_stats["total_skills"],
@@ -139,9 +145,9 @@ class UserService:
             this_week_time=progress_stats["this_week_time"]
         )
     
-    def deactivate_account(self, user_id: int, password: str) -> None:
+    async def deactivate_account(self, user_id: int, password: str) -> None:
         """Deactivate user account with password confirmation."""
-        user = self.user_repo.get_by_id(user_id)
+        user = await self.user_repo.get_by_id(user_id)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -149,11 +155,15 @@ class UserService:
             )
         
         # Verify password
-        if not verify_password(password, user.hashed_password):
+        await self.user_repo.release_connection()
+        if not await verify_password_async(password, user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Incorrect password"
             )
         
-        # Deactivate account
-        self.user_repo.deactivate(user)
\ No newline at end of file
+        # Deactivate account and end its sessions
+        await self.user_repo.deactivate(user)
+        await self.db.commit()
+        await principal_cache.invalidate(user_id)
+        await session_store.end_all(user_id)
\ No newline at end of file
@@ -0,0 +1,49 @@
+# app/tasks/imports.py
+from celery.utils.log import get_task_logger
+import asyncio
+
+from app.core.database import WorkerSessionLocal
+from app.services.import_service import ImportService
+from app.tasks.weekly_summary import celery
+
+logger = get_task_logger(__name__)
+
+
+@celery.task
+def import_progress_logs(job_id: int):
+    """
+    Import an uploaded progress history file.
+    
+    Queued by POST /imports/; runs on the imports queue so a large file
+    does not hold up summaries or maintenance.
+    """
+    try:
+        return asyncio.run(_import_progress_logs(job_id))
+    
+    except Exception as e:
+        logger.error(f"Error importing job {job_id}: {str(e)}")
+        return {"status": "error", "error": str(e)}
+
+
+async def _import_progress_logs(job_id: int) -> dict:
+    """Async body of import_progress_logs."""
+    async with WorkerSessionLocal() as db:
+        job = await ImportService(db).run_job(job_id)
+    
+    if job is None:
+        logger.warning(f"Import job {job_id} is not pending, skipped")
+        return {"status": "skipped", "job_id": job_id}
+    
+    logger.info(
+        f"Import job {job_id} done: {job.rows_read} rows, {job.logs_created} logs created, "
+        f"{job.logs_updated} updated, {job.rows_skipped} skipped"
+    )
+    return {
+        "status": "success",
+        "job_id": job_id,
+        "rows_read": job.rows_read,
+        "rows_skipped": job.rows_skipped,
+        "logs_created": job.logs_created,
+        "logs_updated": job.logs_updated,
+        "skills_created": job.skills_created
+    }
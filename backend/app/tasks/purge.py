@@ -0,0 +1,68 @@
+# app/tasks/purge.py
+from typing import List, Optional
+from celery.utils.log import get_task_logger
+import asyncio
+
+from app.core.database import WorkerSessionLocal
+from app.models.progress import ProgressLog
+from app.models.resource import Resource
+from app.models.rollup import ProgressDailyRollup
+from app.repositories.skill_repository import SkillRepository
+from app.tasks.weekly_summary import celery
+
+logger = get_task_logger(__name__)
+
+# Rollups first, as stats read them; the skill row itself goes last
+PURGED_CHILDREN = (ProgressDailyRollup, ProgressLog, Resource)
+
+
+@celery.task
+def purge_deleted_skills(skill_ids: Optional[List[int]] = None, batch_size: int = 1000):
+    """
+    Remove soft-deleted skills and everything logged against them.
+
+    Queued for a skill when it is deleted, and run every few minutes without
+    `skill_ids` to pick up any skill whose purge was never queued or failed.
+    """
+    try:
+        return asyncio.run(_purge_deleted_skills(skill_ids, batch_size))
+
+    except Exception as e:
+        logger.error(f"Error purging deleted skills: {str(e)}")
+        return {"status": "error", "error": str(e)}
+
+
+async def _purge_deleted_skills(skill_ids: Optional[List[int]], batch_size: int) -> dict:
+    """Async body of purge_deleted_skills."""
+    purged = []
+    rows = 0
+
+    async with WorkerSessionLocal() as db:
+        skill_repo = SkillRepository(db)
+
+        deleted = await skill_repo.get_deleted(skill_ids)
+        await db.commit()
+
+        for skill_id in deleted:
+            # One short transaction per batch, so row locks are held briefly
+            # and other writes for the user are never blocked for long
+            for model in PURGED_CHILDREN:
+                while True:
+                    count = await skill_repo.purge_children(model, skill_id, batch_size)
+                    await db.commit()
+                    rows += count
+                    if count < batch_size:
+                        break
+
+            # Streaks already lost the skill's days when it was deleted
+            await skill_repo.purge(skill_id)
+            await db.commit()
+            purged.append(skill_id)
+
+    logger.info(f"Deleted skills purged: {len(purged)} skills, {rows} rows")
+    return {
+        "status": "success",
+        "purged": len(purged),
+        "rows": rows,
+        "skill_ids": purged
+    }
@@ -0,0 +1,58 @@
+# app/tasks/reconcile.py
+from celery.utils.log import get_task_logger
+import asyncio
+
+from app.core.database import WorkerSessionLocal
+from app.repositories.skill_repository import SkillRepository
+from app.tasks.weekly_summary import celery
+
+logger = get_task_logger(__name__)
+
+
+@celery.task
+def reconcile_skill_totals(batch_size: int = 1000):
+    """
+    Detect and repair drift in skills' total_hours.
+    
+    Totals are maintained by delta updates on every progress write; this
+    re-sums the progress logs for every skill and fixes any that disagree.
+    Runs nightly.
+    """
+    try:
+        return asyncio.run(_reconcile_skill_totals(batch_size))
+    
+    except Exception as e:
+        logger.error(f"Error reconciling skill totals: {str(e)}")
+        return {"status": "error", "error": str(e)}
+
+
+async def _reconcile_skill_totals(batch_size: int) -> dict:
+    """Async body of reconcile_skill_totals."""
+    checked = 0
+    repaired = []
+    last_id = 0
+    
+    async with WorkerSessionLocal() as db:
+        skill_repo = SkillRepository(db)
+        
+        # One short transaction per batch, so row locks are held briefly
+        while True:
+            skill_ids, drifted = await skill_repo.reconcile_total_hours(last_id, batch_size)
+            await db.commit()
+            if not skill_ids:
+                break
+            
+            for skill_id, total in drifted:
+                logger.warning(f"Skill {skill_id} total_hours drifted, reset to {total}")
+            
+            checked += len(skill_ids)
+            repaired.extend(skill_id for skill_id, _ in drifted)
+            last_id = skill_ids[-1]
+    
+    logger.info(f"Skill totals reconciled: {checked} checked, {len(repaired)} repaired")
+    return {
+        "status": "success",
+        "checked": checked,
+        "repaired": len(repaired),
+        "skill_ids": repaired
+    }
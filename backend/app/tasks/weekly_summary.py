@@ -30,11 +30,14 @@
 from celery import Celery
 from celery.schedules import crontab
 from celery.utils.log import get_task_logger
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from datetime import date, timedelta
+import asyncio
 
-from app.core.database import SessionLocal
+from app.core.database import SessionLocal, WorkerSessionLocal
 from app.core.config import settings
+from app.core.tasks import TASK_ROUTES
 from app.models.user import User
 from app.services.summary_service import SummaryService
 from app.services.email_service import EmailService
@@ -45,7 +48,8 @@ logger = get_task_logger(__name__)
 celery = Celery(
     'skilltracker',
     broker=settings.CELERY_BROKER_URL,
-    backend=settings.CELERY_RESULT_BACKEND
+    backend=settings.CELERY_RESULT_BACKEND,
+    include=['app.tasks.reconcile', 'app.tasks.imports', 'app.tasks.purge']
 )
 
 celery.conf.timezone = 'UTC'
@@ -60,25 +64,37 @@ def generate_and_send_weekly_summary(self, user_id: int, week_start: date):
         user_id: The user's ID
         week_start: Start date of the week (Monday)
     """
-    db: Session = SessionLocal()
-    
     try:
+        return asyncio.run(_generate_and_send_weekly_summary(user_id, week_start))
+    
+    except Exception as exc:
+        logger.error(f"Error generating summary for user {user_id}: {str(exc)}")
+        
+        # Retry with exponential backoff
+        raise self.retry(exc=exc, countdown=60 * (2 ** self.request.retries))
+
+
+async def _generate_and_send_weekly_summary(user_id: int, week_start: date) -> dict:
+    """Async body of generate_and_send_weekly_summary."""
+    async with WorkerSessionLocal() as db:
         # Get user
-        user = db.query(User).filter(User.id == user_id, User.is_active == True).first()
+        user = await db.scalar(
+            select(User).where(User.id == user_id, User.is_active == True)
+        )
         if not user:
             logger.warning(f"User {user_id} not found or inactive")
             return {"status": "skipped", "reason": "user_not_found"}
         
         # Generate summary
         summary_service = SummaryService(db)
-        summary = summary_service.generate_weekly_summary(
+        summary = await summary_service.generate_weekly_summary(
             user_id=user_id,
             week_start=week_start,
             force_regenerate=True  # Always regenerate for scheduled tasks
         )
         
         # Get detailed summary for email
-        detailed_summary = summary_service.get_summary(
+        detailed_summary = await summary_service.get_summary(
             summary_id=summary.id,
             user_id=user_id,
             with_details=True
@@ -114,15 +130,6 @@ def generate_and_send_weekly_summary(self, user_id: int, week_start: date):
                 "email_sent": False,
                 "week_start": str(week_start)
             }
-    
-    except Exception as exc:
-        logger.error(f"Error generating summary for user {user_id}: {str(exc)}")
-        
-        # Retry with exponential backoff
-        raise self.retry(exc=exc, countdown=60 * (2 ** self.request.retries))
-    
-    finally:
-        db.close()
 
 
 @celery.task
@@ -217,8 +224,20 @@ celery.conf.beat_schedule = {
             'expires': 3600,  # Task expires after 1 hour
         }
     },
+    'reconcile-skill-totals': {
+        'task': 'app.tasks.reconcile.reconcile_skill_totals',
+        'schedule': crontab(hour=3, minute=30),  # Daily 3:30 AM
+        'options': {
+            'expires': 3600,
+        }
+    },
+    'purge-deleted-skills': {
+        'task': 'app.tasks.purge.purge_deleted_skills',
+        'schedule': crontab(minute='*/15'),  # Catches purges that were never queued
+        'options': {
+            'expires': 900,
+        }
+    },
 }
 
-celery.conf.task_routes = {
-    'app.tasks.weekly_summary.*': {'queue': 'summaries'},
-}
\ No newline at end of file
+celery.conf.task_routes = TASK_ROUTES
\ No newline at end of file
@@ -0,0 +1,363 @@
+"""
+Streaming parsers for progress history exported by other time trackers.
+
+Each parser reads a binary file one line at a time and yields an ImportRow
+per entry, or an ImportRowError for an entry that cannot be imported, so
+only the current entry is ever held in memory however large the file is.
+
+* CSV needs a header row. Columns are matched case-insensitively: the skill
+  from ``skill``, ``project``, ``category`` or ``activity``; the day from
+  ``date``, ``start date``, ``start`` or ``day``; the time from ``minutes``
+  or ``time_spent``, ``duration`` (H:MM[:SS] or ISO 8601) or ``hours``;
+  plus optional ``description`` and ``notes``.
+* JSON lines holds one object per line with the same keys.
+* iCalendar yields one entry per VEVENT: the skill is its first CATEGORIES
+  value, or its SUMMARY, and the time runs from DTSTART to DTEND (or
+  DURATION). Recurring events are imported once; all-day events have no
+  duration and are skipped.
+"""
+import csv
+import io
+import json
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Union
+
+from app.models.import_job import ImportFormat
+
+MAX_SKILL_NAME_LENGTH = 100
+MAX_DESCRIPTION_LENGTH = 1000
+MAX_NOTES_LENGTH = 2000
+MAX_MINUTES = 24 * 60
+
+SKILL_KEYS = ("skill", "project", "category", "activity")
+DATE_KEYS = ("date", "start date", "start", "day")
+DESCRIPTION_KEYS = ("description", "summary")
+NOTES_KEYS = ("notes", "note")
+
+ISO_DURATION = re.compile(
+    r"^P(?:(?P<weeks>\d+)W)?(?:(?P<days>\d+)D)?"
+    r"(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?$"
+)
+
+
+@dataclass
+class ImportRow:
+    """One day of time on a skill, as read from an import file."""
+    line: int
+    skill: str
+    date: date
+    minutes: int
+    description: Optional[str] = None
+    notes: Optional[str] = None
+
+
+@dataclass
+class ImportRowError:
+    """An entry that was skipped, with where it was and why."""
+    line: int
+    reason: str
+
+
+ImportEntry = Union[ImportRow, ImportRowError]
+
+
+class ByteCounter(io.RawIOBase):
+    """Wraps a binary file and counts the bytes read from it, for progress."""
+    
+    def __init__(self, raw: BinaryIO):
+        self.raw = raw
+        self.bytes_read = 0
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        read = self.raw.readinto(buffer)
+        self.bytes_read += read or 0
+        return read
+
+
+def parse(fmt: ImportFormat, raw: BinaryIO) -> Iterator[ImportEntry]:
+    """Stream the entries of a file in the given format."""
+    parsers = {
+        ImportFormat.CSV: parse_csv,
+        ImportFormat.JSONL: parse_jsonl,
+        ImportFormat.ICS: parse_ics
+    }
+    return parsers[fmt](raw)
+
+
+def parse_csv(raw: BinaryIO) -> Iterator[ImportEntry]:
+    """Entries of a CSV file with a header row."""
+    reader = csv.DictReader(_text(raw))
+    while True:
+        try:
+            record = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as exc:
+            # The reader resumes at the next line
+            yield ImportRowError(reader.line_num, f"Malformed CSV: {exc}")
+            continue
+        yield _from_record(reader.line_num, record)
+
+
+def parse_jsonl(raw: BinaryIO) -> Iterator[ImportEntry]:
+    """Entries of a JSON lines file; blank lines are ignored."""
+    for line_number, line in enumerate(_text(raw), start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield ImportRowError(line_number, "Invalid JSON")
+            continue
+        if not isinstance(record, dict):
+            yield ImportRowError(line_number, "Expected a JSON object")
+            continue
+        yield _from_record(line_number, record)
+
+
+def parse_ics(raw: BinaryIO) -> Iterator[ImportEntry]:
+    """Entries of an iCalendar file, one per VEVENT."""
+    event = None
+    event_line = 0
+    nested = 0  # Depth of components inside the event, such as VALARM
+    for line_number, line in _unfolded(_text(raw)):
+        name, params, value = _content_line(line)
+        if event is None:
+            if name == "BEGIN" and value.upper() == "VEVENT":
+                event, event_line = {}, line_number
+        elif name == "BEGIN":
+            nested += 1
+        elif name == "END" and nested:
+            nested -= 1
+        elif name == "END":
+            yield _from_event(event_line, event)
+            event = None
+        elif not nested:
+            event.setdefault(name, (params, value))
+
+
+def _text(raw: BinaryIO) -> io.TextIOWrapper:
+    # A UTF-8 BOM from spreadsheet exports is dropped; undecodable bytes
+    # become U+FFFD instead of failing the whole file
+    return io.TextIOWrapper(
+        io.BufferedReader(raw) if isinstance(raw, io.RawIOBase) else raw,
+        encoding="utf-8-sig",
+        errors="replace",
+        newline=""
+    )
+
+
+def _from_record(line: int, record: Dict[str, Any]) -> ImportEntry:
+    """Map a CSV or JSON record onto a row."""
+    fields = {str(key).strip().lower(): value for key, value in record.items() if key is not None}
+    
+    try:
+        day = _parse_date(_first(fields, DATE_KEYS))
+        minutes = _record_minutes(fields)
+    except ValueError as exc:
+        return ImportRowError(line, str(exc))
+    
+    return _row(
+        line,
+        _first(fields, SKILL_KEYS),
+        day,
+        minutes,
+        _first(fields, DESCRIPTION_KEYS),
+        _first(fields, NOTES_KEYS)
+    )
+
+
+def _record_minutes(fields: Dict[str, Any]) -> int:
+    minutes = _first(fields, ("minutes", "time_spent"))
+    if minutes is not None:
+        return round(_number(minutes, "minutes"))
+    
+    duration = _first(fields, ("duration",))
+    if duration is not None:
+        return _parse_duration(str(duration))
+    
+    hours = _first(fields, ("hours",))
+    if hours is not None:
+        return round(_number(hours, "hours") * 60)
+    
+    raise ValueError("Missing minutes, duration or hours")
+
+
+def _from_event(line: int, event: Dict[str, tuple]) -> ImportEntry:
+    """Map a VEVENT's properties onto a row."""
+    if "DTSTART" not in event:
+        return ImportRowError(line, "Event has no DTSTART")
+    
+    try:
+        start = _parse_ics_datetime(*event["DTSTART"])
+        if "DTEND" in event:
+            duration = _parse_ics_datetime(*event["DTEND"]) - start
+        elif "DURATION" in event:
+            duration = timedelta(minutes=_parse_duration(event["DURATION"][1]))
+        else:
+            raise ValueError("Event has no DTEND or DURATION")
+    except ValueError as exc:
+        return ImportRowError(line, str(exc))
+    
+    summary = _ics_text(event.get("SUMMARY"))
+    categories = _ics_text(event.get("CATEGORIES"))
+    category = categories.split(",")[0].strip() if categories else None
+    description = _ics_text(event.get("DESCRIPTION"))
+    
+    return _row(
+        line,
+        category or summary,
+        start.date(),
+        round(duration.total_seconds() / 60),
+        description or (summary if category else None),
+        None
+    )
+
+
+def _row(
+    line: int,
+    skill: Any,
+    day: date,
+    minutes: int,
+    description: Any,
+    notes: Any
+) -> ImportEntry:
+    """Validate a parsed entry the way ProgressLogCreate and SkillCreate would."""
+    skill = str(skill).strip()[:MAX_SKILL_NAME_LENGTH] if skill is not None else ""
+    if len(skill) < 2:
+        return ImportRowError(line, "Missing skill name")
+    if day > date.today():
+        return ImportRowError(line, "Cannot log progress for future dates")
+    if minutes <= 0:
+        return ImportRowError(line, "Time spent must be greater than 0")
+    if minutes > MAX_MINUTES:
+        return ImportRowError(line, "Time spent cannot exceed 24 hours (1440 minutes)")
+    
+    return ImportRow(
+        line=line,
+        skill=skill,
+        date=day,
+        minutes=minutes,
+        description=_optional_text(description, MAX_DESCRIPTION_LENGTH),
+        notes=_optional_text(notes, MAX_NOTES_LENGTH)
+    )
+
+
+def _first(fields: Dict[str, Any], keys: tuple) -> Any:
+    """The first of `keys` with a non-empty value."""
+    for key in keys:
+        value = fields.get(key)
+        if value is not None and value != "":
+            return value
+    return None
+
+
+def _optional_text(value: Any, max_length: int) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value[:max_length] or None
+
+
+def _number(value: Any, label: str) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {label}: {value!r}")
+
+
+def _parse_date(value: Any) -> date:
+    """A date from an ISO 8601 date or datetime."""
+    if value is None:
+        raise ValueError("Missing date")
+    value = str(value).strip()
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).date()
+    except ValueError:
+        raise ValueError(f"Invalid date: {value!r}")
+
+
+def _parse_duration(value: str) -> int:
+    """Minutes from H:MM, H:MM:SS or an ISO 8601 duration such as PT1H30M."""
+    value = value.strip()
+    parts = value.split(":")
+    if 2 <= len(parts) <= 3 and all(part.isdigit() for part in parts):
+        hours, minutes = int(parts[0]), int(parts[1])
+        seconds = int(parts[2]) if len(parts) == 3 else 0
+        return round(hours * 60 + minutes + seconds / 60)
+    
+    match = ISO_DURATION.match(value.upper())
+    if match and value.upper() not in ("P", "PT"):
+        amounts = {key: int(amount or 0) for key, amount in match.groupdict().items()}
+        return round(timedelta(**amounts).total_seconds() / 60)
+    
+    raise ValueError(f"Invalid duration: {value!r}")
+
+
+def _unfolded(lines: io.TextIOWrapper) -> Iterator[tuple]:
+    """Yield (line number, logical line), joining RFC 5545 folded lines."""
+    pending, pending_line = None, 0
+    for line_number, line in enumerate(lines, start=1):
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and pending is not None:
+            pending += line[1:]
+            continue
+        if pending:
+            yield pending_line, pending
+        pending, pending_line = line, line_number
+    if pending:
+        yield pending_line, pending
+
+
+def _content_line(line: str) -> tuple:
+    """Split ``NAME;PARAM=value:VALUE`` into (NAME, params, VALUE)."""
+    quoted = False
+    for index, char in enumerate(line):
+        if char == '"':
+            quoted = not quoted
+        elif char == ":" and not quoted:
+            head, value = line[:index], line[index + 1:]
+            break
+    else:
+        return "", {}, ""
+    
+    name, *raw_params = head.split(";")
+    params = {}
+    for param in raw_params:
+        key, _, param_value = param.partition("=")
+        params[key.upper()] = param_value.strip('"')
+    return name.upper(), params, value
+
+
+def _parse_ics_datetime(params: Dict[str, str], value: str) -> datetime:
+    """
+    A DTSTART or DTEND as written.
+    
+    Times are kept in the zone they are given in (UTC for a trailing Z,
+    TZID or floating otherwise), so an entry lands on the day it shows in
+    the calendar.
+    """
+    value = value.strip()
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        raise ValueError("All-day events have no duration")
+    try:
+        return datetime.strptime(value.rstrip("Z"), "%Y%m%dT%H%M%S")
+    except ValueError:
+        raise ValueError(f"Invalid date-time: {value!r}")
+
+
+def _ics_text(prop: Optional[tuple]) -> Optional[str]:
+    """Unescape an iCalendar TEXT value."""
+    if prop is None:
+        return None
+    value = re.sub(r"\\([\\;,nN])", lambda m: "\n" if m.group(1) in "nN" else m.group(1), prop[1])
+    return value.strip() or None
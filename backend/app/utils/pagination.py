@@ -0,0 +1,106 @@
+"""
+Keyset (cursor) pagination helpers for list endpoints.
+
+A cursor is the sort key of the last row on a page, JSON encoded and
+base64'd so clients treat it as opaque. The next page is everything that
+sorts strictly after it, which the composite indexes answer without
+scanning skipped rows the way OFFSET does.
+"""
+import base64
+import hashlib
+import json
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable, List, Optional, Sequence, Tuple
+
+import redis
+import redis.asyncio as aioredis
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_
+
+from app.core.config import settings
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode a row's sort key as an opaque cursor."""
+    payload = [value.isoformat() if isinstance(value, (date, datetime)) else value for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, types: Sequence[type]) -> Tuple:
+    """Decode a cursor into a sort key of the given column types."""
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(raw, list) or len(raw) != len(types):
+            raise ValueError("wrong number of keys")
+        return tuple(_parse_key(value, key_type) for value, key_type in zip(raw, types))
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def _parse_key(value: Any, key_type: type) -> Any:
+    if key_type is datetime:
+        return datetime.fromisoformat(value)
+    if key_type is date:
+        return date.fromisoformat(value)
+    if key_type is int and isinstance(value, int) and not isinstance(value, bool):
+        return value
+    raise ValueError(f"bad cursor key {value!r}")
+
+
+def after_cursor(columns: Sequence, values: Sequence):
+    """Filter for rows after the cursor in descending order of `columns`."""
+    return tuple_(*columns) < tuple_(*values)
+
+
+def split_page(rows: List, page_size: int, sort_key: Callable[[Any], Sequence]) -> Tuple[List, Optional[str]]:
+    """
+    Trim the look-ahead row fetched past the page and build the next cursor.
+    
+    Repositories are asked for page_size + 1 rows; the extra row only tells
+    us whether there is a next page.
+    """
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, encode_cursor(sort_key(rows[-1]))
+
+
+def total_cache_key(name: str, user_id: int, **filters: Any) -> str:
+    """Redis key for a list total under one set of filters."""
+    digest = hashlib.sha1(
+        json.dumps(filters, sort_keys=True, default=str).encode()
+    ).hexdigest()[:16]
+    return f"list_total:{name}:{user_id}:{digest}"
+
+
+async def cached_total(
+    redis_client: Optional[aioredis.Redis],
+    key: str,
+    count: Callable[[], Awaitable[int]]
+) -> int:
+    """
+    Get a list total from Redis, counting and caching it on a miss.
+    
+    Totals may lag writes by up to LIST_TOTAL_CACHE_TTL seconds, which is
+    fine for "N results" labels. Redis errors fall back to counting.
+    """
+    if redis_client is not None:
+        try:
+            cached = await redis_client.get(key)
+            if cached is not None:
+                return int(cached)
+        except redis.RedisError:
+            redis_client = None
+    
+    total = await count()
+    
+    if redis_client is not None:
+        try:
+            await redis_client.setex(key, settings.LIST_TOTAL_CACHE_TTL, total)
+        except redis.RedisError:
+            pass
+    return total
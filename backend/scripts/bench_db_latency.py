@@ -0,0 +1,99 @@
+"""
+Compare request latency under concurrency for the sync and async engines.
+
+Simulates one uvicorn worker: a single event loop serving ``--concurrency``
+in-flight requests, each running the progress stats aggregate for a user.
+In ``sync`` mode the query goes through ``SessionLocal`` from inside the
+coroutine (what the handlers used to do), so every round trip blocks the
+loop. In ``async`` mode it goes through ``AsyncSessionLocal``.
+
+Usage:
+    python -m scripts.bench_db_latency --user-id 1 --requests 2000 --concurrency 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import select, func
+
+from app.core.database import SessionLocal, AsyncSessionLocal, async_engine
+from app.models.progress import ProgressLog
+
+
+def _stats_query(user_id: int):
+    return select(
+        func.count(ProgressLog.id),
+        func.sum(ProgressLog.time_spent),
+        func.count(func.distinct(ProgressLog.skill_id))
+    ).where(ProgressLog.user_id == user_id)
+
+
+async def _sync_request(user_id: int) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(_stats_query(user_id)).one()
+    finally:
+        db.close()
+
+
+async def _async_request(user_id: int) -> None:
+    async with AsyncSessionLocal() as db:
+        (await db.execute(_stats_query(user_id))).one()
+
+
+async def _run(mode: str, user_id: int, total: int, concurrency: int) -> list:
+    handler = _sync_request if mode == "sync" else _async_request
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        # Latency is measured from arrival, so time spent waiting behind a
+        # blocked loop is counted like it would be for a real client.
+        arrived = time.perf_counter()
+        async with semaphore:
+            await handler(user_id)
+        latencies.append((time.perf_counter() - arrived) * 1000)
+
+    await asyncio.gather(*(one() for _ in range(total)))
+    return latencies
+
+
+def _percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _report(mode: str, latencies: list, elapsed: float) -> None:
+    print(
+        f"{mode:>5}  n={len(latencies):<6} "
+        f"p50={_percentile(latencies, 50):8.1f}ms  "
+        f"p95={_percentile(latencies, 95):8.1f}ms  "
+        f"p99={_percentile(latencies, 99):8.1f}ms  "
+        f"mean={statistics.mean(latencies):8.1f}ms  "
+        f"throughput={len(latencies) / elapsed:8.1f} req/s"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--mode", choices=["sync", "async", "both"], default="both")
+    args = parser.parse_args()
+
+    modes = ["sync", "async"] if args.mode == "both" else [args.mode]
+    for mode in modes:
+        # Warm up the pool so connection setup is not part of the numbers
+        await _run(mode, args.user_id, 20, 20)
+        started = time.perf_counter()
+        latencies = await _run(mode, args.user_id, args.requests, args.concurrency)
+        _report(mode, latencies, time.perf_counter() - started)
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+"""
+Benchmark exporting a large account.
+
+Seeds a throwaway user with ``--logs`` progress logs spread over
+``--skills`` skills and streams their progress log export through
+``ExportService.export_account`` the way ``GET /users/export`` does, into a
+temporary file. Reports the time, the file size and how much the process'
+peak RSS grew, which should not depend on the number of logs, then how long
+the file takes to load back into Python. The seeded rows are removed at the
+end.
+
+Usage:
+    python -m scripts.bench_export --logs 500000 --skills 20 --format parquet
+"""
+import argparse
+import asyncio
+import csv
+import gzip
+import json
+import os
+import resource
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import Integer, true, select, delete, insert, func, literal
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from app.core.database import AsyncSessionLocal, async_engine
+from app.models.progress import ProgressLog
+from app.models.skill import Skill
+from app.models.user import User
+from app.schemas.export import ExportFormat, ExportSection
+from app.services.export_service import ExportService
+
+
+async def _seed(logs: int, skills: int) -> int:
+    tag = uuid.uuid4().hex[:12]
+    async with AsyncSessionLocal() as db:
+        user_id = await db.scalar(
+            insert(User).values(
+                email=f"bench-{tag}@example.com",
+                username=f"bench-{tag}",
+                hashed_password="!"
+            ).returning(User.id)
+        )
+        skill_ids = list(await db.scalars(
+            insert(Skill).returning(Skill.id),
+            [{"user_id": user_id, "name": f"Exported skill {i}"} for i in range(skills)]
+        ))
+        # One log per skill and day, walking back from today
+        days = func.generate_series(0, (logs - 1) // skills).table_valued("n").render_derived()
+        skill_rows = func.unnest(literal(skill_ids, ARRAY(Integer))).table_valued("skill_id").render_derived()
+        await db.execute(
+            insert(ProgressLog).from_select(
+                ["user_id", "skill_id", "date", "time_spent", "description"],
+                select(
+                    literal(user_id),
+                    skill_rows.c.skill_id,
+                    func.current_date() - days.c.n,
+                    5 + (days.c.n + skill_rows.c.skill_id) % 55,
+                    func.concat("exported session ", days.c.n)
+                ).select_from(days).join(skill_rows, true()).limit(logs)
+            )
+        )
+        await db.commit()
+    return user_id
+
+
+def _load(path: str, fmt: ExportFormat) -> int:
+    """Read an export back the way an analysis would; returns the number of rows."""
+    if fmt == ExportFormat.PARQUET:
+        import pyarrow.parquet as pq
+        return pq.read_table(path).num_rows
+    with gzip.open(path, "rt", newline="") as source:
+        if fmt == ExportFormat.CSV:
+            return sum(1 for _ in csv.reader(source)) - 1
+        return sum(1 for line in source if json.loads(line))
+
+
+async def _cleanup(user_id: int) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(ProgressLog).where(ProgressLog.user_id == user_id))
+        await db.execute(delete(Skill).where(Skill.user_id == user_id))
+        await db.execute(delete(User).where(User.id == user_id))
+        await db.commit()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logs", type=int, default=500000)
+    parser.add_argument("--skills", type=int, default=20)
+    parser.add_argument("--format", type=ExportFormat, default=ExportFormat.NDJSON)
+    args = parser.parse_args()
+
+    user_id = await _seed(args.logs, args.skills)
+    print(f"seeded {args.logs} logs over {args.skills} skills")
+
+    try:
+        path = os.path.join(tempfile.mkdtemp(), f"export.{args.format.value}")
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        started = time.perf_counter()
+        body = ExportService().export_account(user_id, args.format, [ExportSection.PROGRESS_LOGS], True)
+        with open(path, "wb") as target:
+            async for piece in body:
+                target.write(piece)
+        elapsed = time.perf_counter() - started
+        rss_growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+        size = os.path.getsize(path)
+
+        started = time.perf_counter()
+        rows = _load(path, args.format)
+        loaded = time.perf_counter() - started
+        os.remove(path)
+
+        print(
+            f"{args.format.value}: {rows} rows in {elapsed:.1f}s  rows/s={rows / elapsed:.0f}  "
+            f"size={size / 1024 / 1024:.1f} MB  peak RSS growth={rss_growth / 1024:.1f} MB  "
+            f"load={loaded:.2f}s"
+        )
+    finally:
+        await _cleanup(user_id)
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
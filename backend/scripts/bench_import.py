@@ -0,0 +1,148 @@
+"""
+Benchmark importing a large progress history file.
+
+Writes a CSV of ``--rows`` time tracker entries for a throwaway user,
+``--per-day`` entries per skill and day over ``--skills`` skills (the
+skills do not exist yet, so the import creates them), and runs it through
+``ImportService.run_job`` the way the import worker does. Reports the time,
+rows per second, statements sent and how much the process' peak RSS grew,
+which should not depend on the file size. The skill totals and rollups are
+checked against the logs at the end and the seeded rows are removed.
+
+Usage:
+    python -m scripts.bench_import --rows 1000000 --skills 20 --per-day 4
+"""
+import argparse
+import asyncio
+import csv
+import os
+import resource
+import tempfile
+import time
+import uuid
+from datetime import date, timedelta
+
+from sqlalchemy import select, delete, insert, func, event
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, async_engine
+from app.models.import_job import ImportFormat, ImportStatus
+from app.models.progress import ProgressLog
+from app.models.rollup import ProgressDailyRollup
+from app.models.skill import Skill
+from app.models.streak import StreakState
+from app.models.user import User
+from app.repositories.import_job_repository import ImportJobRepository
+from app.schemas.progress import ProgressUpsertMode
+from app.services.import_service import ImportService
+
+
+def _write_csv(path: str, rows: int, skills: int, per_day: int) -> int:
+    """Entries walking back from today; returns the file size."""
+    today = date.today()
+    with open(path, "w", newline="") as target:
+        writer = csv.writer(target)
+        writer.writerow(["Project", "Start date", "Duration", "Description"])
+        for i in range(rows):
+            day = today - timedelta(days=i // (skills * per_day))
+            minutes = 5 + i % 55
+            writer.writerow([
+                f"Imported skill {i % skills}",
+                day.isoformat(),
+                f"{minutes // 60}:{minutes % 60:02d}:00",
+                f"session {i % per_day}"
+            ])
+    return os.path.getsize(path)
+
+
+async def _seed(path: str, size: int):
+    tag = uuid.uuid4().hex[:12]
+    async with AsyncSessionLocal() as db:
+        user_id = await db.scalar(
+            insert(User).values(
+                email=f"bench-{tag}@example.com",
+                username=f"bench-{tag}",
+                hashed_password="!"
+            ).returning(User.id)
+        )
+        job = await ImportJobRepository(db).create(
+            user_id=user_id,
+            fmt=ImportFormat.CSV,
+            mode=ProgressUpsertMode.ACCUMULATE.value,
+            filename="bench.csv",
+            file_path=path,
+            total_bytes=size
+        )
+        await db.commit()
+    return user_id, job.id
+
+
+async def _check(user_id: int) -> bool:
+    async with AsyncSessionLocal() as db:
+        logged = select(
+            func.coalesce(func.sum(ProgressLog.time_spent), 0)
+        ).where(ProgressLog.skill_id == Skill.id).scalar_subquery()
+        drifted = await db.scalar(
+            select(func.count()).where(Skill.user_id == user_id, Skill.total_hours != logged)
+        )
+        rollup_minutes = await db.scalar(
+            select(func.coalesce(func.sum(ProgressDailyRollup.minutes), 0)).where(ProgressDailyRollup.user_id == user_id)
+        )
+        log_minutes, logs = (await db.execute(
+            select(func.coalesce(func.sum(ProgressLog.time_spent), 0), func.count()).where(ProgressLog.user_id == user_id)
+        )).one()
+    print(f"logs={logs} skills drifted={drifted} rollup minutes={rollup_minutes} log minutes={log_minutes}")
+    return drifted == 0 and rollup_minutes == log_minutes
+
+
+async def _cleanup(user_id: int) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(ProgressLog).where(ProgressLog.user_id == user_id))
+        await db.execute(delete(StreakState).where(StreakState.user_id == user_id))
+        await db.execute(delete(Skill).where(Skill.user_id == user_id))
+        await db.execute(delete(User).where(User.id == user_id))
+        await db.commit()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--skills", type=int, default=20)
+    parser.add_argument("--per-day", type=int, default=4)
+    args = parser.parse_args()
+    
+    statements = {"count": 0}
+    
+    @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+    def _count(*_):
+        statements["count"] += 1
+    
+    path = os.path.join(tempfile.mkdtemp(), "bench.csv")
+    size = _write_csv(path, args.rows, args.skills, args.per_day)
+    user_id, job_id = await _seed(path, size)
+    print(f"wrote {args.rows} rows, {size / 1024 / 1024:.1f} MB; chunk size {settings.IMPORT_CHUNK_SIZE}")
+    
+    try:
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        statements["count"] = 0
+        started = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            job = await ImportService(db).run_job(job_id)
+        elapsed = time.perf_counter() - started
+        rss_growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+        
+        async with AsyncSessionLocal() as db:
+            status = (await ImportJobRepository(db).get_by_id(job_id, user_id)).status
+        print(
+            f"{status.value}: {job.rows_read} rows in {elapsed:.1f}s  rows/s={job.rows_read / elapsed:.0f}  "
+            f"logs created={job.logs_created} updated={job.logs_updated} skipped={job.rows_skipped}  "
+            f"statements={statements['count']}  peak RSS growth={rss_growth / 1024:.1f} MB"
+        )
+        print("ok" if status == ImportStatus.COMPLETED and await _check(user_id) else "DRIFT")
+    finally:
+        await _cleanup(user_id)
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
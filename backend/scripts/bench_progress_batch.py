@@ -0,0 +1,181 @@
+"""
+Benchmark batch progress ingestion against logging one request at a time.
+
+Seeds a throwaway user with ``--skills`` skills and builds ``--logs`` logs
+spread over them, one per skill per day (a week of offline sessions across
+many skills, stretched to the batch size). For each of ``--iterations``
+rounds it then writes the whole set:
+
+* once through ``ProgressService.create_progress_logs`` as a single batch
+* once through ``ProgressService.create_progress_log``, one call per log
+
+timing both and counting the statements they send. The logs are removed
+between rounds, and the skill totals, rollups and streaks are checked
+against the logs at the end. The seeded rows are removed afterwards.
+
+Usage:
+    python -m scripts.bench_progress_batch --logs 1000 --skills 10 --iterations 3
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from datetime import date, timedelta
+
+from sqlalchemy import select, update, delete, insert, func, event
+
+from app.core.database import AsyncSessionLocal, async_engine
+from app.models.progress import ProgressLog
+from app.models.rollup import ProgressDailyRollup
+from app.models.skill import Skill, SkillLevel, SkillStatus
+from app.models.streak import StreakState
+from app.models.user import User
+from app.repositories.streak_repository import StreakRepository
+from app.schemas.progress import ProgressLogBatchCreate, ProgressLogCreate
+from app.services.progress_service import ProgressService
+
+
+async def _seed(skills: int):
+    tag = uuid.uuid4().hex[:12]
+    async with AsyncSessionLocal() as db:
+        user_id = await db.scalar(
+            insert(User).values(
+                email=f"bench-{tag}@example.com",
+                username=f"bench-{tag}",
+                hashed_password="!"
+            ).returning(User.id)
+        )
+        skill_ids = list((await db.scalars(
+            insert(Skill).values([
+                {
+                    "user_id": user_id,
+                    "name": f"Benchmark skill {i}",
+                    "target_level": SkillLevel.ADVANCED,
+                    "current_level": SkillLevel.BEGINNER,
+                    "status": SkillStatus.ACTIVE,
+                    "total_hours": 0
+                }
+                for i in range(skills)
+            ]).returning(Skill.id)
+        )).all())
+        await db.commit()
+    return user_id, skill_ids
+
+
+def _logs(skill_ids, count: int):
+    """One log per skill per day, walking back from today."""
+    today = date.today()
+    return [
+        {
+            "skill_id": skill_ids[i % len(skill_ids)],
+            "date": (today - timedelta(days=i // len(skill_ids))).isoformat(),
+            "time_spent": 15 + i % 90,
+            "description": "benchmark session"
+        }
+        for i in range(count)
+    ]
+
+
+async def _reset(user_id: int) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(ProgressLog).where(ProgressLog.user_id == user_id))
+        await db.execute(delete(ProgressDailyRollup).where(ProgressDailyRollup.user_id == user_id))
+        await db.execute(update(Skill).where(Skill.user_id == user_id).values(total_hours=0))
+        await StreakRepository(db).rebuild([user_id])
+        await db.commit()
+
+
+async def _cleanup(user_id: int) -> None:
+    await _reset(user_id)
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(StreakState).where(StreakState.user_id == user_id))
+        await db.execute(delete(Skill).where(Skill.user_id == user_id))
+        await db.execute(delete(User).where(User.id == user_id))
+        await db.commit()
+
+
+async def _check(user_id: int) -> bool:
+    async with AsyncSessionLocal() as db:
+        logged = select(
+            func.coalesce(func.sum(ProgressLog.time_spent), 0)
+        ).where(ProgressLog.skill_id == Skill.id).scalar_subquery()
+        drifted = await db.scalar(
+            select(func.count()).where(Skill.user_id == user_id, Skill.total_hours != logged)
+        )
+        rollup_minutes = await db.scalar(
+            select(func.coalesce(func.sum(ProgressDailyRollup.minutes), 0)).where(ProgressDailyRollup.user_id == user_id)
+        )
+        log_minutes = await db.scalar(
+            select(func.coalesce(func.sum(ProgressLog.time_spent), 0)).where(ProgressLog.user_id == user_id)
+        )
+        streak = await db.scalar(
+            select(StreakState.current_streak).where(StreakState.user_id == user_id, StreakState.skill_id.is_(None))
+        )
+    print(f"skills drifted={drifted} rollup minutes={rollup_minutes} log minutes={log_minutes} user streak={streak}")
+    return drifted == 0 and rollup_minutes == log_minutes
+
+
+def _report(label: str, logs: int, durations, statements: int) -> None:
+    mean = statistics.mean(durations)
+    print(
+        f"{label:<12} n={len(durations):<3} "
+        f"mean={mean * 1000:9.1f}ms  best={min(durations) * 1000:9.1f}ms  "
+        f"logs/s={logs / mean:9.0f}  statements={statements}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logs", type=int, default=1000)
+    parser.add_argument("--skills", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=3)
+    args = parser.parse_args()
+    
+    statements = {"count": 0}
+    
+    @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+    def _count(*_):
+        statements["count"] += 1
+    
+    user_id, skill_ids = await _seed(args.skills)
+    payload = _logs(skill_ids, args.logs)
+    print(f"seeded {args.skills} skills; {args.logs} logs per round")
+    
+    try:
+        batch_times, single_times = [], []
+        batch_statements = single_statements = 0
+        for _ in range(args.iterations):
+            started = time.perf_counter()
+            statements["count"] = 0
+            async with AsyncSessionLocal() as db:
+                result = await ProgressService(db).create_progress_logs(
+                    user_id, ProgressLogBatchCreate(logs=payload)
+                )
+            batch_times.append(time.perf_counter() - started)
+            batch_statements = statements["count"]
+            assert result.created == args.logs, result.failed
+            await _reset(user_id)
+            
+            started = time.perf_counter()
+            statements["count"] = 0
+            for log in payload:
+                async with AsyncSessionLocal() as db:
+                    await ProgressService(db).create_progress_log(user_id, ProgressLogCreate(**log))
+            single_times.append(time.perf_counter() - started)
+            single_statements = statements["count"]
+            await _reset(user_id)
+        
+        _report("batch", args.logs, batch_times, batch_statements)
+        _report("one-by-one", args.logs, single_times, single_statements)
+        
+        async with AsyncSessionLocal() as db:
+            await ProgressService(db).create_progress_logs(user_id, ProgressLogBatchCreate(logs=payload))
+        print("ok" if await _check(user_id) else "DRIFT")
+    finally:
+        await _cleanup(user_id)
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,170 @@
+"""
+Benchmark the progress write path against a skill with a long history.
+
+Seeds a throwaway user with one skill holding ``--logs`` progress logs (every
+other day, so streak upkeep stays bounded and the numbers reflect the skill
+total), then times:
+
+* the skill total statement on its own: the old full ``SUM`` recompute
+  against the ``total_hours = total_hours + :delta`` update
+* create / update / delete of a log for today through ``ProgressService``,
+  one commit each
+
+and finally checks the maintained total against the logs. The seeded rows
+are removed afterwards.
+
+Usage:
+    python -m scripts.bench_progress_writes --logs 10000 --iterations 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from datetime import date, timedelta
+
+from sqlalchemy import select, update, delete, insert, func
+
+from app.core.database import AsyncSessionLocal, async_engine
+from app.models.progress import ProgressLog
+from app.models.skill import Skill, SkillLevel, SkillStatus
+from app.models.user import User
+from app.repositories.rollup_repository import RollupRepository
+from app.repositories.streak_repository import StreakRepository
+from app.schemas.progress import ProgressLogCreate, ProgressLogUpdate
+from app.services.progress_service import ProgressService
+
+
+async def _seed(logs: int):
+    tag = uuid.uuid4().hex[:12]
+    async with AsyncSessionLocal() as db:
+        user_id = await db.scalar(
+            insert(User).values(
+                email=f"bench-{tag}@example.com",
+                username=f"bench-{tag}",
+                hashed_password="!"
+            ).returning(User.id)
+        )
+        skill_id = await db.scalar(
+            insert(Skill).values(
+                user_id=user_id,
+                name="Benchmark skill",
+                target_level=SkillLevel.ADVANCED,
+                current_level=SkillLevel.BEGINNER,
+                status=SkillStatus.ACTIVE,
+                total_hours=0
+            ).returning(Skill.id)
+        )
+        
+        today = date.today()
+        await db.execute(
+            insert(ProgressLog),
+            [
+                {
+                    "user_id": user_id,
+                    "skill_id": skill_id,
+                    "date": today - timedelta(days=2 * i + 2),
+                    "time_spent": 30 + i % 60,
+                    "description": "seeded"
+                }
+                for i in range(logs)
+            ]
+        )
+        await db.execute(
+            update(Skill).where(Skill.id == skill_id).values(
+                total_hours=select(func.sum(ProgressLog.time_spent)).where(
+                    ProgressLog.skill_id == skill_id
+                ).scalar_subquery()
+            )
+        )
+        await RollupRepository(db).rebuild([user_id])
+        await StreakRepository(db).rebuild([user_id])
+        await db.commit()
+    return user_id, skill_id
+
+
+async def _cleanup(user_id: int) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(ProgressLog).where(ProgressLog.user_id == user_id))
+        await db.execute(delete(Skill).where(Skill.user_id == user_id))
+        await db.execute(delete(User).where(User.id == user_id))
+        await db.commit()
+
+
+async def _time(label: str, iterations: int, op) -> None:
+    latencies = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await op()
+        latencies.append((time.perf_counter() - started) * 1000)
+    
+    ordered = sorted(latencies)
+    print(
+        f"{label:<30} n={iterations:<5} "
+        f"p50={ordered[len(ordered) // 2]:7.2f}ms  "
+        f"p95={ordered[int(len(ordered) * 0.95) - 1]:7.2f}ms  "
+        f"mean={statistics.mean(latencies):7.2f}ms"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logs", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    
+    user_id, skill_id = await _seed(args.logs)
+    print(f"seeded skill {skill_id} with {args.logs} logs")
+    
+    try:
+        async with AsyncSessionLocal() as db:
+            async def full_recompute():
+                total = await db.scalar(
+                    select(func.sum(ProgressLog.time_spent)).where(ProgressLog.skill_id == skill_id)
+                ) or 0
+                await db.execute(update(Skill).where(Skill.id == skill_id).values(total_hours=total))
+                await db.rollback()
+            
+            async def delta_update():
+                await db.execute(
+                    update(Skill).where(Skill.id == skill_id).values(total_hours=Skill.total_hours + 1)
+                )
+                await db.rollback()
+            
+            await _time("total: full SUM recompute", args.iterations, full_recompute)
+            await _time("total: delta update", args.iterations, delta_update)
+        
+        state = {}
+        
+        async def create():
+            async with AsyncSessionLocal() as db:
+                log = await ProgressService(db).create_progress_log(
+                    user_id, ProgressLogCreate(skill_id=skill_id, date=date.today(), time_spent=45)
+                )
+                state["log_id"] = log.id
+        
+        async def update_and_delete():
+            async with AsyncSessionLocal() as db:
+                service = ProgressService(db)
+                await service.update_progress_log(state["log_id"], user_id, ProgressLogUpdate(time_spent=60))
+                await service.delete_progress_log(state["log_id"], user_id)
+        
+        async def write_cycle():
+            await create()
+            await update_and_delete()
+        
+        await _time("service: create+update+delete", args.iterations, write_cycle)
+        
+        async with AsyncSessionLocal() as db:
+            stored = await db.scalar(select(Skill.total_hours).where(Skill.id == skill_id))
+            logged = await db.scalar(
+                select(func.sum(ProgressLog.time_spent)).where(ProgressLog.skill_id == skill_id)
+            )
+        print(f"total_hours={stored} sum(logs)={logged} {'ok' if stored == logged else 'DRIFT'}")
+    finally:
+        await _cleanup(user_id)
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
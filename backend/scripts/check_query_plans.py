@@ -0,0 +1,179 @@
+"""
+EXPLAIN every repository read query and fail if one is not index driven.
+
+Runs the read paths of the repositories for an existing user, captures the
+SQL they send, and EXPLAINs each statement with sequential scans and
+hash/merge joins disabled so the planner does not walk a whole table just
+because a dev table is small.
+A statement fails if any scan of a table is a Seq Scan, or an index scan
+without an Index Cond (a full index walk).
+
+Usage:
+    python -m scripts.check_query_plans --user-id 1
+"""
+import argparse
+import asyncio
+import json
+import sys
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import event, select, text
+
+from app.core.database import AsyncSessionLocal, async_engine
+from app.models.skill import Skill
+from app.models.resource import Resource
+from app.models.summary import WeeklySummary
+from app.repositories.progress_repository import ProgressRepository
+from app.repositories.resource_repository import ResourceRepository
+from app.repositories.skill_repository import SkillRepository
+from app.repositories.summary_repository import SummaryRepository
+from app.repositories.user_repository import UserRepository
+
+
+def _read_paths(user_id: int, skill_id: int, resource_id: int, summary_id: int):
+    """(label, coroutine factory) for every repository read path."""
+    today = date.today()
+    week_start = today - timedelta(days=today.weekday())
+    now = datetime.now(timezone.utc)
+    
+    def paths(db):
+        progress = ProgressRepository(db)
+        skills = SkillRepository(db)
+        resources = ResourceRepository(db)
+        summaries = SummaryRepository(db)
+        users = UserRepository(db)
+        return [
+            ("ProgressRepository.get_by_id", lambda: progress.get_by_id(1, user_id)),
+            ("ProgressRepository.get_all", lambda: progress.get_all(user_id)),
+            ("ProgressRepository.get_all(skill)", lambda: progress.get_all(user_id, skill_id=skill_id)),
+            ("ProgressRepository.get_all(range)", lambda: progress.get_all(user_id, start_date=week_start, end_date=today)),
+            ("ProgressRepository.get_all(cursor)", lambda: progress.get_all(user_id, after=(today, now, 1))),
+            ("ProgressRepository.count", lambda: progress.count(user_id)),
+            ("ProgressRepository.get_daily_stats", lambda: progress.get_daily_stats(user_id, today)),
+            ("ProgressRepository.get_weekly_stats", lambda: progress.get_weekly_stats(user_id, week_start)),
+            ("ProgressRepository.get_range_stats", lambda: progress.get_range_stats(user_id, today.replace(month=1, day=1), today, "month")),
+            ("ProgressRepository.get_monthly_stats", lambda: progress.get_monthly_stats(user_id, today.year, today.month)),
+            ("ProgressRepository.get_overall_stats", lambda: progress.get_overall_stats(user_id)),
+            ("ProgressRepository.get_skill_progress_summary", lambda: progress.get_skill_progress_summary(user_id, skill_id)),
+            ("ProgressRepository.check_duplicate", lambda: progress.check_duplicate(user_id, skill_id, today)),
+            ("SkillRepository.get_by_id", lambda: skills.get_by_id(skill_id, user_id)),
+            ("SkillRepository.get_all", lambda: skills.get_all(user_id)),
+            ("SkillRepository.get_all(cursor)", lambda: skills.get_all(user_id, after=(now, 1))),
+            ("SkillRepository.count", lambda: skills.count(user_id)),
+            ("SkillRepository.get_skill_with_stats", lambda: skills.get_skill_with_stats(skill_id, user_id)),
+            ("SkillRepository.get_user_stats", lambda: skills.get_user_stats(user_id)),
+            ("SkillRepository.check_skill_exists", lambda: skills.check_skill_exists(user_id, "Python")),
+            ("ResourceRepository.get_by_id", lambda: resources.get_by_id(resource_id)),
+            ("ResourceRepository.get_all", lambda: resources.get_all(user_id)),
+            ("ResourceRepository.get_all(skill)", lambda: resources.get_all(user_id, skill_id=skill_id)),
+            ("ResourceRepository.get_all(cursor)", lambda: resources.get_all(user_id, skill_id=skill_id, after=(now, 1))),
+            ("ResourceRepository.count", lambda: resources.count(user_id)),
+            ("ResourceRepository.get_stats", lambda: resources.get_stats(user_id)),
+            ("ResourceRepository.get_by_skill", lambda: resources.get_by_skill(skill_id)),
+            ("SummaryRepository.get_by_id", lambda: summaries.get_by_id(summary_id, user_id)),
+            ("SummaryRepository.get_by_week", lambda: summaries.get_by_week(user_id, week_start)),
+            ("SummaryRepository.get_all", lambda: summaries.get_all(user_id)),
+            ("SummaryRepository.get_all(cursor)", lambda: summaries.get_all(user_id, after=(today, 1))),
+            ("SummaryRepository.count", lambda: summaries.count(user_id)),
+            ("SummaryRepository.get_week_data", lambda: summaries.get_week_data(user_id, week_start, today)),
+            ("SummaryRepository.get_stats", lambda: summaries.get_stats(user_id)),
+            ("UserRepository.get_by_id", lambda: users.get_by_id(user_id)),
+            ("UserRepository.get_by_email", lambda: users.get_by_email("nobody@example.com")),
+            ("UserRepository.get_by_username", lambda: users.get_by_username("nobody")),
+        ]
+    
+    return paths
+
+
+def _plan_problems(node: dict) -> list:
+    """Collect non index-driven scans from an EXPLAIN (FORMAT JSON) plan tree."""
+    problems = []
+    node_type = node["Node Type"]
+    relation = node.get("Relation Name")
+    
+    if node_type == "Seq Scan":
+        problems.append(f"Seq Scan on {relation}")
+    elif node_type in ("Index Scan", "Index Only Scan") and "Index Cond" not in node:
+        problems.append(f"{node_type} on {relation} using {node['Index Name']} without an index condition")
+    
+    for child in node.get("Plans", []):
+        problems.extend(_plan_problems(child))
+    return problems
+
+
+async def _capture(user_id: int) -> list:
+    """Run every read path and return [(label, statement, parameters)]."""
+    async with AsyncSessionLocal() as db:
+        skill_id = await db.scalar(select(Skill.id).where(Skill.user_id == user_id).limit(1)) or 0
+        resource_id = await db.scalar(
+            select(Resource.id).join(Skill).where(Skill.user_id == user_id).limit(1)
+        ) or 0
+        summary_id = await db.scalar(
+            select(WeeklySummary.id).where(WeeklySummary.user_id == user_id).limit(1)
+        ) or 0
+    
+    captured = []
+    current = {"label": None}
+    
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            captured.append((current["label"], statement, parameters))
+    
+    event.listen(async_engine.sync_engine, "before_cursor_execute", on_execute)
+    try:
+        async with AsyncSessionLocal() as db:
+            for label, call in _read_paths(user_id, skill_id, resource_id, summary_id)(db):
+                current["label"] = label
+                await call()
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", on_execute)
+    
+    return captured
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--verbose", action="store_true", help="Print every plan")
+    args = parser.parse_args()
+    
+    captured = await _capture(args.user_id)
+    
+    failures = 0
+    seen = set()
+    async with async_engine.connect() as conn:
+        # On a small dev database the planner happily walks a whole tiny
+        # table; steer it towards the plans it picks once tables are large.
+        for setting in ("enable_seqscan", "enable_hashjoin", "enable_mergejoin"):
+            await conn.execute(text(f"SET {setting} = off"))
+        for label, statement, parameters in captured:
+            if statement in seen:
+                continue
+            seen.add(statement)
+            
+            result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            plan = result.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            problems = _plan_problems(plan[0]["Plan"])
+            
+            if problems:
+                failures += 1
+                print(f"FAIL  {label}")
+                for problem in problems:
+                    print(f"        {problem}")
+                print(f"        {' '.join(statement.split())}")
+            else:
+                print(f"ok    {label}")
+            if args.verbose:
+                print(json.dumps(plan[0]["Plan"], indent=2, default=str))
+    
+    await async_engine.dispose()
+    
+    print(f"\n{len(seen)} statements checked, {failures} not index driven")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,184 @@
+"""
+Count the Postgres round trips of every write endpoint.
+
+Registers a throwaway user and calls each write endpoint once through the
+ASGI app, counting what the request sends to Postgres: statements, BEGIN,
+COMMIT/ROLLBACK and the pool's pre-ping on checkout. Redis calls are not
+counted. The user is deactivated last and its rows are removed afterwards.
+
+Round trips per request, before and after moving repositories from commit
++ refresh per call to one commit per service call (requests that follow a
+profile change also pay for reloading the principal):
+
+    endpoint                              before  after
+    POST   /skills/                            9      5
+    PUT    /skills/{id}                        9      5
+    PATCH  /skills/bulk-update                 4      4
+    POST   /progress/                         17     15
+    PUT    /progress/{id}                      8      7
+    POST   /progress/upsert                    -      7
+    DELETE /progress/{id}                     16     16
+    POST   /resources/                         9      5
+    PATCH  /resources/{id}                     9      5
+    POST   /resources/{id}/complete            9      5
+    DELETE /resources/{id}                     5      5
+    PUT    /users/profile                      9      5
+    PUT    /users/email                       14     10
+    POST   /summaries/generate                13      9
+    DELETE /summaries/{id}                     5      5
+    POST   /auth/tokens/                       8      4
+    DELETE /auth/tokens/{id}                   4      4
+    POST   /auth/change-password              12      8
+    DELETE /skills/{id}                       12      9
+    POST   /users/deactivate                  12      8
+
+POST /progress/ also no longer looks for an existing log first; the unique
+index rejects a duplicate. /progress/upsert writes the day's log with one
+statement whether or not it exists yet.
+
+Password checks end the read transaction before bcrypt runs, so those
+endpoints still use two transactions.
+
+Usage:
+    python -m scripts.count_round_trips
+"""
+import argparse
+import asyncio
+import uuid
+from datetime import date, timedelta
+
+import httpx
+from sqlalchemy import delete, event
+
+from app.core.database import AsyncSessionLocal, async_engine
+from app.main import app
+from app.models.user import User
+
+PASSWORD = "RoundTrip1"
+
+
+class RoundTripCounter:
+    """Counts what the async engine sends to Postgres."""
+    
+    def __init__(self, verbose: bool = False):
+        self.count = 0
+        self.verbose = verbose
+        sync_engine = async_engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", self._statement)
+        event.listen(sync_engine, "begin", lambda conn: self._bump("BEGIN"))
+        event.listen(sync_engine, "commit", lambda conn: self._bump("COMMIT"))
+        event.listen(sync_engine, "rollback", lambda conn: self._bump("ROLLBACK"))
+        # Checkouts run the pool's pre-ping
+        event.listen(sync_engine.pool, "checkout", lambda *args: self._bump("ping"))
+    
+    def _statement(self, conn, cursor, statement, parameters, context, executemany):
+        self._bump(" ".join(statement.split())[:100])
+    
+    def _bump(self, what: str) -> None:
+        self.count += 1
+        if self.verbose:
+            print(f"    {what}")
+
+
+async def _measure(client: httpx.AsyncClient, counter: RoundTripCounter, label: str, method: str, url: str, **kwargs):
+    counter.count = 0
+    response = await client.request(method, url, **kwargs)
+    if response.status_code >= 400:
+        raise SystemExit(f"{label}: {response.status_code} {response.text}")
+    print(f"{label:<38}{counter.count:>4}")
+    return response.json() if response.content else None
+
+
+async def main(base_url: str, verbose: bool):
+    tag = uuid.uuid4().hex[:12]
+    counter = RoundTripCounter(verbose)
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url=base_url) as client:
+            registered = (await client.post("/api/v1/auth/register", json={
+                "email": f"trips-{tag}@example.com",
+                "username": f"trips-{tag}",
+                "password": PASSWORD
+            })).json()
+            user_id = registered["user"]["id"]
+            client.headers["Authorization"] = f"Bearer {registered['tokens']['access_token']}"
+            
+            # Warm the principal cache so requests measure only their own work
+            await client.get("/api/v1/users/profile")
+            
+            today = date.today()
+            week_start = today - timedelta(days=today.weekday())
+            
+            skill = await _measure(client, counter, "POST   /skills/", "POST", "/api/v1/skills/", json={
+                "name": "Round trips", "target_level": "advanced", "current_level": "beginner"
+            })
+            skill_url = f"/api/v1/skills/{skill['id']}"
+            await _measure(client, counter, "PUT    /skills/{id}", "PUT", skill_url, json={"description": "Counted"})
+            await _measure(client, counter, "PATCH  /skills/bulk-update", "PATCH", "/api/v1/skills/bulk-update", json={
+                "skill_ids": [skill["id"]], "status": "active"
+            })
+            
+            log = await _measure(client, counter, "POST   /progress/", "POST", "/api/v1/progress/", json={
+                "skill_id": skill["id"], "date": today.isoformat(), "time_spent": 30
+            })
+            log_url = f"/api/v1/progress/{log['id']}"
+            await _measure(client, counter, "PUT    /progress/{id}", "PUT", log_url, json={"time_spent": 45})
+            await _measure(client, counter, "POST   /progress/upsert", "POST", "/api/v1/progress/upsert", json={
+                "skill_id": skill["id"], "date": today.isoformat(), "time_spent": 15
+            })
+            await _measure(client, counter, "DELETE /progress/{id}", "DELETE", log_url)
+            
+            resource = await _measure(client, counter, "POST   /resources/", "POST", "/api/v1/resources/", json={
+                "skill_id": skill["id"], "title": "Counting round trips"
+            })
+            resource_url = f"/api/v1/resources/{resource['id']}"
+            await _measure(client, counter, "PATCH  /resources/{id}", "PATCH", resource_url, json={"description": "Counted"})
+            await _measure(client, counter, "POST   /resources/{id}/complete", "POST", f"{resource_url}/complete")
+            await _measure(client, counter, "DELETE /resources/{id}", "DELETE", resource_url)
+            
+            await _measure(client, counter, "PUT    /users/profile", "PUT", "/api/v1/users/profile", json={
+                "full_name": "Round Trip"
+            })
+            await _measure(client, counter, "PUT    /users/email", "PUT", "/api/v1/users/email", json={
+                "email": f"trips-{tag}-new@example.com", "password": PASSWORD
+            })
+            
+            summary = await _measure(client, counter, "POST   /summaries/generate", "POST", "/api/v1/summaries/generate", json={
+                "week_start": week_start.isoformat()
+            })
+            await _measure(client, counter, "DELETE /summaries/{id}", "DELETE", f"/api/v1/summaries/{summary['id']}")
+            
+            token = await _measure(client, counter, "POST   /auth/tokens/", "POST", "/api/v1/auth/tokens/", json={
+                "name": "Round trips", "scopes": ["skills:read"]
+            })
+            await _measure(client, counter, "DELETE /auth/tokens/{id}", "DELETE", f"/api/v1/auth/tokens/{token['id']}")
+            
+            await _measure(client, counter, "POST   /auth/change-password", "POST", "/api/v1/auth/change-password", json={
+                "old_password": PASSWORD, "new_password": PASSWORD
+            })
+            
+            # Changing the password revoked the session, so sign in again
+            login = (await client.post("/api/v1/auth/login", json={
+                "email": f"trips-{tag}-new@example.com", "password": PASSWORD
+            })).json()
+            client.headers["Authorization"] = f"Bearer {login['tokens']['access_token']}"
+            await client.get("/api/v1/users/profile")
+            
+            await _measure(client, counter, "DELETE /skills/{id}", "DELETE", skill_url)
+            await _measure(client, counter, "POST   /users/deactivate", "POST", "/api/v1/users/deactivate", params={
+                "password": PASSWORD
+            })
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(User).where(User.email.like(f"trips-{tag}%")))
+            await db.commit()
+        await app.router.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-url", default="http://localhost")
+    parser.add_argument("--verbose", action="store_true", help="Print what each request sends")
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.verbose))
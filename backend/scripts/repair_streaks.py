@@ -0,0 +1,54 @@
+"""
+Rebuild streak state for every user from their progress logs.
+
+Streak state is maintained incrementally on every progress write; this
+recomputes it from scratch with a gaps-and-islands pass, in batches of users
+so each transaction stays short.
+
+Usage:
+    python -m scripts.repair_streaks
+    python -m scripts.repair_streaks --user-id 42
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal, async_engine
+from app.models.user import User
+from app.repositories.streak_repository import StreakRepository
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--user-id", type=int, help="Only rebuild this user")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    
+    repaired = 0
+    last_id = 0
+    async with AsyncSessionLocal() as db:
+        streak_repo = StreakRepository(db)
+        
+        while True:
+            if args.user_id:
+                user_ids = [args.user_id] if last_id == 0 else []
+            else:
+                user_ids = list((await db.scalars(
+                    select(User.id).where(User.id > last_id).order_by(User.id).limit(args.batch_size)
+                )).all())
+            if not user_ids:
+                break
+            
+            await streak_repo.rebuild(user_ids)
+            await db.commit()
+            
+            repaired += len(user_ids)
+            last_id = user_ids[-1]
+            print(f"rebuilt streaks for {repaired} users")
+    
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())